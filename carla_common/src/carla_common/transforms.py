@@ -18,6 +18,185 @@ from geometry_msgs.msg import Vector3, Quaternion, Transform, Pose, Point, Twist
 from transforms3d.euler import euler2mat, quat2euler, euler2quat
 from transforms3d.quaternions import quat2mat, mat2quat
 
+# Batch conversions
+#
+# The functions below convert N elements at once. Their input are numpy arrays with one
+# row per element (carla values, e.g. (x, y, z) locations or (roll, pitch, yaw) rotations
+# in degrees), their results are numpy arrays in the ROS coordinate system. Quaternions are
+# given as (w, x, y, z) like in transforms3d. The conversions of single carla objects
+# further down compute the same values with math and transforms3d, which is faster for a
+# single element than a numpy array of one row.
+
+# sign changes from the left-handed system (unreal) to the right-handed system (ROS)
+LOCATION_SIGNS = numpy.array([1., -1., 1.])
+ROTATION_SIGNS = numpy.array([1., -1., -1.])
+
+
+def carla_locations_to_numpy_vectors(carla_locations):
+    """
+    Convert carla locations (or any carla vectors) to ROS vectors
+
+    Considers the conversion from left-handed system (unreal) to right-handed
+    system (ROS)
+
+    :param carla_locations: the carla locations (x, y, z)
+    :type carla_locations: numpy.array with Nx3 elements
+    :return: the ROS vectors
+    :rtype: numpy.array with Nx3 elements
+    """
+    return numpy.asarray(carla_locations, dtype=numpy.float64) * LOCATION_SIGNS
+
+
+def carla_rotations_to_RPY(carla_rotations):
+    """
+    Convert carla rotations to roll, pitch, yaw
+
+    Considers the conversion from left-handed system (unreal) to right-handed
+    system (ROS).
+    Considers the conversion from degrees (carla) to radians (ROS).
+
+    :param carla_rotations: the carla rotations (roll, pitch, yaw) in degrees
+    :type carla_rotations: numpy.array with Nx3 elements
+    :return: the rotations (roll, pitch, yaw) in radians
+    :rtype: numpy.array with Nx3 elements
+    """
+    return numpy.radians(numpy.asarray(carla_rotations, dtype=numpy.float64)) * ROTATION_SIGNS
+
+
+def RPY_to_numpy_quaternions(rpy):
+    """
+    Convert roll, pitch, yaw to quaternions (like transforms3d.euler.euler2quat)
+
+    :param rpy: the rotations (roll, pitch, yaw) in radians
+    :type rpy: numpy.array with Nx3 elements
+    :return: the quaternions (w, x, y, z)
+    :rtype: numpy.array with Nx4 elements
+    """
+    half_angles = 0.5 * numpy.asarray(rpy, dtype=numpy.float64)
+    cos_r, cos_p, cos_y = numpy.cos(half_angles).T
+    sin_r, sin_p, sin_y = numpy.sin(half_angles).T
+    return numpy.stack([
+        cos_r * cos_p * cos_y + sin_r * sin_p * sin_y,
+        sin_r * cos_p * cos_y - cos_r * sin_p * sin_y,
+        cos_r * sin_p * cos_y + sin_r * cos_p * sin_y,
+        cos_r * cos_p * sin_y - sin_r * sin_p * cos_y], axis=-1)
+
+
+def RPY_to_numpy_rotation_matrices(rpy):
+    """
+    Convert roll, pitch, yaw to rotation matrices (like transforms3d.euler.euler2mat)
+
+    :param rpy: the rotations (roll, pitch, yaw) in radians
+    :type rpy: numpy.array with Nx3 elements
+    :return: the rotation matrices
+    :rtype: numpy.array with Nx3x3 elements
+    """
+    rpy = numpy.asarray(rpy, dtype=numpy.float64)
+    cos_r, cos_p, cos_y = numpy.cos(rpy).T
+    sin_r, sin_p, sin_y = numpy.sin(rpy).T
+    matrices = numpy.empty((rpy.shape[0], 3, 3))
+    matrices[:, 0, 0] = cos_y * cos_p
+    matrices[:, 0, 1] = cos_y * sin_p * sin_r - sin_y * cos_r
+    matrices[:, 0, 2] = cos_y * sin_p * cos_r + sin_y * sin_r
+    matrices[:, 1, 0] = sin_y * cos_p
+    matrices[:, 1, 1] = sin_y * sin_p * sin_r + cos_y * cos_r
+    matrices[:, 1, 2] = sin_y * sin_p * cos_r - cos_y * sin_r
+    matrices[:, 2, 0] = -sin_p
+    matrices[:, 2, 1] = cos_p * sin_r
+    matrices[:, 2, 2] = cos_p * cos_r
+    return matrices
+
+
+def carla_rotations_to_numpy_quaternions(carla_rotations):
+    """
+    Convert carla rotations to quaternions
+
+    See carla_rotations_to_RPY() for details
+
+    :param carla_rotations: the carla rotations (roll, pitch, yaw) in degrees
+    :type carla_rotations: numpy.array with Nx3 elements
+    :return: the quaternions (w, x, y, z)
+    :rtype: numpy.array with Nx4 elements
+    """
+    return RPY_to_numpy_quaternions(carla_rotations_to_RPY(carla_rotations))
+
+
+def carla_rotations_to_numpy_rotation_matrices(carla_rotations):
+    """
+    Convert carla rotations to rotation matrices
+
+    See carla_rotations_to_RPY() for details
+
+    :param carla_rotations: the carla rotations (roll, pitch, yaw) in degrees
+    :type carla_rotations: numpy.array with Nx3 elements
+    :return: the rotation matrices
+    :rtype: numpy.array with Nx3x3 elements
+    """
+    return RPY_to_numpy_rotation_matrices(carla_rotations_to_RPY(carla_rotations))
+
+
+def carla_transforms_to_numpy_poses(carla_locations, carla_rotations):
+    """
+    Convert carla transforms to poses
+
+    See carla_locations_to_numpy_vectors() and carla_rotations_to_numpy_quaternions()
+    for details
+
+    :param carla_locations: the carla locations (x, y, z)
+    :type carla_locations: numpy.array with Nx3 elements
+    :param carla_rotations: the carla rotations (roll, pitch, yaw) in degrees
+    :type carla_rotations: numpy.array with Nx3 elements
+    :return: the poses (x, y, z, qw, qx, qy, qz)
+    :rtype: numpy.array with Nx7 elements
+    """
+    return numpy.hstack([carla_locations_to_numpy_vectors(carla_locations),
+                         carla_rotations_to_numpy_quaternions(carla_rotations)])
+
+
+def carla_vectors_to_numpy_vectors_rotated(carla_vectors, carla_rotations):
+    """
+    Rotate carla vectors, return them as ROS vectors
+
+    :param carla_vectors: the carla vectors (x, y, z)
+    :type carla_vectors: numpy.array with Nx3 elements
+    :param carla_rotations: the carla rotations (roll, pitch, yaw) in degrees
+    :type carla_rotations: numpy.array with Nx3 elements
+    :return: the rotated ROS vectors
+    :rtype: numpy.array with Nx3 elements
+    """
+    rotation_matrices = carla_rotations_to_numpy_rotation_matrices(carla_rotations)
+    rotated_vectors = numpy.einsum('nij,nj->ni', rotation_matrices,
+                                   numpy.asarray(carla_vectors, dtype=numpy.float64))
+    return rotated_vectors * LOCATION_SIGNS
+
+
+def carla_velocities_to_numpy_twists(carla_linear_velocities, carla_angular_velocities,
+                                     carla_rotations=None):
+    """
+    Convert carla velocities to twists
+
+    Considers the conversion from left-handed system (unreal) to right-handed
+    system (ROS).
+
+    :param carla_linear_velocities: the carla linear velocities (x, y, z)
+    :type carla_linear_velocities: numpy.array with Nx3 elements
+    :param carla_angular_velocities: the carla angular velocities (x, y, z) in degrees/s
+    :type carla_angular_velocities: numpy.array with Nx3 elements
+    :param carla_rotations: the carla rotations (roll, pitch, yaw) in degrees to rotate
+        the linear velocities with. If None, no rotation is executed
+    :type carla_rotations: numpy.array with Nx3 elements
+    :return: the twists (linear x, y, z, angular x, y, z)
+    :rtype: numpy.array with Nx6 elements
+    """
+    if carla_rotations is not None:
+        linear = carla_vectors_to_numpy_vectors_rotated(carla_linear_velocities, carla_rotations)
+    else:
+        linear = carla_locations_to_numpy_vectors(carla_linear_velocities)
+    angular = carla_rotations_to_RPY(carla_angular_velocities)
+    return numpy.hstack([linear, angular])
+
+
+# Conversions of single carla objects
 
 def carla_location_to_numpy_vector(carla_location):
     """
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+#
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+#
+"""
+Microbenchmark of the transform conversions.
+
+Converts 10k carla transforms and velocities to ROS poses and rotated twists, once per
+element with transforms3d, once per element with the conversions of single carla objects
+(carla_transform_to_ros_pose() and carla_velocity_to_ros_twist(), used per actor and frame)
+and once with the batch conversions.
+"""
+
+import math
+import timeit
+from collections import namedtuple
+
+import numpy
+from transforms3d.euler import euler2mat, euler2quat
+
+from carla_common.transforms import (carla_transform_to_ros_pose,
+                                     carla_transforms_to_numpy_poses,
+                                     carla_velocities_to_numpy_twists,
+                                     carla_velocity_to_ros_twist)
+
+NUMBER_OF_TRANSFORMS = 10000
+
+# the conversions only access the attributes of the carla objects
+Vector = namedtuple("Vector", ["x", "y", "z"])
+Rotation = namedtuple("Rotation", ["roll", "pitch", "yaw"])
+Transform = namedtuple("Transform", ["location", "rotation"])
+
+
+def single_conversions(locations, rotations, velocities, angular_velocities):
+    results = []
+    for location, rotation, velocity, angular_velocity in zip(
+            locations, rotations, velocities, angular_velocities):
+        rpy = (math.radians(rotation[0]), -math.radians(rotation[1]), -math.radians(rotation[2]))
+        quat = euler2quat(*rpy)
+        linear = euler2mat(*rpy).dot(velocity)
+        results.append((location[0], -location[1], location[2],
+                        quat[0], quat[1], quat[2], quat[3],
+                        linear[0], -linear[1], linear[2],
+                        math.radians(angular_velocity[0]),
+                        -math.radians(angular_velocity[1]),
+                        -math.radians(angular_velocity[2])))
+    return results
+
+
+def single_object_conversions(locations, rotations, velocities, angular_velocities):
+    results = []
+    for location, rotation, velocity, angular_velocity in zip(
+            locations, rotations, velocities, angular_velocities):
+        carla_rotation = Rotation(*rotation)
+        results.append((
+            carla_transform_to_ros_pose(Transform(Vector(*location), carla_rotation)),
+            carla_velocity_to_ros_twist(Vector(*velocity), Vector(*angular_velocity),
+                                        carla_rotation)))
+    return results
+
+
+def batch_conversions(locations, rotations, velocities, angular_velocities):
+    return (carla_transforms_to_numpy_poses(locations, rotations),
+            carla_velocities_to_numpy_twists(velocities, angular_velocities, rotations))
+
+
+def main():
+    locations = numpy.random.uniform(-100., 100., (NUMBER_OF_TRANSFORMS, 3))
+    rotations = numpy.random.uniform(-180., 180., (NUMBER_OF_TRANSFORMS, 3))
+    velocities = numpy.random.uniform(-30., 30., (NUMBER_OF_TRANSFORMS, 3))
+    angular_velocities = numpy.random.uniform(-90., 90., (NUMBER_OF_TRANSFORMS, 3))
+    for func in (single_conversions, single_object_conversions, batch_conversions):
+        number = 20 if func is batch_conversions else 1
+        seconds = min(timeit.repeat(
+            lambda: func(locations, rotations, velocities, angular_velocities),
+            number=number, repeat=3)) / number
+        print("{:d} transforms, {:25s}: {:8.2f} ms".format(
+            NUMBER_OF_TRANSFORMS, func.__name__, seconds * 1000.0))
+
+
+if __name__ == "__main__":
+    main()
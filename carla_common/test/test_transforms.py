@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+#
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+#
+"""
+Tests of the batch conversions of carla_common.transforms
+
+The batch conversions are compared with transforms3d and with the conversions of single
+carla objects, which are implemented separately.
+"""
+
+import math
+from collections import namedtuple
+
+import numpy
+from transforms3d.euler import euler2mat, euler2quat
+
+import carla_common.transforms as trans
+
+# the conversions only access the attributes of the carla objects
+Vector = namedtuple("Vector", ["x", "y", "z"])
+Rotation = namedtuple("Rotation", ["roll", "pitch", "yaw"])
+Transform = namedtuple("Transform", ["location", "rotation"])
+
+NUMBER_OF_ELEMENTS = 200
+
+
+def random_elements(seed=0):
+    rng = numpy.random.default_rng(seed)
+    vectors = rng.uniform(-100., 100., (NUMBER_OF_ELEMENTS, 3))
+    angular_velocities = rng.uniform(-360., 360., (NUMBER_OF_ELEMENTS, 3))
+    rotations = numpy.column_stack([rng.uniform(-180., 180., NUMBER_OF_ELEMENTS),
+                                    rng.uniform(-90., 90., NUMBER_OF_ELEMENTS),
+                                    rng.uniform(-180., 180., NUMBER_OF_ELEMENTS)])
+    return vectors, angular_velocities, rotations
+
+
+def reference_rpy(rotation):
+    return math.radians(rotation[0]), -math.radians(rotation[1]), -math.radians(rotation[2])
+
+
+def test_quaternions_match_transforms3d():
+    _, _, rotations = random_elements()
+    quaternions = trans.carla_rotations_to_numpy_quaternions(rotations)
+    expected = numpy.array([euler2quat(*reference_rpy(rotation)) for rotation in rotations])
+    numpy.testing.assert_allclose(quaternions, expected, atol=1e-12)
+
+
+def test_rotation_matrices_match_transforms3d():
+    _, _, rotations = random_elements()
+    matrices = trans.carla_rotations_to_numpy_rotation_matrices(rotations)
+    expected = numpy.array([euler2mat(*reference_rpy(rotation)) for rotation in rotations])
+    numpy.testing.assert_allclose(matrices, expected, atol=1e-12)
+
+
+def test_poses_match_handedness_conversion():
+    locations, _, rotations = random_elements()
+    poses = trans.carla_transforms_to_numpy_poses(locations, rotations)
+    assert poses.shape == (NUMBER_OF_ELEMENTS, 7)
+    numpy.testing.assert_array_equal(poses[:, 0], locations[:, 0])
+    numpy.testing.assert_array_equal(poses[:, 1], -locations[:, 1])
+    numpy.testing.assert_array_equal(poses[:, 2], locations[:, 2])
+    numpy.testing.assert_allclose(poses[:, 3:],
+                                  trans.carla_rotations_to_numpy_quaternions(rotations))
+
+
+def test_rotated_twists_match_transforms3d():
+    velocities, angular_velocities, rotations = random_elements()
+    twists = trans.carla_velocities_to_numpy_twists(velocities, angular_velocities, rotations)
+    for twist, velocity, angular_velocity, rotation in zip(
+            twists, velocities, angular_velocities, rotations):
+        linear = euler2mat(*reference_rpy(rotation)).dot(velocity)
+        numpy.testing.assert_allclose(twist[:3], [linear[0], -linear[1], linear[2]], atol=1e-9)
+        numpy.testing.assert_allclose(twist[3:], reference_rpy(angular_velocity), atol=1e-12)
+
+
+def test_scalar_conversions_match_batch_conversions():
+    locations, angular_velocities, rotations = random_elements()
+    poses = trans.carla_transforms_to_numpy_poses(locations, rotations)
+    twists = trans.carla_velocities_to_numpy_twists(locations, angular_velocities, rotations)
+    for index in range(NUMBER_OF_ELEMENTS):
+        location = Vector(*locations[index])
+        rotation = Rotation(*rotations[index])
+
+        ros_pose = trans.carla_transform_to_ros_pose(Transform(location, rotation))
+        numpy.testing.assert_allclose(
+            [ros_pose.position.x, ros_pose.position.y, ros_pose.position.z,
+             ros_pose.orientation.w, ros_pose.orientation.x, ros_pose.orientation.y,
+             ros_pose.orientation.z], poses[index])
+
+        ros_twist = trans.carla_velocity_to_ros_twist(
+            location, Vector(*angular_velocities[index]), rotation)
+        numpy.testing.assert_allclose(
+            [ros_twist.linear.x, ros_twist.linear.y, ros_twist.linear.z,
+             ros_twist.angular.x, ros_twist.angular.y, ros_twist.angular.z], twists[index])
+
+        ros_twist = trans.carla_velocity_to_ros_twist(location, Vector(*angular_velocities[index]))
+        numpy.testing.assert_allclose(
+            [ros_twist.linear.x, ros_twist.linear.y, ros_twist.linear.z],
+            trans.carla_locations_to_numpy_vectors(locations[index:index + 1])[0])
+
+        ros_quaternion = trans.carla_rotation_to_ros_quaternion(rotation)
+        numpy.testing.assert_allclose(
+            [ros_quaternion.w, ros_quaternion.x, ros_quaternion.y, ros_quaternion.z],
+            poses[index, 3:], atol=1e-12)
+
+        numpy.testing.assert_allclose(
+            trans.carla_rotation_to_numpy_rotation_matrix(rotation),
+            trans.carla_rotations_to_numpy_rotation_matrices(rotations[index:index + 1])[0],
+            atol=1e-12)
+
+        ros_vector = trans.carla_vector_to_ros_vector_rotated(location, rotation)
+        numpy.testing.assert_allclose(
+            [ros_vector.x, ros_vector.y, ros_vector.z],
+            trans.carla_vectors_to_numpy_vectors_rotated(
+                locations[index:index + 1], rotations[index:index + 1])[0], atol=1e-9)
@@ -17,8 +17,13 @@ def generate_launch_description():
         # Declare the fault configuration file argument
         launch.actions.DeclareLaunchArgument(
             name='fault_config_file',
-            default_value='/tum/src/carla/ros-bridge/carla_ros_bridge/src/carla_ros_bridge/FaultInjector/FaultConfigFiles/IMURotation.json',
-            description='Path to the fault configuration file'
+            default_value='',
+            description='Fault configuration loaded at startup for all sensors (absolute path or name within fault_file_path), empty for none'
+        ),
+        launch.actions.DeclareLaunchArgument(
+            name='fault_file_path',
+            default_value='',
+            description='Directories searched for fault files (separated by ":"), empty for the FaultInjector config directories of the package'
         ),
         launch.actions.DeclareLaunchArgument(
             name='timeout',
@@ -45,6 +50,56 @@ def generate_launch_description():
             default_value='0.05',
             description='Simulation time (delta seconds) between simulation steps'
         ),
+        launch.actions.DeclareLaunchArgument(
+            name='synchronous_mode_update_executor',
+            default_value='sequential',
+            description='How sensors are updated in synchronous mode: "sequential" or "thread_pool" (wait for the sensor data concurrently)'
+        ),
+        launch.actions.DeclareLaunchArgument(
+            name='synchronous_mode_update_workers',
+            default_value='4',
+            description='Number of worker threads of the "thread_pool" update executor'
+        ),
+        launch.actions.DeclareLaunchArgument(
+            name='publish_bridge_stats',
+            default_value='False',
+            description='Enable/disable publishing the processing time of the bridge per frame on /carla/bridge_stats'
+        ),
+        launch.actions.DeclareLaunchArgument(
+            name='publish_static_sensor_tf',
+            default_value='False',
+            description='In synchronous mode, publish the constant sensor mounting transforms once on /tf_static instead of once per frame on /tf'
+        ),
+        launch.actions.DeclareLaunchArgument(
+            name='image_compression_workers',
+            default_value='2',
+            description='Number of threads encoding the compressed camera images (spawn attribute "ros_image_compression")'
+        ),
+        launch.actions.DeclareLaunchArgument(
+            name='fault_log_samples',
+            default_value='True',
+            description='Write the faults applied to every sensor sample to the fault log (if disabled, they are only counted)'
+        ),
+        launch.actions.DeclareLaunchArgument(
+            name='fault_log_min_interval',
+            default_value='1.0',
+            description='Minimum time [s] between two fault log records of the same fault and event'
+        ),
+        launch.actions.DeclareLaunchArgument(
+            name='fault_log_buffer_size',
+            default_value='10000',
+            description='Number of fault log records buffered for the writer thread'
+        ),
+        launch.actions.DeclareLaunchArgument(
+            name='fault_injection_seed',
+            default_value='-1',
+            description='Seed of the random sensor faults (combined with the sensor id), -1 for an unpredictable seed'
+        ),
+        launch.actions.DeclareLaunchArgument(
+            name='fault_campaign_manifest',
+            default_value='',
+            description='Manifest of a fault campaign (fault files x scenarios x seeds) to run in synchronous mode, empty to disable'
+        ),
         launch.actions.DeclareLaunchArgument(
             name='town',
             default_value='Town01',
@@ -81,6 +136,9 @@ def generate_launch_description():
                 {
                     'fault_config_file': launch.substitutions.LaunchConfiguration('fault_config_file')
                 },
+                {
+                    'fault_file_path': launch.substitutions.LaunchConfiguration('fault_file_path')
+                },
                 {
                     'timeout': launch.substitutions.LaunchConfiguration('timeout')
                 },
@@ -96,6 +154,36 @@ def generate_launch_description():
                 {
                     'fixed_delta_seconds': launch.substitutions.LaunchConfiguration('fixed_delta_seconds')
                 },
+                {
+                    'synchronous_mode_update_executor': launch.substitutions.LaunchConfiguration('synchronous_mode_update_executor')
+                },
+                {
+                    'synchronous_mode_update_workers': launch.substitutions.LaunchConfiguration('synchronous_mode_update_workers')
+                },
+                {
+                    'publish_bridge_stats': launch.substitutions.LaunchConfiguration('publish_bridge_stats')
+                },
+                {
+                    'publish_static_sensor_tf': launch.substitutions.LaunchConfiguration('publish_static_sensor_tf')
+                },
+                {
+                    'image_compression_workers': launch.substitutions.LaunchConfiguration('image_compression_workers')
+                },
+                {
+                    'fault_log_samples': launch.substitutions.LaunchConfiguration('fault_log_samples')
+                },
+                {
+                    'fault_log_min_interval': launch.substitutions.LaunchConfiguration('fault_log_min_interval')
+                },
+                {
+                    'fault_log_buffer_size': launch.substitutions.LaunchConfiguration('fault_log_buffer_size')
+                },
+                {
+                    'fault_injection_seed': launch.substitutions.LaunchConfiguration('fault_injection_seed')
+                },
+                {
+                    'fault_campaign_manifest': launch.substitutions.LaunchConfiguration('fault_campaign_manifest')
+                },
                 {
                     'town': launch.substitutions.LaunchConfiguration('town')
                 },
@@ -1,88 +1,91 @@
-import json
 import logging
-from datetime import datetime
+import math
+import numpy as np
 from abc import ABC, abstractmethod
 from carla_ros_bridge.FaultInjector.gnss_data import GNSSData
+from carla_ros_bridge.FaultInjector.FaultLogger import FaultEventLogger, FaultLogBackend
+from carla_ros_bridge.FaultInjector.FaultRegistry import (LOCATION_TOLERANCE, compile_fault_set,
+                                                          get_grid_cell)
 
 class FaultInjector(ABC):
-    def __init__(self, sensor_name, config_file=None):
-        """
-        Initialize the FaultInjector with faults specific to the given sensor.
 
-        :param config_file: Path to the fault configuration file.
-        :type config_file: str
-        :param sensor_name: Name of the sensor (e.g., "IMUSensor").
-        :type sensor_name: str
+    def __init__(self, sensor_name, sensor_uid=None):
         """
-        # Set up logging
-        log_file_name = f"/tmp/sensor_faultInjection_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-
-        self.logger = logging.getLogger(f"FaultInjector-{sensor_name}")
-        self.logger.setLevel(logging.DEBUG)
+        Initialize the FaultInjector of a sensor without faults.
 
-        file_handler = logging.FileHandler(log_file_name)
-        file_handler.setLevel(logging.DEBUG)
-        
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
+        The faults are handed over by the FaultRegistry of the bridge (see set_fault_set()).
 
-        self.logger.addHandler(file_handler)
+        :param sensor_name: Name of the sensor (e.g., "IMUSensor").
+        :type sensor_name: str
+        :param sensor_uid: Unique id of the sensor actor, written to the fault log and
+            combined with the seed of the random faults.
+        :type sensor_uid: int
+        """
+        # Set up logging, the records are written asynchronously (see FaultLogBackend). There
+        # is one logger per sensor type (loggers are never released, sensors are respawned with
+        # new uids), the records carry the uid of the sensor.
+        logger = logging.getLogger(f"FaultInjector-{sensor_name}")
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        if not logger.handlers:
+            logger.addHandler(FaultLogBackend.get_handler())
+        self.logger = logging.LoggerAdapter(logger, {"sensor_uid": sensor_uid})
+        self.event_logger = FaultEventLogger(logger, sensor_name, sensor_uid)
+        self.frame = None
 
-        # Initialize faults
-        self.skip_message = False
         self.sensor_name = sensor_name
-        self.faults = []
-        self.active_faults = []
-
-        # Load faults if a configuration file is provided
-        if config_file:
-            self._load_faults(config_file)
-        else:
-            self.logger.info(f"No fault configuration file provided for {sensor_name}. Fault injection disabled.")
-
-        # with open(config_file, 'r') as f:
-        #     all_faults = json.load(f)
-        
-        # self.faults = []
-        # for fault_entry in all_faults:
-        #     if fault_entry['sensor'] == sensor_name:
-        #         self.faults.extend(fault_entry['faults'])
-        
-        # self.active_faults = []  # List of active faults with activation timestamps
-        # self.logger.info(f"Initialized FaultInjector for {sensor_name} with {len(self.faults)} faults.")
+        self.sensor_uid = sensor_uid
 
-    def check_and_trigger_faults(self, timestamp, carla_location):
-        """
-        Check if any faults should be triggered based on the current GNSS location.
+        # the compiled faults handed over by the registry and the fault set in use by the
+        # sensor callback, see set_fault_set()
+        self.fault_set = compile_fault_set(sensor_name, [])
+        self.active_fault_set = None
+        self._activate_fault_set(self.fault_set)
 
-        :param sensor: The sensor instance.
-        :param timestamp: The current timestamp.
+    def check_and_trigger_faults(self, timestamp, carla_location, frame=None):
         """
-        #log carla_location
-
-        # current_location = GNSSData.get_location()
-        # if not current_location:
-        #     self.logger.warning("No GNSS location available. Skipping fault trigger check.")
-        #     return
-        # Log the current GNSS location
-        #self.logger.info(f"Current GNSS location: {current_location} at timestamp {timestamp}.")
+        Check if any faults should be triggered based on the current time and location.
 
-        # Check and trigger new faults
-        for fault in self.faults:
-            self.logger.info(f"Carla location: {carla_location} at timestamp {timestamp}.")
-            #self.logger.info(f"Checking Fault: {json.dumps(fault, indent=2)}")  # Properly format fault details
-            #self.logger.info(f"Fault Trigger: {json.dumps(fault.get('trigger', {}), indent=2)}")  # Properly format trigger details
+        Only the time triggers that are due and the location triggers of the grid cells
+        around the current location are checked. Faults that are already active are not
+        triggered again.
 
-            if self._is_triggered(fault, timestamp, carla_location):
+        :param timestamp: The current timestamp.
+        :param carla_location: The current location of the sensor.
+        :param frame: The frame of the sensor data.
+        """
+        fault_set = self.fault_set
+        if fault_set is not self.active_fault_set:
+            self._activate_fault_set(fault_set)
+
+        self.frame = frame
+        # index of the triggered faults -> distance to the trigger location
+        triggered = {}
+        time_triggers = fault_set.time_triggers
+        while self._next_time_trigger < len(time_triggers) and \
+                time_triggers[self._next_time_trigger][0] <= timestamp:
+            triggered[time_triggers[self._next_time_trigger][1]] = None
+            self._next_time_trigger += 1
+        if fault_set.location_grid:
+            triggered.update(self._get_triggered_locations(fault_set, carla_location))
+
+        if triggered:
+            active = {active_fault["index"] for active_fault in self.active_faults}
+            for index in sorted(triggered.keys() - active):
+                fault = fault_set.faults[index]
                 self.active_faults.append({
                     "fault": fault,
+                    "index": index,
                     "activation_time": timestamp
                 })
-                self.logger.info(f"Triggered fault: {fault['name']} at timestamp {timestamp}.")
+                self.fault_activations.append((fault['name'], index, timestamp))
+                self.event_logger.log_event("triggered", index, fault['name'], frame, timestamp,
+                                            triggered[index])
 
         # Remove expired faults
-        self._remove_expired_faults(timestamp)
-        self.update_skip_message_flag() 
+        if self.active_faults:
+            self._remove_expired_faults(timestamp)
+        self.update_skip_message_flag()
 
     @abstractmethod
     def apply_faults(self, sensor_data):
@@ -107,104 +110,81 @@ class FaultInjector(ABC):
 
         :param timestamp: The current timestamp.
         """
-        before_count = len(self.active_faults)
-        # self.active_faults = [
-        #     active_fault for active_fault in self.active_faults
-        #     if timestamp - active_fault["activation_time"] < active_fault["fault"].get("duration", float("inf"))
-        # ]
-        self.active_faults = [
-            active_fault for active_fault in self.active_faults
-            if (
-                active_fault["fault"].get("duration", float("inf")) == 0 or
-                timestamp - active_fault["activation_time"] < active_fault["fault"].get("duration", float("inf"))
-            )
-        ]
-        expired_count = before_count - len(self.active_faults)
-        if expired_count > 0:
-            self.logger.info(f"Removed {expired_count} expired faults at timestamp {timestamp}.")
-
-    def _is_triggered(self, fault, timestamp, location):
-        """
-        Check if the fault should be triggered based on time or location.
-
-        :param fault: The fault configuration.
-        :param timestamp: The current timestamp.
-        :param location: The current GNSS location.
-        :return: True if the fault should be triggered, False otherwise.
+        active_faults = []
+        for active_fault in self.active_faults:
+            duration = active_fault["fault"].get("duration", float("inf"))
+            if duration == 0 or timestamp - active_fault["activation_time"] < duration:
+                active_faults.append(active_fault)
+            else:
+                self.event_logger.log_event("expired", active_fault["index"],
+                                            active_fault["fault"]["name"], self.frame, timestamp)
+        self.active_faults = active_faults
+
+    def log_fault_applied(self, active_fault):
         """
-        if 'time' in fault['trigger'] and fault['trigger']['time'] <= timestamp:
-            return True
-        if 'location' in fault['trigger'] and self._is_within_location(fault['trigger']['location'], location):
-            return True
-        return False
+        Count (and log, if enabled) the application of an active fault to a sensor sample.
 
-    def _is_within_location(self, fault_location, current_location, tolerance=1.0):
+        :param active_fault: The active fault.
+        :type active_fault: dict
         """
-        Check if the current Carla location is approximately within the fault trigger location.
+        self.event_logger.log_event("applied", active_fault["index"], active_fault["fault"]["name"],
+                                    self.frame)
 
-        :param fault_location: The location specified in the fault trigger (x, y, z).
+    def _get_triggered_locations(self, fault_set, current_location):
+        """
+        Get the faults with a location trigger within LOCATION_TOLERANCE of the current location.
+
+        :param fault_set: The compiled faults.
+        :type fault_set: CompiledFaultSet
         :param current_location: The current Carla location (x, y, z).
-        :param tolerance: The maximum distance allowed for a match (default: 0.5 meters).
-        :return: True if the current location is within the tolerance of the fault location, False otherwise.
-        """
-        # Log the fault location and current location
-        self.logger.info(f"Fault location: {fault_location}, Current location: {current_location}")
-
-        try:
-            # Calculate the Euclidean distance between the fault location and the current location
-            distance = ((fault_location['x'] - current_location.x) ** 2 +
-                        (fault_location['y'] - current_location.y) ** 2 +
-                        (fault_location['z'] - current_location.z) ** 2) ** 0.5
-
-            # Log the calculated distance
-            self.logger.info(f"Distance between fault location and current location: {distance:.3f} meters")
-
-            # Check if the distance is within the tolerance
-            result = distance <= tolerance
-            if result:
-                self.logger.info(f"Location match successful: {fault_location} within {tolerance} meters of {current_location}")
-            self.logger.info(f"Location match result: {result} (tolerance: {tolerance} meters)")
-            return result
-        except KeyError as e:
-            self.logger.error(f"KeyError in fault location or current location: {e}")
-            return False
-    
-    def _load_faults(self, config_file):
-        """
-        Load faults from the specified configuration file.
-
-        :param config_file: Path to the fault configuration file.
-        :type config_file: str
-        """
-        
-        with open(config_file, 'r') as f:
-            all_faults = json.load(f)
-
-        self.faults = []
-        self.active_faults = []
-        self.skip_message = False
-        for fault_entry in all_faults:
-            print("Fault Sensor: ", fault_entry['sensor'])
-            if fault_entry['sensor'] == self.sensor_name:
-                self.faults.extend(fault_entry['faults'])
+        :return: The indices of the triggered faults and their distance to the trigger location.
+        :rtype: dict
+        """
+        x, y, z = current_location.x, current_location.y, current_location.z
+        cell_x, cell_y, cell_z = get_grid_cell(x, y, z)
+        squared_tolerance = LOCATION_TOLERANCE ** 2
+        triggered = {}
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for dz in (-1, 0, 1):
+                    cell = (cell_x + dx, cell_y + dy, cell_z + dz)
+                    for index in fault_set.location_grid.get(cell, ()):
+                        fault_x, fault_y, fault_z = fault_set.trigger_locations[index]
+                        squared_distance = \
+                            (fault_x - x) ** 2 + (fault_y - y) ** 2 + (fault_z - z) ** 2
+                        if squared_distance <= squared_tolerance:
+                            triggered[index] = round(math.sqrt(squared_distance), 3)
+        return triggered
+
+    def set_fault_set(self, fault_set):
+        """
+        Hand over new compiled faults (called by the FaultRegistry).
+
+        Only the reference is replaced. The sensor callback takes the new faults over with
+        the next sensor sample (see check_and_trigger_faults()), so it never sees a partially
+        loaded configuration.
 
-        self.active_faults = []  # Reset active faults
-        self.logger.info(f"Loaded {len(self.faults)} faults from {config_file}.")
+        :param fault_set: The compiled faults of this sensor type.
+        :type fault_set: CompiledFaultSet
+        """
+        self.fault_set = fault_set
 
-    def reload_faults(self, new_file):
+    def _activate_fault_set(self, fault_set):
         """
-        Reload faults from a new configuration file.
+        Reset the state of the fault injection for new compiled faults.
 
-        :param new_file: Path to the new fault configuration file.
-        :type new_file: str
+        :param fault_set: The compiled faults of this sensor type.
+        :type fault_set: CompiledFaultSet
         """
-        
-        # TO CHANGE FOR THE MOMENT THE FILE IS HARDCODED
-        new_file = '/tum/src/carla/ros-bridge/carla_ros_bridge/src/carla_ros_bridge/FaultInjector/ProjectConfigFiles/' + new_file
-        
-        self.faults = []
+        self.active_fault_set = fault_set
+        self._next_time_trigger = 0
         self.active_faults = []
         self.skip_message = False
-        
-        print("Reloading faults from file: ", new_file)
-        self._load_faults(new_file)
\ No newline at end of file
+        # faults triggered since the faults were loaded (name, index and activation time)
+        self.fault_activations = []
+        self.event_logger.reset()
+        # random generator of this sensor, restarted whenever faults are loaded
+        seed = None if fault_set.seed is None else [fault_set.seed, self.sensor_uid or 0]
+        self.rng = np.random.default_rng(seed)
+        if fault_set.source is not None:
+            self.logger.info(f"Loaded {len(fault_set.faults)} faults from {fault_set.source}.")
@@ -0,0 +1,219 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+class RingBufferQueue(queue.Queue):
+    """
+    Queue with a fixed capacity that drops the oldest record instead of blocking the writer.
+
+    The sensor callbacks must never wait for the log file, so if the listener thread falls
+    behind, the oldest records are discarded and counted in dropped_records.
+    """
+
+    def __init__(self, capacity):
+        """
+        :param capacity: Maximum number of buffered records.
+        :type capacity: int
+        """
+        self.capacity = capacity
+        self.dropped_records = 0
+        super().__init__()
+
+    def _init(self, maxsize):
+        self.queue = deque(maxlen=self.capacity)
+
+    def _put(self, item):
+        if len(self.queue) == self.capacity:
+            self.dropped_records += 1
+        self.queue.append(item)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Format log records as one JSON object per line.
+
+    Fault events (see FaultEventLogger.log_event()) carry their fields in record.fault_event,
+    other records are written with their level, message and the sensor uid of the fault
+    injector (record.sensor_uid, if set).
+    """
+
+    def format(self, record):
+        entry = {"time": round(record.created, 6), "logger": record.name}
+        fault_event = getattr(record, "fault_event", None)
+        if fault_event is not None:
+            entry.update(fault_event)
+        else:
+            entry["level"] = record.levelname
+            entry["message"] = record.getMessage()
+            if hasattr(record, "sensor_uid"):
+                entry["sensor_uid"] = record.sensor_uid
+        return json.dumps(entry, separators=(",", ":"))
+
+
+class FaultLogBackend:
+    """
+    Process wide asynchronous backend of the fault injection logs.
+
+    The loggers of the fault injectors only put their records into a ring buffer
+    (QueueHandler). A QueueListener thread formats them and writes them to a JSON lines
+    file, so no disk I/O happens in the sensor callbacks.
+    """
+
+    # configuration, see configure_fault_logging()
+    log_samples = True
+    min_interval = 1.0
+    capacity = 10000
+
+    _lock = threading.Lock()
+    _queue = None
+    _listener = None
+    log_file_name = None
+
+    @classmethod
+    def get_handler(cls):
+        """
+        Get a handler that forwards records to the backend, starting the backend if necessary.
+
+        :return: The queue handler.
+        :rtype: logging.handlers.QueueHandler
+        """
+        with cls._lock:
+            if cls._queue is None:
+                cls._queue = RingBufferQueue(cls.capacity)
+                atexit.register(cls.stop)
+            if cls._listener is None:
+                cls.log_file_name = "/tmp/sensor_faultInjection_logs_{}.jsonl".format(
+                    datetime.now().strftime('%Y%m%d_%H%M%S'))
+                file_handler = logging.FileHandler(cls.log_file_name)
+                file_handler.setFormatter(JsonLinesFormatter())
+                cls._listener = logging.handlers.QueueListener(cls._queue, file_handler)
+                cls._listener.start()
+            return logging.handlers.QueueHandler(cls._queue)
+
+    @classmethod
+    def stop(cls):
+        """
+        Write the buffered records and stop the listener thread.
+
+        The ring buffer is kept, get_handler() starts a new listener on it.
+        """
+        with cls._lock:
+            if cls._listener is None:
+                return
+            cls._listener.stop()
+            for handler in cls._listener.handlers:
+                handler.close()
+            cls._listener = None
+
+    @classmethod
+    def dropped_records(cls):
+        """
+        :return: Number of records discarded because the ring buffer was full.
+        :rtype: int
+        """
+        return cls._queue.dropped_records if cls._queue is not None else 0
+
+
+def configure_fault_logging(log_samples=True, min_interval=1.0, capacity=10000):
+    """
+    Configure the fault injection logs. Must be called before the fault injectors are created.
+
+    :param log_samples: If False, the faults applied to each sensor sample are only counted
+        (see FaultEventLogger.event_counts) and not written to the log.
+    :type log_samples: bool
+    :param min_interval: Minimum wall time [s] between two records of the same fault and event.
+        Records within the interval are counted and reported with the next record.
+    :type min_interval: float
+    :param capacity: Number of records buffered for the listener thread.
+    :type capacity: int
+    """
+    FaultLogBackend.log_samples = bool(log_samples)
+    FaultLogBackend.min_interval = float(min_interval)
+    FaultLogBackend.capacity = max(1, int(capacity))
+
+
+class FaultEventLogger:
+    """
+    Rate limited, structured logging of the fault events of one fault injector.
+
+    Every event is counted. A record is written at most once per min_interval for each fault
+    and event, the number of suppressed events is added to the next record.
+    """
+
+    # events that occur for every sensor sample while a fault is active
+    SAMPLE_EVENTS = ("applied",)
+
+    def __init__(self, logger, sensor_name, sensor_uid=None):
+        """
+        :param logger: The logger of the fault injector.
+        :type logger: logging.Logger
+        :param sensor_name: Name of the sensor (e.g., "IMUSensor").
+        :type sensor_name: str
+        :param sensor_uid: Unique id of the sensor actor.
+        :type sensor_uid: int
+        """
+        self.logger = logger
+        self.sensor_name = sensor_name
+        self.sensor_uid = sensor_uid
+        self.event_counts = {}
+        self._last_record_time = {}
+        self._suppressed = {}
+
+    def reset(self):
+        """
+        Reset the counts, e.g. when new faults are loaded.
+        """
+        self.event_counts = {}
+        self._last_record_time = {}
+        self._suppressed = {}
+
+    def log_event(self, event, fault_id, fault_name, frame=None, timestamp=None,
+                  trigger_distance=None):
+        """
+        Count a fault event and write it to the log unless it is rate limited.
+
+        :param event: The event ("triggered", "expired" or "applied").
+        :type event: str
+        :param fault_id: Index of the fault within the faults of the sensor.
+        :type fault_id: int
+        :param fault_name: Name of the fault.
+        :type fault_name: str
+        :param frame: The frame of the sensor data.
+        :type frame: int
+        :param timestamp: The timestamp of the sensor data.
+        :type timestamp: float
+        :param trigger_distance: Distance to the trigger location, None for time triggers.
+        :type trigger_distance: float
+        """
+        key = (fault_id, event)
+        count = self.event_counts.get(key, 0) + 1
+        self.event_counts[key] = count
+
+        if event in self.SAMPLE_EVENTS and not FaultLogBackend.log_samples:
+            return
+        now = time.monotonic()
+        last_record_time = self._last_record_time.get(key)
+        if last_record_time is not None and now - last_record_time < FaultLogBackend.min_interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return
+        self._last_record_time[key] = now
+
+        self.logger.info(event, extra={"fault_event": {
+            "event": event,
+            "fault_id": fault_id,
+            "fault": fault_name,
+            "sensor": self.sensor_name,
+            "sensor_uid": self.sensor_uid,
+            "frame": frame,
+            "timestamp": timestamp,
+            "trigger_distance": trigger_distance,
+            "count": count,
+            "suppressed": self._suppressed.pop(key, 0)
+        }})
@@ -0,0 +1,248 @@
+import collections
+import json
+import math
+import os
+import threading
+from numbers import Number
+
+# maximum distance [m] between the sensor and a location trigger to trigger the fault,
+# also the cell size of the location grid
+LOCATION_TOLERANCE = 1.0
+
+# directories searched for fault files if no search path is configured
+DEFAULT_FAULT_FILE_PATH = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "ProjectConfigFiles"),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "FaultConfigFiles")
+]
+
+# The faults of one sensor type, compiled for a fast check per sensor sample. A fault set is
+# never modified, loading a configuration creates new fault sets.
+#
+# faults: tuple of the fault dicts (must not be modified)
+# time_triggers: tuple of (trigger time, fault index), sorted by the trigger time
+# location_grid: dict of grid cell (see get_grid_cell()) -> tuple of fault indices
+# trigger_locations: dict of fault index -> (x, y, z) of the location trigger
+# seed: seed of the random faults (combined with the sensor uid), None for unpredictable
+# source: the configuration file
+CompiledFaultSet = collections.namedtuple(
+    "CompiledFaultSet",
+    ["sensor_name", "faults", "time_triggers", "location_grid", "trigger_locations", "seed",
+     "source"])
+
+
+def get_grid_cell(x, y, z):
+    """
+    Get the cell of the location grid that contains a location.
+
+    :return: The cell index (x, y, z).
+    :rtype: tuple
+    """
+    return (math.floor(x / LOCATION_TOLERANCE),
+            math.floor(y / LOCATION_TOLERANCE),
+            math.floor(z / LOCATION_TOLERANCE))
+
+
+def compile_fault_set(sensor_name, faults, seed=None, time_offset=0.0, source=None):
+    """
+    Compile the faults of a sensor type.
+
+    Time triggers are sorted by the trigger time. Location triggers are sorted into a grid
+    with a cell size of LOCATION_TOLERANCE, so that a sample only has to check the faults
+    of the neighbouring cells.
+
+    :param sensor_name: Name of the sensor type (e.g., "IMUSensor").
+    :type sensor_name: str
+    :param faults: The validated faults of the sensor type.
+    :type faults: list
+    :param seed: Seed of the random faults, None (or negative) for an unpredictable seed.
+    :type seed: int
+    :param time_offset: Offset [s] added to the time triggers.
+    :type time_offset: float
+    :param source: The configuration file.
+    :type source: str
+    :return: The compiled fault set.
+    :rtype: CompiledFaultSet
+    """
+    time_triggers = []
+    location_grid = collections.defaultdict(list)
+    trigger_locations = {}
+    for index, fault in enumerate(faults):
+        trigger = fault.get('trigger', {})
+        if 'time' in trigger:
+            time_triggers.append((float(trigger['time']) + time_offset, index))
+        if 'location' in trigger:
+            location = (float(trigger['location']['x']),
+                        float(trigger['location']['y']),
+                        float(trigger['location']['z']))
+            trigger_locations[index] = location
+            location_grid[get_grid_cell(*location)].append(index)
+
+    return CompiledFaultSet(
+        sensor_name=sensor_name,
+        faults=tuple(faults),
+        time_triggers=tuple(sorted(time_triggers)),
+        location_grid={cell: tuple(indices) for cell, indices in location_grid.items()},
+        trigger_locations=trigger_locations,
+        seed=None if seed is None or seed < 0 else seed,
+        source=source)
+
+
+def validate_fault_configuration(configuration):
+    """
+    Validate a parsed fault configuration and group the faults by sensor type.
+
+    :param configuration: The content of a fault configuration file.
+    :type configuration: list
+    :return: The faults of each sensor type.
+    :rtype: dict
+    :raises ValueError: if the configuration is invalid
+    """
+    if not isinstance(configuration, list):
+        raise ValueError("The fault configuration must be a list of sensor entries.")
+    faults_by_sensor = collections.defaultdict(list)
+    for fault_entry in configuration:
+        if not isinstance(fault_entry, dict) or not isinstance(fault_entry.get('sensor'), str) or \
+                not isinstance(fault_entry.get('faults'), list):
+            raise ValueError("Each sensor entry needs a 'sensor' name and a list of 'faults'.")
+        for fault in fault_entry['faults']:
+            _validate_fault(fault_entry['sensor'], fault)
+            faults_by_sensor[fault_entry['sensor']].append(fault)
+    return dict(faults_by_sensor)
+
+
+def _validate_fault(sensor_name, fault):
+    if not isinstance(fault, dict) or not isinstance(fault.get('name'), str):
+        raise ValueError(f"Fault of {sensor_name} without a 'name'.")
+    name = fault['name']
+    trigger = fault.get('trigger', {})
+    if not isinstance(trigger, dict):
+        raise ValueError(f"Invalid trigger of fault {name} of {sensor_name}.")
+    if 'time' in trigger and not isinstance(trigger['time'], Number):
+        raise ValueError(f"Invalid time trigger of fault {name} of {sensor_name}.")
+    if 'location' in trigger:
+        location = trigger['location']
+        if not isinstance(location, dict) or \
+                not all(isinstance(location.get(axis), Number) for axis in ('x', 'y', 'z')):
+            raise ValueError(f"Location trigger of fault {name} of {sensor_name} needs x, y and z.")
+    if not isinstance(fault.get('parameters', {}), dict):
+        raise ValueError(f"Invalid parameters of fault {name} of {sensor_name}.")
+    duration = fault.get('duration', 0)
+    if not isinstance(duration, Number) or duration < 0:
+        raise ValueError(f"Invalid duration of fault {name} of {sensor_name}.")
+
+
+class FaultRegistry:
+    """
+    Central fault configuration of the bridge.
+
+    A configuration file is read, parsed and validated once, compiled per sensor type and
+    the compiled fault sets are handed to all registered fault injectors. The injectors only
+    replace a reference (see FaultInjector.set_fault_set()), so a new configuration never
+    leaves them in a partially loaded state while the sensor callbacks are running.
+    """
+
+    def __init__(self, search_path=None, seed=None):
+        """
+        :param search_path: Directories searched for relative fault file names,
+            None for DEFAULT_FAULT_FILE_PATH.
+        :type search_path: list
+        :param seed: Default seed of the random faults, None (or negative) for an
+            unpredictable seed.
+        :type seed: int
+        """
+        self.search_path = list(search_path) if search_path else list(DEFAULT_FAULT_FILE_PATH)
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._injectors = []
+        self._fault_sets = {}
+        self.source = None
+
+    @property
+    def injectors(self):
+        """
+        :return: The registered fault injectors.
+        :rtype: list
+        """
+        with self._lock:
+            return list(self._injectors)
+
+    def find_fault_file(self, fault_file, directories=()):
+        """
+        Get the path of a fault file.
+
+        :param fault_file: Absolute path or name of the fault file.
+        :type fault_file: str
+        :param directories: Directories searched before the search path.
+        :type directories: list
+        :return: The path of the fault file.
+        :rtype: str
+        :raises IOError: if the file is not found
+        """
+        if os.path.isabs(fault_file):
+            return fault_file
+        search_path = list(directories) + self.search_path
+        for directory in search_path:
+            path = os.path.join(directory, fault_file)
+            if os.path.exists(path):
+                return path
+        raise IOError(f"Fault file '{fault_file}' not found in {search_path}")
+
+    def load(self, fault_file, seed=None, time_offset=0.0):
+        """
+        Load a fault configuration and hand it to all registered fault injectors.
+
+        :param fault_file: Absolute path or name of the fault file (see find_fault_file()).
+        :type fault_file: str
+        :param seed: Seed of the random faults, None for the default seed of the registry.
+        :type seed: int
+        :param time_offset: Offset [s] added to the time triggers, e.g. the start time of
+            a campaign run.
+        :type time_offset: float
+        :return: The path of the loaded fault file.
+        :rtype: str
+        :raises IOError, ValueError: if the file can not be read or is invalid
+        """
+        path = self.find_fault_file(fault_file)
+        with open(path, 'r') as f:
+            faults_by_sensor = validate_fault_configuration(json.load(f))
+        if seed is None:
+            seed = self.seed
+        fault_sets = {sensor_name: compile_fault_set(sensor_name, faults, seed, time_offset, path)
+                      for sensor_name, faults in faults_by_sensor.items()}
+
+        with self._lock:
+            self._fault_sets = fault_sets
+            self.source = path
+            for injector in self._injectors:
+                injector.set_fault_set(self._get_fault_set(injector.sensor_name))
+        return path
+
+    def register(self, injector):
+        """
+        Register a fault injector and hand it the faults of its sensor type.
+
+        :param injector: The fault injector.
+        :type injector: carla_ros_bridge.FaultInjector.FaultInjector.FaultInjector
+        """
+        with self._lock:
+            self._injectors.append(injector)
+            injector.set_fault_set(self._get_fault_set(injector.sensor_name))
+
+    def unregister(self, injector):
+        """
+        Unregister a fault injector, e.g. when its sensor is destroyed.
+
+        :param injector: The fault injector.
+        :type injector: carla_ros_bridge.FaultInjector.FaultInjector.FaultInjector
+        """
+        with self._lock:
+            if injector in self._injectors:
+                self._injectors.remove(injector)
+
+    def _get_fault_set(self, sensor_name):
+        fault_set = self._fault_sets.get(sensor_name)
+        if fault_set is None:
+            # sensor types without faults share one empty fault set
+            fault_set = compile_fault_set(sensor_name, [], self.seed, source=self.source)
+            self._fault_sets[sensor_name] = fault_set
+        return fault_set
@@ -2,8 +2,8 @@ import numpy as np
 from carla_ros_bridge.FaultInjector.FaultInjector import FaultInjector
 
 class GNSSFaultInjector(FaultInjector):
-    def __init__(self, config_file=None):
-        super().__init__("GNSSSensor", config_file)
+    def __init__(self, sensor_uid=None):
+        super().__init__("GNSSSensor", sensor_uid)
 
     def apply_faults(self, sensor_data):
         """
@@ -11,10 +11,8 @@ class GNSSFaultInjector(FaultInjector):
         """
         try:
             for active_fault in self.active_faults:
-                fault = active_fault["fault"] 
-                # Log sensor data before applying faults
-                self.logger.info("GNSS Sensor data before applying faults: %s", sensor_data)
-                self.logger.info(f"Applying fault: {fault['name']} with parameters: {fault['parameters']}")
+                fault = active_fault["fault"]
+                self.log_fault_applied(active_fault)
                 if fault['name'] == 'bias':
                     sensor_data = self._apply_bias(sensor_data, fault)
                 elif fault['name'] == 'signal_loss':
@@ -23,9 +21,6 @@ class GNSSFaultInjector(FaultInjector):
                     sensor_data = self._apply_zero_value(sensor_data, fault)
                 elif fault['name'] == 'noise':
                     sensor_data = self._apply_noise(sensor_data, fault)
-            
-                # Log sensor data after applying faults
-                self.logger.info("GNSS Sensor data after applying faults: %s", sensor_data)
 
             return sensor_data
         except Exception as e:
@@ -57,13 +52,9 @@ class GNSSFaultInjector(FaultInjector):
         Simulate a "0 value" fault by setting GNSS data to zero.
         """
         try:
-            # Log sensor data before applying zero value fault
-            self.logger.info("GNSS Sensor data before applying zero value fault: %s", sensor_data)
             sensor_data.latitude = 0.0
             sensor_data.longitude = 0.0
             sensor_data.altitude = 0.0
-            # Log sensor data after applying zero value fault
-            self.logger.info("GNSS Sensor data after applying zero value fault: %s", sensor_data)
             return sensor_data
         except Exception as e:
             self.logger.error(f"Error applying zero value fault: {e}")
@@ -80,9 +71,9 @@ class GNSSFaultInjector(FaultInjector):
                 "altitude": 0.2
             })
             # Add noise to latitude, longitude, and altitude
-            sensor_data.latitude += np.random.normal(0, noise_stddev.get("latitude", 0.00002))
-            sensor_data.longitude += np.random.normal(0, noise_stddev.get("longitude", 0.00002))
-            sensor_data.altitude += np.random.normal(0, noise_stddev.get("altitude", 0.2))
+            sensor_data.latitude += self.rng.normal(0, noise_stddev.get("latitude", 0.00002))
+            sensor_data.longitude += self.rng.normal(0, noise_stddev.get("longitude", 0.00002))
+            sensor_data.altitude += self.rng.normal(0, noise_stddev.get("altitude", 0.2))
             return sensor_data
         except Exception as e:
             self.logger.error(f"Error applying noise to GNSS data: {e}")
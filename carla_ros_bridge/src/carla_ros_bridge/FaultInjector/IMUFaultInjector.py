@@ -5,8 +5,8 @@ from transforms3d.euler import euler2mat
 import math
 
 class IMUFaultInjector(FaultInjector):
-    def __init__(self, config_file=None):
-        super().__init__("IMUSensor", config_file)
+    def __init__(self, sensor_uid=None):
+        super().__init__("IMUSensor", sensor_uid)
 
     def apply_faults(self, sensor_data):
         """
@@ -14,11 +14,8 @@ class IMUFaultInjector(FaultInjector):
         """
         try:
             for active_fault in self.active_faults:
-                fault = active_fault["fault"] 
-                # Log sensor data before applying faults
-                self.logger.info("IMU Sensor data before applying faults: %s", sensor_data)
-
-                self.logger.info(f"Applying fault: {fault['name']} with parameters: {fault['parameters']}")
+                fault = active_fault["fault"]
+                self.log_fault_applied(active_fault)
                 if fault['name'] == 'bias':
                     sensor_data = self._apply_bias(sensor_data, fault)
                 elif fault['name'] == 'noise':
@@ -44,8 +41,6 @@ class IMUFaultInjector(FaultInjector):
                 elif fault['name'] == 'accelerometer_bias':
                     sensor_data = self._apply_accelerometer_bias(sensor_data, fault)
 
-                # Log sensor data after applying faults
-                self.logger.info("IMU Sensor data after applying faults: %s", sensor_data)
                 return sensor_data    
             
             return sensor_data
@@ -65,14 +60,14 @@ class IMUFaultInjector(FaultInjector):
             })
 
             # Add noise to angular velocity
-            sensor_data.angular_velocity.x += np.random.normal(0, noise_stddev.get("x", 0.01))
-            sensor_data.angular_velocity.y += np.random.normal(0, noise_stddev.get("y", 0.01))
-            sensor_data.angular_velocity.z += np.random.normal(0, noise_stddev.get("z", 0.01))
+            sensor_data.angular_velocity.x += self.rng.normal(0, noise_stddev.get("x", 0.01))
+            sensor_data.angular_velocity.y += self.rng.normal(0, noise_stddev.get("y", 0.01))
+            sensor_data.angular_velocity.z += self.rng.normal(0, noise_stddev.get("z", 0.01))
 
             # Add noise to linear acceleration
-            sensor_data.linear_acceleration.x += np.random.normal(0, noise_stddev.get("x", 0.01))
-            sensor_data.linear_acceleration.y += np.random.normal(0, noise_stddev.get("y", 0.01))
-            sensor_data.linear_acceleration.z += np.random.normal(0, noise_stddev.get("z", 0.01))
+            sensor_data.linear_acceleration.x += self.rng.normal(0, noise_stddev.get("x", 0.01))
+            sensor_data.linear_acceleration.y += self.rng.normal(0, noise_stddev.get("y", 0.01))
+            sensor_data.linear_acceleration.z += self.rng.normal(0, noise_stddev.get("z", 0.01))
 
             return sensor_data
         except Exception as e:
@@ -104,12 +99,6 @@ class IMUFaultInjector(FaultInjector):
             else:
                 raise ValueError(f"Invalid axis '{axis}' specified in fault configuration. Must be 'x', 'y', or 'z'.")
 
-            # Log the rotation being applied
-            self.logger.info(f"Applying rotation: axis={axis}, angle={angle_degrees} degrees (radians: {angle_radians})")
-
-            # Log the original orientation
-            self.logger.info(f"Original orientation: w={sensor_data.orientation.w}, x={sensor_data.orientation.x}, y={sensor_data.orientation.y}, z={sensor_data.orientation.z}")
-
             # Convert the current orientation quaternion to a rotation matrix
             current_quat = [
                 sensor_data.orientation.w,
@@ -131,9 +120,6 @@ class IMUFaultInjector(FaultInjector):
             sensor_data.orientation.y = combined_quat[2]
             sensor_data.orientation.z = combined_quat[3]
 
-            # Log the new orientation
-            self.logger.info(f"New orientation after rotation: w={sensor_data.orientation.w}, x={sensor_data.orientation.x}, y={sensor_data.orientation.y}, z={sensor_data.orientation.z}")
-
             return sensor_data
         except Exception as e:
             self.logger.error(f"Error applying rotation: {e}")
@@ -168,9 +154,6 @@ class IMUFaultInjector(FaultInjector):
             if not (0.0 < reduction_factor < 1.0):
                 raise ValueError("Reduction factor must be between 0 and 1.")
 
-            # Log the reduction being applied
-            self.logger.info(f"Applying velocity reduction with factor: {reduction_factor}")
-
             # Scale down angular velocity
             sensor_data.angular_velocity.x *= reduction_factor
             sensor_data.angular_velocity.y *= reduction_factor
@@ -181,10 +164,6 @@ class IMUFaultInjector(FaultInjector):
             sensor_data.linear_acceleration.y *= reduction_factor
             sensor_data.linear_acceleration.z *= reduction_factor
 
-            # Log the modified sensor data
-            self.logger.info(f"Reduced angular velocity: {sensor_data.angular_velocity}")
-            self.logger.info(f"Reduced linear acceleration: {sensor_data.linear_acceleration}")
-
             return sensor_data
         except Exception as e:
             self.logger.error(f"Error applying velocity reduction: {e}")
@@ -197,7 +176,7 @@ class IMUFaultInjector(FaultInjector):
         try:
             noise_stddev = fault.get('parameters', {}).get('noise_stddev', 0.01)  # radians
             # Generate small random rotation angles
-            noise_angles = np.random.normal(0, noise_stddev, 3)
+            noise_angles = self.rng.normal(0, noise_stddev, 3)
             noise_rot = euler2mat(*noise_angles, axes='sxyz')
             # Convert current quaternion to rotation matrix
             current_quat = [
@@ -264,9 +243,9 @@ class IMUFaultInjector(FaultInjector):
                 "y": 0.01,
                 "z": 0.01
             })
-            sensor_data.angular_velocity.x += np.random.normal(0, noise_stddev.get("x", 0.01))
-            sensor_data.angular_velocity.y += np.random.normal(0, noise_stddev.get("y", 0.01))
-            sensor_data.angular_velocity.z += np.random.normal(0, noise_stddev.get("z", 0.01))
+            sensor_data.angular_velocity.x += self.rng.normal(0, noise_stddev.get("x", 0.01))
+            sensor_data.angular_velocity.y += self.rng.normal(0, noise_stddev.get("y", 0.01))
+            sensor_data.angular_velocity.z += self.rng.normal(0, noise_stddev.get("z", 0.01))
             return sensor_data
         except Exception as e:
             self.logger.error(f"Error applying gyroscope noise: {e}")
@@ -282,9 +261,9 @@ class IMUFaultInjector(FaultInjector):
                 "y": 0.01,
                 "z": 0.01
             })
-            sensor_data.linear_acceleration.x += np.random.normal(0, noise_stddev.get("x", 0.01))
-            sensor_data.linear_acceleration.y += np.random.normal(0, noise_stddev.get("y", 0.01))
-            sensor_data.linear_acceleration.z += np.random.normal(0, noise_stddev.get("z", 0.01))
+            sensor_data.linear_acceleration.x += self.rng.normal(0, noise_stddev.get("x", 0.01))
+            sensor_data.linear_acceleration.y += self.rng.normal(0, noise_stddev.get("y", 0.01))
+            sensor_data.linear_acceleration.z += self.rng.normal(0, noise_stddev.get("z", 0.01))
             return sensor_data
         except Exception as e:
             self.logger.error(f"Error applying accelerometer noise: {e}")
@@ -1,207 +1,151 @@
 from carla_ros_bridge.FaultInjector.FaultInjector import FaultInjector
 import numpy as np
+from numpy.lib.recfunctions import structured_to_unstructured
+
+# fields of the point cloud that hold the measured position (the other fields,
+# intensity and ring, are not modified by noise and bias)
+POSITION_FIELDS = ['x', 'y', 'z']
+
+# fields of the point cloud that are cleared by the zero_value fault
+MEASUREMENT_FIELDS = ['x', 'y', 'z', 'intensity']
+
 
 class LidarFaultInjector(FaultInjector):
-    def __init__(self, config_file=None):
-        super().__init__("LidarSensor", config_file,)
+    def __init__(self, sensor_uid=None):
+        super().__init__("LidarSensor", sensor_uid)
+        # buffer of the position noise, reused between the point clouds
+        self._noise = np.empty((0, 3), dtype=np.float32)
 
     def apply_faults(self, sensor_data):
         """
         Apply Lidar-specific faults to the sensor data.
+
+        The active faults are combined and applied in one pass to the position fields of the
+        structured point array sensor_data['points'] (modified in place):
+
+        - noise: gaussian noise with the standard deviation noise_level [m], the variances of
+          several noise faults add up
+        - percentage_bias: moves the points bias_percent meters away from the sensor
+        - zero_value: sets the position and intensity of all points to zero (overrides noise
+          and bias)
+        - point_dropout: removes each point with the probability dropout_rate
+
+        noise and percentage_bias remove the points within the ego vehicle box unless
+        filter_ego_vehicle is false. The message level dropout is handled by skip_message.
         """
         try:
+            points = sensor_data['points']
+            if not isinstance(points, np.ndarray) or points.dtype.names is None:
+                raise ValueError("Sensor data is missing point cloud information or is not a structured NumPy array.")
+
+            noise_variance = 0.0
+            bias_distance = 0.0
+            zero_value = False
+            dropout_rate = 0.0
+            ego_vehicle_boxes = []
             for active_fault in self.active_faults:
-                fault = active_fault["fault"] 
-                # Log sensor data before applying faults
-                #self.logger.info("Lidar Sensor data before applying faults: %s", sensor_data)
-                
-                self.logger.info(f"Applying fault: {fault['name']} with parameters: {fault['parameters']}")
-                
+                fault = active_fault["fault"]
+                parameters = fault.get('parameters', {})
+                self.log_fault_applied(active_fault)
+
                 if fault['name'] == 'noise':
-                    sensor_data = self._apply_noise(sensor_data, fault)
-                # elif fault['name'] == 'dropout':
-                #     sensor_data = self._apply_dropout(sensor_data, fault)
-                elif fault['name'] == 'zero_value':
-                    sensor_data = self._apply_zero_value(sensor_data, fault)
+                    noise_variance += parameters.get('noise_level', 0.1) ** 2
                 elif fault['name'] == 'percentage_bias':
-                    sensor_data = self._apply_distance_bias(sensor_data, fault)
-                # Add more Lidar-specific fault types as needed
-            
-            # Log sensor data after applying faults
-            #self.logger.info("Lidar Sensor data after applying faults: %s", sensor_data)
-
-            return sensor_data
-        except Exception as e:
-            self.logger.error(f"Error applying faults to Lidar data: {e}")
-            return sensor_data
+                    bias_distance += parameters.get('bias_percent', 0.5)
+                elif fault['name'] == 'zero_value':
+                    zero_value = True
+                elif fault['name'] == 'point_dropout':
+                    dropout_rate = 1.0 - (1.0 - dropout_rate) * (1.0 - parameters.get('dropout_rate', 0.1))
+                else:
+                    continue
+                if fault['name'] in ('noise', 'percentage_bias') and parameters.get('filter_ego_vehicle', True):
+                    ego_vehicle_boxes.append(parameters.get('vehicle_box', {}))
 
-    def _apply_noise(self, sensor_data, fault):
-        """
-        Add noise to the Lidar point cloud data.
-        """
-        try:
-            if 'points' not in sensor_data or not isinstance(sensor_data['points'], np.ndarray):
-                raise ValueError("Sensor data is missing point cloud information or is not a NumPy array.")
-            noise_level = fault.get('parameters', {}).get('noise_level', 0.1)
-            point_cloud = np.array(sensor_data['points'])  # Assuming sensor_data['points'] is a numpy array
-            
-            if point_cloud.size == 0:
+            if points.size == 0:
                 return sensor_data
 
-            # Optionally filter ego vehicle points
-            filter_ego = fault.get('parameters', {}).get('filter_ego_vehicle', True)
-            if filter_ego:
-                point_cloud = self.filter_ego_vehicle_points(point_cloud, fault)
-
-            
-            noise = np.random.normal(0, noise_level, point_cloud.shape)
-            noisy_points = point_cloud + noise
-            # Ensure correct types: x, y, z, intensity = float32; ring = uint16
-            if noisy_points.shape[1] == 5:
-                noisy_points[:, 0:4] = noisy_points[:, 0:4].astype(np.float32)
-                noisy_points[:, 4] = noisy_points[:, 4].astype(np.uint16)
-            sensor_data['points'] = noisy_points
+            # (N, 3) view of the position fields, so that the faults modify the points in place.
+            # numpy < 1.25 returns a copy for records with further fields (e.g. ring), the
+            # modified positions are then written back below
+            xyz = structured_to_unstructured(points[POSITION_FIELDS], copy=False)
+            is_view = np.shares_memory(xyz, points)
+
+            keep = None
+            for box in ego_vehicle_boxes:
+                outside = self._get_outside_vehicle_box_mask(xyz, box)
+                keep = outside if keep is None else np.logical_and(keep, outside, out=keep)
+            if dropout_rate > 0.0:
+                not_dropped = self.rng.random(len(points), dtype=np.float32) >= dropout_rate
+                keep = not_dropped if keep is None else np.logical_and(keep, not_dropped, out=keep)
+
+            if zero_value:
+                for name in MEASUREMENT_FIELDS:
+                    points[name] = 0.0
+            else:
+                if bias_distance != 0.0:
+                    self._apply_distance_bias(xyz, bias_distance)
+                if noise_variance > 0.0:
+                    self._apply_noise(xyz, np.sqrt(noise_variance))
+                if not is_view and (bias_distance != 0.0 or noise_variance > 0.0):
+                    for index, name in enumerate(POSITION_FIELDS):
+                        points[name] = xyz[:, index]
+
+            if keep is not None and not keep.all():
+                sensor_data['points'] = points[keep]
             return sensor_data
         except Exception as e:
-            self.logger.error(f"Error applying noise: {e}")
+            self.logger.error(f"Error applying faults to Lidar data: {e}")
             return sensor_data
 
-    def _apply_dropout(self, sensor_data, fault):
-        """
-        Simulate data dropout by removing a percentage of points.
-        """
-        try:
-            if 'points' not in sensor_data or not isinstance(sensor_data['points'], np.ndarray):
-                raise ValueError("Sensor data is missing point cloud information or is not a NumPy array.")
-            dropout_rate = fault.get('parameters', {}).get('dropout_rate', 0.1)
-            point_cloud = np.array(sensor_data['points'])
-            mask = np.random.rand(point_cloud.shape[0]) > dropout_rate
-            sensor_data['points'] = point_cloud[mask]
-            return sensor_data
-        except Exception as e:
-            self.logger.error(f"Error applying dropout: {e}")
-            return sensor_data
-        
-    def _apply_zero_value(self, sensor_data, fault):
-        """
-        Simulate a "0 value" fault by clearing the LIDAR point cloud data.
+    def _apply_noise(self, xyz, noise_level):
         """
-        try:
-            self.logger.info("Applying zero value fault to Lidar data.")
-            #self.logger.info("Sensor data before applying zero value fault: %s", sensor_data)
-            sensor_data['points'] = np.zeros_like(sensor_data['points'])
-            #self.logger.info("Lidar Sensor data after applying zero value fault: %s", sensor_data)
-            return sensor_data
-        except Exception as e:
-            self.logger.error(f"Error applying zero value fault: {e}")
-            return sensor_data
-    
-    def _apply_distance_bias(self, sensor_data, fault):
-        """
-        Add a fixed distance (e.g., 10 meters) outward from the origin to each LiDAR point,
-        but do NOT apply to points at (0,0,0).
+        Add gaussian noise to the point positions (in place).
+
+        :param xyz: The point positions.
+        :type xyz: numpy.ndarray of shape (N, 3)
+        :param noise_level: The standard deviation of the noise [m].
+        :type noise_level: float
         """
-        try:
-            self.logger.info("Applying distance bias to LiDAR points.")
+        if len(self._noise) < len(xyz):
+            self._noise = np.empty((len(xyz), 3), dtype=np.float32)
+        noise = self._noise[:len(xyz)]
+        self.rng.standard_normal(dtype=np.float32, out=noise)
+        noise *= np.float32(noise_level)
+        xyz += noise
 
-            points = np.asarray(sensor_data['points'], dtype=np.float32)
-            if points.size == 0:
-                return sensor_data
-            
-            #points = self.filter_nearby_points(points, min_radius=1.8)
-            filter_ego = fault.get('parameters', {}).get('filter_ego_vehicle', True)
-            if filter_ego:
-                points = self.filter_ego_vehicle_points(points, fault)
-            
-            bias_distance = fault.get('parameters', {}).get('bias_percent', 0.5)
-
-            xyz = points[:, :3]
-            norms = np.linalg.norm(xyz, axis=1, keepdims=True)
-            # Mask for points not at the origin
-            mask = (norms[:, 0] != 0)
-            directions = np.zeros_like(xyz)
-            directions[mask] = xyz[mask] / norms[mask]
-
-            # Only move points not at the origin
-            xyz[mask] = xyz[mask] + directions[mask] * bias_distance
-
-            points[:, :3] = xyz
-            sensor_data['points'] = points
-            self.logger.info("Applied distance bias to %d points.", mask.sum())
-            return sensor_data
-        except Exception as e:
-            self.logger.error(f"Error applying distance bias: {e}")
-            return sensor_data
-        
-    def filter_nearby_points(self, points, min_radius=1.5):
+    def _apply_distance_bias(self, xyz, bias_distance):
         """
-        Remove points within min_radius of the origin (0,0,0).
-        points: np.ndarray of shape (N, 4) or (N, 5)
-        Returns: filtered points (same shape)
+        Move the points bias_distance away from the origin (in place), points at the origin
+        are not moved.
+
+        :param xyz: The point positions.
+        :type xyz: numpy.ndarray of shape (N, 3)
+        :param bias_distance: The distance [m].
+        :type bias_distance: float
         """
-        xyz = points[:, :3]
-        dists = np.linalg.norm(xyz, axis=1)
-        mask = dists > min_radius
-        return points[mask]
-    
-    def filter_ego_vehicle_points(self, points, fault=None):
+        norms = np.sqrt(np.einsum('ij,ij->i', xyz, xyz))
+        scale = np.divide(np.float32(bias_distance), norms, out=np.zeros_like(norms), where=norms != 0)
+        scale += 1.0
+        xyz *= scale[:, np.newaxis]
+
+    def _get_outside_vehicle_box_mask(self, xyz, box):
         """
-        Remove points inside the ego vehicle bounding box using vehicle parameters.
+        Get the mask of the points outside of the ego vehicle box.
+
+        :param xyz: The point positions.
+        :type xyz: numpy.ndarray of shape (N, 3)
+        :param box: The vehicle box (length, width, height and z_offset),
+            the defaults are the vehicle dimensions of the Autoware config.
+        :type box: dict
+        :return: True for the points outside of the box.
+        :rtype: numpy.ndarray of bool
         """
-        # Vehicle dimensions gotten from config on Autoware
-        # length = 2.544 + 1.12 + 0.82  # 4.484
-        # width = 1.45 + 0.18 + 0.18    # 1.81
-        # height = 2.40
-        # Get vehicle box from fault parametsers, or use defaults
-        box = fault.get('parameters', {}).get('vehicle_box', {})
         length = box.get('length', 4.484)
         width = box.get('width', 1.81)
         height = box.get('height', 2.40)
-
         z_offset = box.get('z_offset', 0.0)
 
-        x, y, z = points[:, 0], points[:, 1], points[:, 2]
-        mask = (
-            (np.abs(x) > length / 2) |
-            (np.abs(y) > width / 2) |
-            (np.abs(z - z_offset) > height / 2)
-        )
-        return points[mask]
-
-    def _apply_percentage_distance_bias(self, sensor_data, fault):
-        """
-        Add a percentage bias to the distance of each LiDAR point from the origin.
-        For example, a 10% bias moves a point at 10m to 11m.
-        """
-        try:
-            self.logger.info("Applying percentage distance bias to LiDAR points.")
-
-            points = np.asarray(sensor_data['points'], dtype=np.float32)
-            if points.size == 0:
-                return sensor_data
-
-            # Optionally filter ego vehicle points
-            filter_ego = fault.get('parameters', {}).get('filter_ego_vehicle', True)
-            if filter_ego:
-                points = self.filter_ego_vehicle_points(points, fault)
-
-            bias_percent = fault.get('parameters', {}).get('bias_percent', 0.0)
-            scale = 1.0 + (bias_percent / 100.0)
-
-            xyz = points[:, :3]
-            norms = np.linalg.norm(xyz, axis=1, keepdims=True)
-            # Mask for points not at the origin
-            mask = (norms[:, 0] != 0)
-            directions = np.zeros_like(xyz)
-            directions[mask] = xyz[mask] / norms[mask]
-
-            # Only move points not at the origin
-            xyz[mask] = directions[mask] * (norms[mask] * scale)
-
-            points[:, :3] = xyz
-            sensor_data['points'] = points
-            self.logger.info("Applied percentage distance bias (%.2f%%) to %d points.", bias_percent, mask.sum())
-            return sensor_data
-        except Exception as e:
-            self.logger.error(f"Error applying percentage distance bias: {e}")
-            return sensor_data
+        mask = np.abs(xyz[:, 0]) > length / 2
+        mask |= np.abs(xyz[:, 1]) > width / 2
+        mask |= np.abs(xyz[:, 2] - z_offset) > height / 2
+        return mask
@@ -3,20 +3,18 @@ import cv2
 import numpy as np
 
 class RGBCameraFaultInjector(FaultInjector):
-    def __init__(self, config_file=None):
-        super().__init__("RGBCamera", config_file)
+    def __init__(self, sensor_uid=None):
+        super().__init__("RGBCamera", sensor_uid)
 
     def apply_faults(self, sensor_data):
         """
         Apply RGB camera-specific faults to the sensor data.
         """
         try:
-            for fault in self.active_faults:
-                # Log sensor data before applying faults
-                self.logger.info("RGB Camera data before applying faults: %s", sensor_data)
-            
-                self.logger.info(f"Applying fault: {fault['name']} with parameters: {fault['parameters']}")
-                
+            for active_fault in self.active_faults:
+                fault = active_fault["fault"]
+                self.log_fault_applied(active_fault)
+
                 if fault['failure_type'] == 'blur':
                     sensor_data = self._apply_blur(sensor_data, fault)
                 elif fault['failure_type'] == 'noise':
@@ -24,9 +22,6 @@ class RGBCameraFaultInjector(FaultInjector):
                 elif fault['failure_type'] == 'dropout':
                     sensor_data = self._apply_dropout(sensor_data, fault)
                 # Add more RGB camera-specific fault types as needed
-            
-            # Log sensor data after applying faults
-            self.logger.info("RGB Camera data after applying faults: %s", sensor_data)
 
             return sensor_data
         except Exception as e:
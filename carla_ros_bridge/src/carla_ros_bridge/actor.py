@@ -12,6 +12,7 @@ Base Classes to handle Actor objects
 
 import carla_common.transforms as trans
 
+from carla_ros_bridge.actor_state_cache import get_actor_state
 from carla_ros_bridge.pseudo_actor import PseudoActor
 
 from geometry_msgs.msg import TransformStamped  # pylint: disable=import-error
@@ -54,6 +55,21 @@ class Actor(PseudoActor):
         self.carla_actor = None
         super(Actor, self).destroy()
 
+    def get_current_carla_state(self):
+        """
+        Function to provide the state of this actor in the current frame
+
+        The state is taken from the per-frame actor state cache of the bridge. If the actor
+        is not part of the current world snapshot, the actor itself is queried.
+
+        :return: transform, velocity, angular velocity and acceleration of this actor
+        :rtype: carla_ros_bridge.actor_state_cache.ActorState
+        """
+        state = self.node.actor_state_cache.get_state(self.carla_actor_id)
+        if state is None:
+            state = get_actor_state(self.carla_actor)
+        return state
+
     def get_current_ros_pose(self):
         """
         Function to provide the current ROS pose
@@ -62,7 +78,7 @@ class Actor(PseudoActor):
         :rtype: geometry_msgs.msg.Pose
         """
         return trans.carla_transform_to_ros_pose(
-            self.carla_actor.get_transform())
+            self.get_current_carla_state().transform)
 
     def get_current_ros_transform(self):
         """
@@ -72,7 +88,7 @@ class Actor(PseudoActor):
         :rtype: geometry_msgs.msg.Pose
         """
         return trans.carla_transform_to_ros_transform(
-            self.carla_actor.get_transform())
+            self.get_current_carla_state().transform)
 
     def get_current_ros_twist_rotated(self):
         """
@@ -81,10 +97,11 @@ class Actor(PseudoActor):
         :return: the ROS twist of this actor
         :rtype: geometry_msgs.msg.Twist
         """
+        state = self.get_current_carla_state()
         return trans.carla_velocity_to_ros_twist(
-            self.carla_actor.get_velocity(),
-            self.carla_actor.get_angular_velocity(),
-            self.carla_actor.get_transform().rotation)
+            state.velocity,
+            state.angular_velocity,
+            state.transform.rotation)
 
     def get_current_ros_twist(self):
         """
@@ -93,9 +110,10 @@ class Actor(PseudoActor):
         :return: the ROS twist of this actor
         :rtype: geometry_msgs.msg.Twist
         """
+        state = self.get_current_carla_state()
         return trans.carla_velocity_to_ros_twist(
-            self.carla_actor.get_velocity(),
-            self.carla_actor.get_angular_velocity())
+            state.velocity,
+            state.angular_velocity)
 
     def get_current_ros_accel(self):
         """
@@ -105,7 +123,7 @@ class Actor(PseudoActor):
         :rtype: geometry_msgs.msg.Twist
         """
         return trans.carla_acceleration_to_ros_accel(
-            self.carla_actor.get_acceleration())
+            self.get_current_carla_state().acceleration)
 
     def get_id(self):
         """
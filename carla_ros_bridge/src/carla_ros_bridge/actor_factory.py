@@ -7,6 +7,7 @@
 #
 
 import itertools
+from concurrent.futures import ThreadPoolExecutor
 try:
     import queue
 except ImportError:
@@ -50,6 +51,10 @@ from carla_ros_bridge.walker import Walker
 import random
 secure_random = random.SystemRandom()
 
+# spawn attributes starting with this prefix are handled by the bridge (e.g. camera output
+# options) and are not set on the carla blueprint
+ROS_ATTRIBUTE_PREFIX = "ros_"
+
 
 class ActorFactory(object):
 
@@ -60,9 +65,11 @@ class ActorFactory(object):
         SPAWN_PSEUDO_ACTOR = 1
         DESTROY_ACTOR = 2
 
-    def __init__(self, node, world, sync_mode=False):
+    def __init__(self, node, world, sync_mode=False, client=None):
         self.node = node
         self.world = world
+        # used to spawn several actors with one batch of commands
+        self.client = client
         self.blueprint_lib = self.world.get_blueprint_library()
         self.spawn_points = self.world.get_map().get_spawn_points()
         self.sync_mode = sync_mode
@@ -81,10 +88,44 @@ class ActorFactory(object):
 
         self.thread = Thread(target=self._update_thread)
 
+        # in synchronous mode, sensors block until the data of the current frame is received.
+        # With the thread_pool executor, the sensors are waited for concurrently.
+        self._update_executor = None
+        update_executor = self.node.parameters.get("synchronous_mode_update_executor",
+                                                   "sequential")
+        if update_executor not in ("sequential", "thread_pool"):
+            self.node.logwarn("Unknown synchronous_mode_update_executor '{}', the sensors are "
+                              "updated sequentially".format(update_executor))
+        elif self.sync_mode and update_executor == "thread_pool":
+            self._update_executor = ThreadPoolExecutor(
+                max_workers=self.node.parameters["synchronous_mode_update_workers"])
+
         # save a dict to match the frame_id to the right sensor
         # {uid:frame_id}
         self._frame_id_map = {}
 
+        # spawn attributes handled by the bridge instead of carla (see ROS_ATTRIBUTE_PREFIX)
+        # {uid: {key: value}}
+        self._ros_attributes_map = {}
+
+        # thread pool to compress camera images, shared by all cameras.
+        # Created with the first camera that publishes compressed images.
+        self._image_compression_executor = None
+        self._image_compression_lock = Lock()
+
+    def get_image_compression_executor(self):
+        """
+        Function to get the thread pool that compresses the camera images
+
+        :return: the thread pool, shared by all cameras
+        :rtype: concurrent.futures.ThreadPoolExecutor
+        """
+        with self._image_compression_lock:
+            if self._image_compression_executor is None:
+                self._image_compression_executor = ThreadPoolExecutor(
+                    max_workers=self.node.parameters.get("image_compression_workers", 2))
+            return self._image_compression_executor
+
     def start(self):
         # create initially existing actors
         self.update_available_objects()
@@ -103,17 +144,24 @@ class ActorFactory(object):
         """
         update the available actors
         """
-        # The carla.World.get_actors() method does not return actors that has been spawned in the same frame.
-        # This is a known bug and will be fixed in future release of CARLA.
-        current_actors = set([actor.id for actor in self.world.get_actors()])
+        # The actor ids are taken from the world snapshot, which is received with every tick
+        # and does not require a request to the server. Like carla.World.get_actors(), it does
+        # not contain actors that has been spawned in the same frame.
+        current_actors = set(actor_snapshot.id for actor_snapshot in self.world.get_snapshot())
         spawned_actors = current_actors - self._active_actors
         destroyed_actors = self._active_actors - current_actors
-        self._active_actors = current_actors
+        if not spawned_actors and not destroyed_actors and self._task_queue.empty():
+            return
 
-        # Create/destroy actors not managed by the bridge. 
+        # Fetch all new actors with a single request. Actors that are not available yet are
+        # not marked as active, so that they are fetched again on the next update.
+        new_carla_actors = self.world.get_actors(list(spawned_actors)) if spawned_actors else []
+        self._active_actors = (current_actors - spawned_actors) | \
+            set(carla_actor.id for carla_actor in new_carla_actors)
+
+        # Create/destroy actors not managed by the bridge.
         self.lock.acquire()
-        for actor_id in spawned_actors:
-            carla_actor = self.world.get_actor(actor_id)
+        for carla_actor in new_carla_actors:
             if self.node.parameters["register_all_sensors"] or not isinstance(carla_actor, carla.Sensor):
                 self._create_object_from_actor(carla_actor)
 
@@ -142,15 +190,41 @@ class ActorFactory(object):
         update the state of all known actors
         """
         with self.lock:
-            for actor_id in self.actors:
-                try:
-                    self.actors[actor_id].update(frame_id, timestamp)
-                except RuntimeError as e:
-                    self.node.logwarn("Update actor {}({}) failed: {}".format(
-                        self.actors[actor_id].__class__.__name__, actor_id, e))
-                    continue
+            if self._update_executor is None:
+                for actor in self.actors.values():
+                    self._update_actor(actor, frame_id, timestamp)
+                return
+
+            futures = []
+            for actor in self.actors.values():
+                if isinstance(actor, Sensor):
+                    futures.append(self._update_executor.submit(
+                        self._update_actor, actor, frame_id, timestamp))
+                else:
+                    self._update_actor(actor, frame_id, timestamp)
+
+            # wait until every sensor has processed the current frame
+            for future in futures:
+                future.result()
+
+    def _update_actor(self, actor, frame_id, timestamp):
+        """
+        update the state of a single actor
+        """
+        try:
+            with self.node.frame_stats.span("update", actor):
+                actor.update(frame_id, timestamp)
+        except RuntimeError as e:
+            self.node.logwarn("Update actor {}({}) failed: {}".format(
+                actor.__class__.__name__, actor.uid, e))
 
     def clear(self):
+        if self._update_executor is not None:
+            self._update_executor.shutdown()
+        with self._image_compression_lock:
+            if self._image_compression_executor is not None:
+                self._image_compression_executor.shutdown()
+                self._image_compression_executor = None
         for _, actor in self.actors.items():
             actor.destroy()
         self.actors.clear()
@@ -177,6 +251,7 @@ class ActorFactory(object):
             self._known_actor_ids.append(id_)
         
         self._frame_id_map.update({id_:req.frame_id})
+        self._ros_attributes_map[id_] = self._get_ros_attributes(req)
         return id_
 
     def destroy_actor(self, uid):
@@ -200,9 +275,104 @@ class ActorFactory(object):
                 self._task_queue.put((ActorFactory.TaskType.DESTROY_ACTOR, (obj, None)))
         return objects_to_destroy
 
-    def _spawn_carla_actor(self, req):
+    def spawn_actors(self, reqs):
         """
-        spawns an actor in carla
+        spawns several objects at once
+
+        Like in spawn_actor(), no object instances are created here. The carla-actors are
+        spawned with a single batch of carla commands per attachment level: objects attached
+        to another object of the same request (attach_to_index) are spawned within the batch
+        after the one of their parent.
+
+        :param reqs: objects to spawn (carla_ros_bridge_types.msg.CarlaSpawnObject)
+        :type reqs: list
+        :return: ids (-1 if the object could not be spawned) and error strings of the objects
+        :rtype: tuple(list, list)
+        """
+        ids = [-1] * len(reqs)
+        error_strings = [""] * len(reqs)
+        with self.spawn_lock:
+            pending = list(range(len(reqs)))
+            while pending:
+                # split the pending objects into those whose parent is known and the others
+                level = []
+                waiting = []
+                for index in pending:
+                    parent_index = reqs[index].attach_to_index
+                    if parent_index < 0:
+                        level.append(index)
+                    elif parent_index >= len(reqs) or parent_index == index:
+                        error_strings[index] = "Invalid parent index {}".format(parent_index)
+                    elif parent_index in pending:
+                        waiting.append(index)
+                    elif ids[parent_index] == -1:
+                        error_strings[index] = "Parent object {} was not spawned".format(
+                            reqs[parent_index].id)
+                    else:
+                        reqs[index].attach_to = ids[parent_index]
+                        level.append(index)
+
+                if not level and len(waiting) == len(pending):
+                    for index in waiting:
+                        error_strings[index] = "Cyclic attachment of the objects"
+                    break
+
+                commands = []
+                command_indices = []
+                for index in level:
+                    req = reqs[index]
+                    # the parents spawned with the current request are not available yet
+                    parent_in_request = req.attach_to_index >= 0
+                    try:
+                        if "pseudo" in req.type:
+                            if req.attach_to != 0 and not parent_in_request:
+                                if self.world.get_actor(req.attach_to) is None:
+                                    raise IndexError(
+                                        "Parent actor {} not found".format(req.attach_to))
+                            ids[index] = next(self.id_gen)
+                            self._task_queue.put(
+                                (ActorFactory.TaskType.SPAWN_PSEUDO_ACTOR, (ids[index], req)))
+                        else:
+                            commands.append(self._get_spawn_actor_command(req, parent_in_request))
+                            command_indices.append(index)
+                    except (IndexError, RuntimeError) as e:
+                        error_strings[index] = str(e)
+
+                if commands:
+                    for index, response in zip(command_indices,
+                                               self.client.apply_batch_sync(commands)):
+                        if response.error:
+                            error_strings[index] = response.error
+                        else:
+                            ids[index] = response.actor_id
+                            self._task_queue.put(
+                                (ActorFactory.TaskType.SPAWN_ACTOR, (ids[index], reqs[index])))
+
+                for index in level:
+                    if ids[index] != -1:
+                        self._known_actor_ids.append(ids[index])
+                        self._frame_id_map.update({ids[index]: reqs[index].frame_id})
+                        self._ros_attributes_map[ids[index]] = self._get_ros_attributes(
+                            reqs[index])
+
+                pending = waiting
+
+        return ids, error_strings
+
+    def _get_spawn_actor_command(self, req, parent_in_request=False):
+        """
+        get the carla command to spawn an actor
+        """
+        blueprint, transform = self._get_spawn_parameters(req)
+        if req.attach_to == 0:
+            return carla.command.SpawnActor(blueprint, transform)
+        if not parent_in_request and self.world.get_actor(req.attach_to) is None:
+            raise IndexError("Parent actor {} not found".format(req.attach_to))
+        return carla.command.SpawnActor(blueprint, transform, req.attach_to)
+
+    def _get_spawn_parameters(self, req):
+        """
+        get the blueprint and the transform to spawn an actor in carla
         """
         if "*" in req.type:
             blueprint = secure_random.choice(
@@ -211,13 +381,29 @@ class ActorFactory(object):
             blueprint = self.blueprint_lib.find(req.type)
         blueprint.set_attribute('role_name', req.id)
         for attribute in req.attributes:
-            blueprint.set_attribute(attribute.key, attribute.value)
+            if not attribute.key.startswith(ROS_ATTRIBUTE_PREFIX):
+                blueprint.set_attribute(attribute.key, attribute.value)
         if req.random_pose is False:
             transform = trans.ros_pose_to_carla_transform(req.transform)
         else:
             # get a random pose
             transform = secure_random.choice(
                 self.spawn_points) if self.spawn_points else carla.Transform()
+        return blueprint, transform
+
+    @staticmethod
+    def _get_ros_attributes(req):
+        """
+        get the spawn attributes handled by the bridge (e.g. camera output options)
+        """
+        return {attribute.key: attribute.value for attribute in req.attributes
+                if attribute.key.startswith(ROS_ATTRIBUTE_PREFIX)}
+
+    def _spawn_carla_actor(self, req):
+        """
+        spawns an actor in carla
+        """
+        blueprint, transform = self._get_spawn_parameters(req)
 
         attach_to = None
         if req.attach_to != 0:
@@ -378,24 +564,30 @@ class ActorFactory(object):
             #print("Fault configuration file: {}".format(fault_config_file))
 
             if carla_actor.type_id.startswith("sensor.camera"):
+                ros_attributes = self._ros_attributes_map.get(uid, {})
                 if carla_actor.type_id.startswith("sensor.camera.rgb"):
                     actor = RgbCamera(uid, name, parent, spawn_pose, self.node,
-                                      carla_actor, self.sync_mode, self._frame_id_map[uid])#, fault_config_file)
+                                      carla_actor, self.sync_mode, self._frame_id_map[uid],
+                                      ros_attributes=ros_attributes)#, fault_config_file)
                 elif carla_actor.type_id.startswith("sensor.camera.depth"):
                     actor = DepthCamera(uid, name, parent, spawn_pose,
-                                        self.node, carla_actor, self.sync_mode)
+                                        self.node, carla_actor, self.sync_mode,
+                                        ros_attributes=ros_attributes)
                 elif carla_actor.type_id.startswith(
                         "sensor.camera.semantic_segmentation"):
                     actor = SemanticSegmentationCamera(uid, name, parent,
                                                        spawn_pose, self.node,
                                                        carla_actor,
-                                                       self.sync_mode)
+                                                       self.sync_mode,
+                                                       ros_attributes=ros_attributes)
                 elif carla_actor.type_id.startswith("sensor.camera.dvs"):
                     actor = DVSCamera(uid, name, parent, spawn_pose, self.node,
-                                      carla_actor, self.sync_mode)
+                                      carla_actor, self.sync_mode,
+                                      ros_attributes=ros_attributes)
                 else:
                     actor = Camera(uid, name, parent, spawn_pose, self.node,
-                                   carla_actor, self.sync_mode)
+                                   carla_actor, self.sync_mode,
+                                   ros_attributes=ros_attributes)
             elif carla_actor.type_id.startswith("sensor.lidar"):
                 if carla_actor.type_id.endswith("sensor.lidar.ray_cast"):
                     actor = Lidar(uid, name, parent, spawn_pose, self.node,
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+
+#
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+#
+"""
+Class to cache the actor states of the current frame
+"""
+
+import collections
+from threading import Lock
+
+# the state of an actor within one frame
+ActorState = collections.namedtuple(
+    "ActorState", ["transform", "velocity", "angular_velocity", "acceleration"])
+
+
+def get_actor_state(carla_actor):
+    """
+    get the state of an actor by querying the actor itself
+
+    :param carla_actor: carla actor object
+    :type carla_actor: carla.Actor
+    :return: the state of the actor
+    :rtype: ActorState
+    """
+    return ActorState(carla_actor.get_transform(),
+                      carla_actor.get_velocity(),
+                      carla_actor.get_angular_velocity(),
+                      carla_actor.get_acceleration())
+
+
+class ActorStateCache(object):
+
+    """
+    Per-frame cache of the actor states, read from the world snapshot
+
+    The world snapshot is received with every tick, so it provides the transform, velocity,
+    angular velocity and acceleration of all actors without further requests. The states are
+    extracted on first access and reused by all objects during the frame. A new snapshot
+    invalidates the states of the previous frame.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self._lock = Lock()
+        self._frame = None
+        self._world_snapshot = None
+        self._states = {}
+
+    def update(self, world_snapshot):
+        """
+        set the world snapshot of the current frame
+
+        :param world_snapshot: the world snapshot of the current frame
+        :type world_snapshot: carla.WorldSnapshot
+        """
+        with self._lock:
+            if world_snapshot.frame == self._frame:
+                return
+            self._frame = world_snapshot.frame
+            self._world_snapshot = world_snapshot
+            self._states = {}
+
+    def get_state(self, actor_id):
+        """
+        get the state of an actor in the current frame
+
+        :param actor_id: the carla id of the actor
+        :type actor_id: int
+        :return: the state of the actor, None if the actor is not part of the world snapshot
+            (e.g. spawned within the current frame)
+        :rtype: ActorState
+        """
+        with self._lock:
+            state = self._states.get(actor_id)
+            if state is None and self._world_snapshot is not None:
+                actor_snapshot = self._world_snapshot.find(actor_id)
+                if actor_snapshot is not None:
+                    state = get_actor_state(actor_snapshot)
+                    self._states[actor_id] = state
+            return state
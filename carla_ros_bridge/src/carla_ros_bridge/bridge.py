@@ -28,14 +28,22 @@ from ros_compatibility.node import CompatibleNode
 
 from carla_ros_bridge.actor import Actor
 from carla_ros_bridge.actor_factory import ActorFactory
+from carla_ros_bridge.actor_state_cache import ActorStateCache
 from carla_ros_bridge.carla_status_publisher import CarlaStatusPublisher
 from carla_ros_bridge.debug_helper import DebugHelper
 from carla_ros_bridge.ego_vehicle import EgoVehicle
+from carla_ros_bridge.fault_campaign import FaultCampaign
+from carla_ros_bridge.FaultInjector.FaultLogger import FaultLogBackend, configure_fault_logging
+from carla_ros_bridge.FaultInjector.FaultRegistry import FaultRegistry
+from carla_ros_bridge.frame_stats import FrameStats
+from carla_ros_bridge.tf_publisher import StaticTFPublisher, TFPublisher
 from carla_ros_bridge.world_info import WorldInfo
 
 from carla_msgs.msg import CarlaControl, CarlaWeatherParameters
 from carla_msgs.srv import SpawnObject, DestroyObject, GetBlueprints
+from carla_ros_bridge_types.srv import SpawnObjects
 from rosgraph_msgs.msg import Clock
+from std_msgs.msg import String
 
 
 class CarlaRosBridge(CompatibleNode):
@@ -63,12 +71,13 @@ class CarlaRosBridge(CompatibleNode):
         super(CarlaRosBridge, self).__init__("ros_bridge_node")
 
     # pylint: disable=attribute-defined-outside-init
-    def initialize_bridge(self, carla_world, params):
+    def initialize_bridge(self, carla_world, params, carla_client=None):
         """
         Initialize the bridge
         """
         self.parameters = params
         self.carla_world = carla_world
+        self.carla_client = carla_client
 
         self.ros_timestamp = roscomp.ros_timestamp()
         self.callback_group = roscomp.callback_groups.ReentrantCallbackGroup()
@@ -104,8 +113,45 @@ class CarlaRosBridge(CompatibleNode):
 
         self.carla_control_queue = queue.Queue()
 
+        # processing time statistics, filled by the actors
+        self.frame_stats = FrameStats(self, self.parameters["publish_bridge_stats"])
+
+        # actor states of the current frame, shared by all actors
+        self.actor_state_cache = ActorStateCache()
+
+        # transforms of the current frame, published together on /tf
+        self.tf_publisher = TFPublisher(self)
+
+        # constant transforms of the sensors, published on /tf_static
+        self.static_tf_publisher = None
+        if self.parameters["publish_static_sensor_tf"]:
+            self.static_tf_publisher = StaticTFPublisher(self)
+
+        # fault injection logs, configured before the sensors create their fault injectors
+        configure_fault_logging(self.parameters["fault_log_samples"],
+                                self.parameters["fault_log_min_interval"],
+                                self.parameters["fault_log_buffer_size"])
+
+        # fault configuration of all sensors, loaded once and shared by the fault injectors
+        fault_file_path = [directory for directory in
+                           self.parameters["fault_file_path"].split(os.pathsep) if directory]
+        self.fault_registry = FaultRegistry(fault_file_path,
+                                            self.parameters["fault_injection_seed"])
+        if self.parameters["fault_config_file"]:
+            self._load_fault_file(self.parameters["fault_config_file"])
+
         # actor factory
-        self.actor_factory = ActorFactory(self, carla_world, self.sync_mode)
+        self.actor_factory = ActorFactory(self, carla_world, self.sync_mode, carla_client)
+
+        # campaign of fault injection runs, driven by the synchronous mode loop
+        self.fault_campaign = None
+        if self.parameters["fault_campaign_manifest"]:
+            if self.sync_mode:
+                self.fault_campaign = FaultCampaign(self,
+                                                    self.parameters["fault_campaign_manifest"])
+            else:
+                self.logwarn("Fault campaigns require the synchronous mode (and passive mode "
+                             "disabled). The campaign is not started.")
 
         # add world info
         self.world_info = WorldInfo(carla_world=self.carla_world, node=self)
@@ -150,6 +196,8 @@ class CarlaRosBridge(CompatibleNode):
         self._registered_actors = []
         self.spawn_object_service = self.new_service(SpawnObject, "/carla/spawn_object",
                                                      self.spawn_object)
+        self.spawn_objects_service = self.new_service(SpawnObjects, "/carla/spawn_objects",
+                                                      self.spawn_objects)
         self.destroy_object_service = self.new_service(DestroyObject, "/carla/destroy_object",
                                                        self.destroy_object)
 
@@ -160,6 +208,11 @@ class CarlaRosBridge(CompatibleNode):
             self.new_subscription(CarlaWeatherParameters, "/carla/weather_control",
                                   self.on_weather_changed, qos_profile=10, callback_group=self.callback_group)
 
+        self.fault_injection_file_subscriber = \
+            self.new_subscription(String, "/fault_injection_file",
+                                  lambda msg: self._load_fault_file(msg.data),
+                                  qos_profile=10, callback_group=self.callback_group)
+
     def spawn_object(self, req, response=None):
         response = roscomp.get_service_response(SpawnObject)
         if not self.shutdown.is_set():
@@ -176,6 +229,27 @@ class CarlaRosBridge(CompatibleNode):
             response.error_string = 'Bridge is shutting down, object will not be spawned.'
         return response
 
+    def spawn_objects(self, req, response=None):
+        response = roscomp.get_service_response(SpawnObjects)
+        if not self.shutdown.is_set():
+            try:
+                ids, error_strings = self.actor_factory.spawn_actors(req.objects)
+            except Exception as e:
+                ids = [-1] * len(req.objects)
+                error_strings = [str(e)] * len(req.objects)
+            for obj, id_, error_string in zip(req.objects, ids, error_strings):
+                if id_ == -1:
+                    self.logwarn("Error spawning object '{}': {}".format(obj.type, error_string))
+                else:
+                    self._registered_actors.append(id_)
+        else:
+            ids = [-1] * len(req.objects)
+            error_strings = ['Bridge is shutting down, object will not be spawned.'] * len(
+                req.objects)
+        response.ids = ids
+        response.error_strings = error_strings
+        return response
+
     def destroy_object(self, req, response=None):
         response = roscomp.get_service_response(DestroyObject)
         destroyed_actors = self.actor_factory.destroy_actor(req.id)
@@ -218,6 +292,19 @@ class CarlaRosBridge(CompatibleNode):
         weather.sun_altitude_angle = weather_parameters.sun_altitude_angle
         self.carla_world.set_weather(weather)
 
+    def _load_fault_file(self, fault_file):
+        """
+        Load a fault configuration for all sensors
+
+        :param fault_file: absolute path or name of the fault file (see FaultRegistry)
+        :type fault_file: string
+        """
+        try:
+            path = self.fault_registry.load(fault_file)
+            self.loginfo("Loaded fault configuration '{}'".format(path))
+        except (IOError, ValueError) as e:
+            self.logerr("Failed to load fault configuration '{}': {}".format(fault_file, e))
+
     def process_run_state(self):
         """
         process state changes
@@ -262,18 +349,24 @@ class CarlaRosBridge(CompatibleNode):
                             self._expected_ego_vehicle_control_command_ids.append(
                                 actor_id)
 
-            self.actor_factory.update_available_objects()
-            frame = self.carla_world.tick()
+            with self.frame_stats.span("update_available_objects"):
+                self.actor_factory.update_available_objects()
+            with self.frame_stats.span("world.tick"):
+                frame = self.carla_world.tick()
 
-            world_snapshot = self.carla_world.get_snapshot()
+            with self.frame_stats.span("get_snapshot"):
+                world_snapshot = self.carla_world.get_snapshot()
 
             self.status_publisher.set_frame(frame)
             self.update_clock(world_snapshot.timestamp)
             self.logdebug("Tick for frame {} returned. Waiting for sensor data...".format(
                 frame))
-            self._update(frame, world_snapshot.timestamp.elapsed_seconds)
+            self._update(frame, world_snapshot.timestamp.elapsed_seconds, world_snapshot)
             self.logdebug("Waiting for sensor data finished.")
 
+            if self.fault_campaign is not None:
+                self.fault_campaign.update(frame, world_snapshot.timestamp.elapsed_seconds)
+
             if self.parameters['synchronous_mode_wait_for_vehicle_control_command']:
                 # wait for all ego vehicles to send a vehicle control command
                 if self._expected_ego_vehicle_control_command_ids:
@@ -303,15 +396,20 @@ class CarlaRosBridge(CompatibleNode):
                 self.update_clock(carla_snapshot.timestamp)
                 self.status_publisher.set_frame(carla_snapshot.frame)
                 self._update(carla_snapshot.frame,
-                             carla_snapshot.timestamp.elapsed_seconds)
+                             carla_snapshot.timestamp.elapsed_seconds,
+                             carla_snapshot)
 
-    def _update(self, frame_id, timestamp):
+    def _update(self, frame_id, timestamp, world_snapshot):
         """
         update all actors
         :return:
         """
+        self.actor_state_cache.update(world_snapshot)
         self.world_info.update(frame_id, timestamp)
         self.actor_factory.update_actor_states(frame_id, timestamp)
+        with self.frame_stats.span("publish_tf"):
+            self.tf_publisher.publish()
+        self.frame_stats.publish(frame_id, timestamp)
 
     def _ego_vehicle_control_applied_callback(self, ego_vehicle_id):
         if not self.sync_mode or \
@@ -356,15 +454,19 @@ class CarlaRosBridge(CompatibleNode):
         self.loginfo("Object update finished.")
         self.debug_helper.destroy()
         self.status_publisher.destroy()
+        self.frame_stats.destroy()
         self.destroy_service(self.spawn_object_service)
+        self.destroy_service(self.spawn_objects_service)
         self.destroy_service(self.destroy_object_service)
         self.destroy_subscription(self.carla_weather_subscriber)
+        self.destroy_subscription(self.fault_injection_file_subscriber)
         self.carla_control_queue.put(CarlaControl.STEP_ONCE)
 
         for uid in self._registered_actors:
             self.actor_factory.destroy_actor(uid)
         self.actor_factory.update_available_objects()
         self.actor_factory.clear()
+        FaultLogBackend.stop()
         super(CarlaRosBridge, self).destroy()
 
 
@@ -398,6 +500,22 @@ def main(args=None):
         'synchronous_mode_wait_for_vehicle_control_command', False)
     parameters['fixed_delta_seconds'] = carla_bridge.get_param('fixed_delta_seconds',
                                                                0.05)
+    parameters['synchronous_mode_update_executor'] = carla_bridge.get_param(
+        'synchronous_mode_update_executor', 'sequential')
+    parameters['synchronous_mode_update_workers'] = carla_bridge.get_param(
+        'synchronous_mode_update_workers', 4)
+    parameters['publish_bridge_stats'] = carla_bridge.get_param('publish_bridge_stats', False)
+    parameters['publish_static_sensor_tf'] = carla_bridge.get_param(
+        'publish_static_sensor_tf', False)
+    parameters['image_compression_workers'] = carla_bridge.get_param(
+        'image_compression_workers', 2)
+    parameters['fault_log_samples'] = carla_bridge.get_param('fault_log_samples', True)
+    parameters['fault_log_min_interval'] = carla_bridge.get_param('fault_log_min_interval', 1.0)
+    parameters['fault_log_buffer_size'] = carla_bridge.get_param('fault_log_buffer_size', 10000)
+    parameters['fault_injection_seed'] = carla_bridge.get_param('fault_injection_seed', -1)
+    parameters['fault_config_file'] = carla_bridge.get_param('fault_config_file', '')
+    parameters['fault_file_path'] = carla_bridge.get_param('fault_file_path', '')
+    parameters['fault_campaign_manifest'] = carla_bridge.get_param('fault_campaign_manifest', '')
     parameters['register_all_sensors'] = carla_bridge.get_param('register_all_sensors', True)
     parameters['town'] = carla_bridge.get_param('town', 'Town01')
     role_name = carla_bridge.get_param('ego_vehicle_role_name',
@@ -452,7 +570,7 @@ def main(args=None):
                     carla_world = carla_client.load_world(parameters["town"])
             carla_world.tick()
 
-        carla_bridge.initialize_bridge(carla_client.get_world(), parameters)
+        carla_bridge.initialize_bridge(carla_client.get_world(), parameters, carla_client)
 
         carla_bridge.spin()
 
@@ -16,16 +16,15 @@ from abc import abstractmethod
 
 import carla
 import numpy
-import transforms3d
 from carla_ros_bridge.FaultInjector.Tools import has_fault_for_sensor
-from cv_bridge import CvBridge
 
 from carla_ros_bridge.FaultInjector.RGBCameraFaultInjector import RGBCameraFaultInjector
+from carla_ros_bridge.image_compressor import COMPRESSION_FORMATS, ImageCompressor
 
 import carla_common.transforms as trans
 from ros_compatibility.core import get_ros_version
 
-from carla_ros_bridge.sensor import Sensor, create_cloud
+from carla_ros_bridge.sensor import Sensor, create_cloud_from_array, get_msg_data
 
 from sensor_msgs.msg import CameraInfo, Image, PointCloud2, PointField
 
@@ -33,6 +32,107 @@ from rclpy import qos
 
 ROS_VERSION = get_ros_version()
 
+# rotation of the optical frame (z forward, x right, y down) relative to the camera frame
+# as quaternion (w, x, y, z), i.e. transforms3d.quaternions.mat2quat of the rotation matrix
+# [[0, 0, 1], [-1, 0, 0], [0, -1, 0]]
+OPTICAL_FRAME_QUATERNION = (0.5, -0.5, 0.5, -0.5)
+
+# scale of the 24 bit depth value (R + G * 256 + B * 256 * 256) of the depth camera to meters
+# https://carla.readthedocs.io/en/latest/cameras_and_sensors/#camera-depth-map
+DEPTH_SCALE = numpy.float32(1000.0 / (256**3 - 1))
+
+
+# CityScapes palette of carla (LibCarla/source/carla/image/CityScapesPalette.h) as (r, g, b),
+# indexed by the semantic tag
+CITYSCAPES_PALETTE = [
+    (0, 0, 0),  # unlabeled
+    (128, 64, 128),  # road
+    (244, 35, 232),  # sidewalk
+    (70, 70, 70),  # building
+    (102, 102, 156),  # wall
+    (190, 153, 153),  # fence
+    (153, 153, 153),  # pole
+    (250, 170, 30),  # traffic light
+    (220, 220, 0),  # traffic sign
+    (107, 142, 35),  # vegetation
+    (152, 251, 152),  # terrain
+    (70, 130, 180),  # sky
+    (220, 20, 60),  # pedestrian
+    (255, 0, 0),  # rider
+    (0, 0, 142),  # car
+    (0, 0, 70),  # truck
+    (0, 60, 100),  # bus
+    (0, 80, 100),  # train
+    (0, 0, 230),  # motorcycle
+    (119, 11, 32),  # bicycle
+    (110, 190, 160),  # static
+    (170, 120, 50),  # dynamic
+    (55, 90, 80),  # other
+    (45, 60, 150),  # water
+    (157, 234, 50),  # road line
+    (81, 0, 81),  # ground
+    (150, 100, 100),  # bridge
+    (230, 150, 140),  # rail track
+    (180, 165, 180)  # guard rail
+]
+
+# lookup table semantic tag -> bgra color for all 256 values of the label image
+# (carla wraps tags beyond the palette around)
+CITYSCAPES_PALETTE_LUT = numpy.array(
+    [CITYSCAPES_PALETTE[tag % len(CITYSCAPES_PALETTE)][::-1] + (255,) for tag in range(256)],
+    dtype=numpy.uint8)
+
+# layout of the events within carla.DVSEventArray.raw_data
+DVS_EVENT_DTYPE = numpy.dtype([
+    ('x', numpy.uint16),
+    ('y', numpy.uint16),
+    ('t', numpy.int64),
+    ('pol', numpy.bool_)
+])
+
+# fields of the published events (PointField has no 64 bit integer type, t is sent as float64)
+DVS_EVENT_FIELDS = [
+    PointField(name='x', offset=0, datatype=PointField.UINT16, count=1),
+    PointField(name='y', offset=2, datatype=PointField.UINT16, count=1),
+    PointField(name='t', offset=4, datatype=PointField.FLOAT64, count=1),
+    PointField(name='pol', offset=12, datatype=PointField.INT8, count=1)
+]
+
+
+def attribute_to_bool(value):
+    """
+    convert the string value of a spawn attribute to bool
+
+    :param value: the attribute value (e.g. 'true', 'False', '1')
+    :type value: string
+    :rtype: bool
+    """
+    return str(value).strip().lower() in ("true", "1", "yes", "on")
+
+
+def bgr_to_mono8(image):
+    """
+    convert a bgr8 or bgra8 image to mono8 (ITU-R BT.601 luma in 8 bit fixed point)
+
+    :param image: the image, e.g. a view on the carla raw data
+    :type image: numpy.ndarray
+    :return: the grayscale image
+    :rtype: numpy.ndarray
+    """
+    # 29 + 150 + 77 = 256, the sum of the weighted channels fits into uint16. The channels
+    # are widened before the multiplication, a uint8 array times a scalar stays uint8 with
+    # the value based casting of numpy < 2
+    mono = image[:, :, 0].astype(numpy.uint16)
+    mono *= 29
+    channel = image[:, :, 1].astype(numpy.uint16)
+    channel *= 150
+    mono += channel
+    numpy.copyto(channel, image[:, :, 2])
+    channel *= 77
+    mono += channel
+    mono >>= 8
+    return mono.astype(numpy.uint8)
+
 
 class Camera(Sensor):
 
@@ -40,13 +140,18 @@ class Camera(Sensor):
     Sensor implementation details for cameras
     """
 
-    # global cv bridge to convert image between opencv and ros
-    cv_bridge = CvBridge()
-
-    def __init__(self, uid, name, parent, relative_spawn_pose, node, carla_actor, synchronous_mode, is_event_sensor=False, frame_id=None):  # pylint: disable=too-many-arguments
+    def __init__(self, uid, name, parent, relative_spawn_pose, node, carla_actor, synchronous_mode, is_event_sensor=False, frame_id=None, ros_attributes=None):  # pylint: disable=too-many-arguments
         """
         Constructor
 
+        The image output is configured by the spawn attributes handled by the bridge:
+        ros_publish_raw_image: publish <prefix>/image (default: true)
+        ros_image_compression: 'jpeg' or 'png' to publish <prefix>/image/compressed as well
+        ros_image_compression_quality: jpeg quality (0..100) or png compression level (0..9)
+        ros_image_roi: crop the image to 'x_offset,y_offset,width,height'
+        ros_image_decimation: keep every n-th row and column (after cropping)
+        ros_image_grayscale: publish color images as mono8
+
         :param uid: unique identifier for this object
         :type uid: int
         :param name: name identiying this object
@@ -59,6 +164,8 @@ class Camera(Sensor):
         :type carla_actor: carla.Actor
         :param synchronous_mode: use in synchronous mode?
         :type synchronous_mode: bool
+        :param ros_attributes: spawn attributes handled by the bridge
+        :type ros_attributes: dict
         """
         super(Camera, self).__init__(uid=uid,
                                      name=name,
@@ -69,25 +176,122 @@ class Camera(Sensor):
                                      synchronous_mode=synchronous_mode,
                                      is_event_sensor=is_event_sensor)
 
+        if ros_attributes is None:
+            ros_attributes = {}
+
+        # output modes, applied as views on the carla image
+        self._image_slices = None
+        self._roi = None
+        self._decimation = 1
+        self._grayscale = attribute_to_bool(ros_attributes.get("ros_image_grayscale", "false"))
+
         if self.__class__.__name__ == "Camera":
             self.node.logwarn("Created Unsupported Camera Actor"
                               "(id={}, type={}, attributes={})".format(self.get_id(),
                                                                        self.carla_actor.type_id,
                                                                        self.carla_actor.attributes))
         else:
+            self._set_image_slices(ros_attributes.get("ros_image_roi"),
+                                   ros_attributes.get("ros_image_decimation"))
             self._build_camera_info()
 
+        self.image_compressor = None
+        if ros_attributes.get("ros_image_compression"):
+            self._create_image_compressor(ros_attributes["ros_image_compression"],
+                                          ros_attributes.get("ros_image_compression_quality"))
+
         self.camera_info_publisher = node.new_publisher(CameraInfo, self.get_topic_prefix() +
                                                         '/camera_info', qos_profile=10)
-        self.camera_image_publisher = node.new_publisher(Image, self.get_topic_prefix() +
-                                                         '/' + 'image', qos_profile=qos.qos_profile_sensor_data)
-        
+
+        self.camera_image_publisher = None
+        if attribute_to_bool(ros_attributes.get("ros_publish_raw_image", "true")):
+            self.camera_image_publisher = node.new_publisher(Image, self.get_topic_prefix() +
+                                                             '/' + 'image', qos_profile=qos.qos_profile_sensor_data)
+
         self._frame_id = frame_id
 
+        # image message reused for every image. The messages are serialized when they are
+        # published, so the message and its data buffer can be overwritten afterwards.
+        self._image_msg = Image()
+
     def destroy(self):
         super(Camera, self).destroy()
         self.node.destroy_publisher(self.camera_info_publisher)
-        self.node.destroy_publisher(self.camera_image_publisher)
+        if self.camera_image_publisher is not None:
+            self.node.destroy_publisher(self.camera_image_publisher)
+        if self.image_compressor is not None:
+            self.image_compressor.destroy()
+
+    def _create_image_compressor(self, image_format, quality):
+        """
+        Private function to set up the compressed image output
+
+        :param image_format: the compression format ('jpeg' or 'png')
+        :type image_format: string
+        :param quality: jpeg quality or png compression level, None for the default
+        :type quality: string
+        """
+        image_format = image_format.lower()
+        if image_format not in COMPRESSION_FORMATS:
+            self.node.logerr("Camera{}: invalid ros_image_compression '{}', expected one of "
+                             "{}".format(self.get_prefix(), image_format,
+                                         ", ".join(sorted(COMPRESSION_FORMATS))))
+            return
+        if quality:
+            try:
+                quality = int(quality)
+            except ValueError:
+                self.node.logerr("Camera{}: invalid ros_image_compression_quality '{}'".format(
+                    self.get_prefix(), quality))
+                return
+        else:
+            quality = None
+        self.image_compressor = ImageCompressor(
+            self.node,
+            self.get_topic_prefix() + '/image/compressed',
+            image_format,
+            quality,
+            self.node.actor_factory.get_image_compression_executor())
+
+    def _set_image_slices(self, roi, decimation):
+        """
+        Private function to set up the region of interest and the decimation of the image
+
+        :param roi: 'x_offset,y_offset,width,height' or None for the full image
+        :type roi: string
+        :param decimation: keep every n-th row and column, None for all
+        :type decimation: string
+        """
+        width = int(self.carla_actor.attributes['image_size_x'])
+        height = int(self.carla_actor.attributes['image_size_y'])
+        if roi:
+            try:
+                x_offset, y_offset, roi_width, roi_height = [int(v) for v in roi.split(",")]
+            except ValueError:
+                self.node.logerr("Camera{}: invalid ros_image_roi '{}', expected "
+                                 "'x_offset,y_offset,width,height'".format(self.get_prefix(), roi))
+            else:
+                if x_offset < 0 or y_offset < 0 or roi_width <= 0 or roi_height <= 0 or \
+                        x_offset + roi_width > width or y_offset + roi_height > height:
+                    self.node.logerr("Camera{}: ros_image_roi '{}' exceeds the image size "
+                                     "{}x{}".format(self.get_prefix(), roi, width, height))
+                else:
+                    self._roi = (x_offset, y_offset, roi_width, roi_height)
+        if decimation:
+            try:
+                self._decimation = max(1, int(decimation))
+            except ValueError:
+                self.node.logerr("Camera{}: invalid ros_image_decimation '{}'".format(
+                    self.get_prefix(), decimation))
+
+        if self._roi is not None or self._decimation > 1:
+            x_offset, y_offset, roi_width, roi_height = self._roi or (0, 0, width, height)
+            # only complete bins are kept, the image has floor(roi / decimation) rows and
+            # columns like image_geometry expects from the binning of the camera info
+            roi_height -= roi_height % self._decimation
+            roi_width -= roi_width % self._decimation
+            self._image_slices = (slice(y_offset, y_offset + roi_height, self._decimation),
+                                  slice(x_offset, x_offset + roi_width, self._decimation))
 
     def _build_camera_info(self):
         """
@@ -117,6 +321,16 @@ class Camera(Sensor):
             camera_info.d = [0.0, 0.0, 0.0, 0.0, 0.0]
             camera_info.r = [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0]
             camera_info.p = [fx, 0.0, cx, 0.0, 0.0, fy, cy, 0.0, 0.0, 0.0, 1.0, 0.0]
+        # the calibration refers to the full resolution image, the crop and decimation of the
+        # published image are described by roi and binning (as applied by image_geometry)
+        if self._roi is not None:
+            camera_info.roi.x_offset = self._roi[0]
+            camera_info.roi.y_offset = self._roi[1]
+            camera_info.roi.width = self._roi[2]
+            camera_info.roi.height = self._roi[3]
+        if self._decimation > 1:
+            camera_info.binning_x = self._decimation
+            camera_info.binning_y = self._decimation
         self._camera_info = camera_info
 
     # pylint: disable=arguments-differ
@@ -125,14 +339,26 @@ class Camera(Sensor):
         Function (override) to transform the received carla camera data
         into a ROS image message
         """
-        img_msg = self.get_ros_image(carla_camera_data)
+        if ((carla_camera_data.height != self._camera_info.height) or
+                (carla_camera_data.width != self._camera_info.width)):
+            self.node.logerr(
+                "Camera{} received image not matching configuration".format(self.get_prefix()))
+        image_data_array, encoding = self.get_output_image_data_array(carla_camera_data)
+        # the camera data is in respect to the camera's own frame
+        header = self.get_msg_header(frame_id=self._frame_id, timestamp=carla_camera_data.timestamp)
 
         cam_info = self._camera_info
-        cam_info.header = img_msg.header
-        self.camera_info_publisher.publish(cam_info)
-        self.camera_image_publisher.publish(img_msg)
+        cam_info.header = header
+        self.publish_message(self.camera_info_publisher, cam_info)
 
-    def get_ros_transform(self, pose, timestamp):
+        if self.image_compressor is not None:
+            # encoded by a worker thread, dropped if the previous image is not done yet
+            self.image_compressor.compress(header, image_data_array, encoding)
+        if self.camera_image_publisher is not None:
+            img_msg = self.create_ros_image(header, image_data_array, encoding)
+            self.publish_message(self.camera_image_publisher, img_msg)
+
+    def create_ros_transform(self, pose, frame_id, child_frame_id):
         """
         Function (override) to modify the tf messages sent by this camera.
         The camera transformation has to be altered to look at the same axis
@@ -140,20 +366,16 @@ class Camera(Sensor):
         :return: the filled tf message
         :rtype: geometry_msgs.msg.TransformStamped
         """
-        tf_msg = super(Camera, self).get_ros_transform(pose, timestamp)
+        tf_msg = super(Camera, self).create_ros_transform(pose, frame_id, child_frame_id)
         rotation = tf_msg.transform.rotation
 
-        quat = [rotation.w, rotation.x, rotation.y, rotation.z]
-        quat_swap = transforms3d.quaternions.mat2quat(numpy.matrix(
-            [[0, 0, 1],
-             [-1, 0, 0],
-             [0, -1, 0]]))
-        quat = transforms3d.quaternions.qmult(quat, quat_swap)
-
-        tf_msg.transform.rotation.w = quat[0]
-        tf_msg.transform.rotation.x = quat[1]
-        tf_msg.transform.rotation.y = quat[2]
-        tf_msg.transform.rotation.z = quat[3]
+        # quaternion multiplication (transforms3d.quaternions.qmult) with the constant swap
+        w, x, y, z = rotation.w, rotation.x, rotation.y, rotation.z
+        swap_w, swap_x, swap_y, swap_z = OPTICAL_FRAME_QUATERNION
+        rotation.w = w * swap_w - x * swap_x - y * swap_y - z * swap_z
+        rotation.x = w * swap_x + x * swap_w + y * swap_z - z * swap_y
+        rotation.y = w * swap_y - x * swap_z + y * swap_w + z * swap_x
+        rotation.z = w * swap_z + x * swap_y - y * swap_x + z * swap_w
 
         return tf_msg
 
@@ -161,15 +383,53 @@ class Camera(Sensor):
         """
         Function to transform the received carla camera data into a ROS image message
         """
-        if ((carla_camera_data.height != self._camera_info.height) or
-                (carla_camera_data.width != self._camera_info.width)):
-            self.node.logerr(
-                "Camera{} received image not matching configuration".format(self.get_prefix()))
-        image_data_array, encoding = self.get_carla_image_data_array(
-            carla_camera_data)
-        img_msg = Camera.cv_bridge.cv2_to_imgmsg(image_data_array, encoding=encoding)
+        image_data_array, encoding = self.get_output_image_data_array(carla_camera_data)
         # the camera data is in respect to the camera's own frame
-        img_msg.header = self.get_msg_header(frame_id=self._frame_id, timestamp=carla_camera_data.timestamp)
+        header = self.get_msg_header(frame_id=self._frame_id, timestamp=carla_camera_data.timestamp)
+        return self.create_ros_image(header, image_data_array, encoding)
+
+    def get_output_image_data_array(self, carla_camera_data):
+        """
+        Function to get the image as published by this camera
+
+        The region of interest and the decimation are applied as views on the image array,
+        the published image is copied only once into the image message.
+
+        :return tuple (numpy data array containing the image information, encoding)
+        :rtype tuple(numpy.ndarray, string)
+        """
+        image_data_array, encoding = self.get_carla_image_data_array(carla_camera_data)
+        if self._image_slices is not None:
+            image_data_array = image_data_array[self._image_slices]
+        if self._grayscale and encoding in ("bgra8", "bgr8"):
+            image_data_array = bgr_to_mono8(image_data_array)
+            encoding = "mono8"
+        return image_data_array, encoding
+
+    def create_ros_image(self, header, image_data_array, encoding):
+        """
+        Function to fill the ROS image message of this camera
+
+        The message is filled directly instead of using cv_bridge.cv2_to_imgmsg(), which copies
+        the image several times. The message is reused for every image.
+
+        :param header: the header of the image
+        :type header: std_msgs.msg.Header
+        :param image_data_array: the image
+        :type image_data_array: numpy.ndarray
+        :param encoding: the encoding of the image
+        :type encoding: string
+        :return: the filled image message
+        :rtype: sensor_msgs.msg.Image
+        """
+        img_msg = self._image_msg
+        img_msg.header = header
+        img_msg.height = image_data_array.shape[0]
+        img_msg.width = image_data_array.shape[1]
+        img_msg.encoding = encoding
+        # step of the contiguous copy in the message (the array may be a strided view)
+        img_msg.step = image_data_array.nbytes // image_data_array.shape[0]
+        img_msg.data = get_msg_data(image_data_array, img_msg.data)
 
         return img_msg
 
@@ -177,7 +437,10 @@ class Camera(Sensor):
     def get_carla_image_data_array(self, carla_camera_data):
         """
         Virtual function to convert the carla camera data to a numpy data array
-        as input for the cv_bridge.cv2_to_imgmsg() function
+        as content of the image message
+
+        Supported encodings are 'bgra8', 'bgr8', 'mono8' and '32FC1'. The array is copied into the
+        message, so it may be a view on the carla raw data or a buffer reused for every image.
 
         :return tuple (numpy data array containing the image information, encoding)
         :rtype tuple(numpy.ndarray, string)
@@ -192,7 +455,7 @@ class RgbCamera(Camera):
     Camera implementation details for rgb camera
     """
 
-    def __init__(self, uid, name, parent, relative_spawn_pose, node, carla_actor, synchronous_mode, frame_id=None):#, fault_config_file=None):
+    def __init__(self, uid, name, parent, relative_spawn_pose, node, carla_actor, synchronous_mode, frame_id=None, ros_attributes=None):#, fault_config_file=None):
         """
         Constructor
 
@@ -210,6 +473,8 @@ class RgbCamera(Camera):
         :type carla_actor: carla.Actor
         :param synchronous_mode: use in synchronous mode?
         :type synchronous_mode: bool
+        :param ros_attributes: spawn attributes handled by the bridge (see Camera)
+        :type ros_attributes: dict
         """
         super(RgbCamera, self).__init__(uid=uid,
                                         name=name,
@@ -218,7 +483,8 @@ class RgbCamera(Camera):
                                         node=node,
                                         carla_actor=carla_actor,
                                         synchronous_mode=synchronous_mode,
-                                        frame_id=frame_id)
+                                        frame_id=frame_id,
+                                        ros_attributes=ros_attributes)
         
         # Initialize the RGBCameraFaultInjector only if faults exist for this sensor
         # if fault_config_file and has_fault_for_sensor(fault_config_file, "RGBCamera"):
@@ -257,7 +523,7 @@ class RgbCamera(Camera):
     def get_carla_image_data_array(self, carla_image):
         """
         Function (override) to convert the carla image to a numpy data array
-        as input for the cv_bridge.cv2_to_imgmsg() function
+        as content of the image message
 
         The RGB camera provides a 4-channel int8 color format (bgra).
 
@@ -280,7 +546,7 @@ class DepthCamera(Camera):
     Camera implementation details for depth camera
     """
 
-    def __init__(self, uid, name, parent, relative_spawn_pose, node, carla_actor, synchronous_mode):
+    def __init__(self, uid, name, parent, relative_spawn_pose, node, carla_actor, synchronous_mode, ros_attributes=None):
         """
         Constructor
 
@@ -298,6 +564,8 @@ class DepthCamera(Camera):
         :type carla_actor: carla.Actor
         :param synchronous_mode: use in synchronous mode?
         :type synchronous_mode: bool
+        :param ros_attributes: spawn attributes handled by the bridge (see Camera)
+        :type ros_attributes: dict
         """
         super(DepthCamera, self).__init__(uid=uid,
                                           name=name,
@@ -305,14 +573,19 @@ class DepthCamera(Camera):
                                           relative_spawn_pose=relative_spawn_pose,
                                           node=node,
                                           carla_actor=carla_actor,
-                                          synchronous_mode=synchronous_mode)
+                                          synchronous_mode=synchronous_mode,
+                                          ros_attributes=ros_attributes)
+
+        # buffers of the depth conversion, reused for every image
+        self._depth_values = None
+        self._depth_image = None
 
         self.listen()
 
     def get_carla_image_data_array(self, carla_image):
         """
         Function (override) to convert the carla image to a numpy data array
-        as input for the cv_bridge.cv2_to_imgmsg() function
+        as content of the image message
 
         The depth camera raw image is converted to a linear depth image
         having 1-channel float32.
@@ -336,19 +609,25 @@ class DepthCamera(Camera):
         #    shape=(carla_image.height, carla_image.width, 1),
         #    dtype=numpy.float32, buffer=carla_image.raw_data)
         #
-        bgra_image = numpy.ndarray(
-            shape=(carla_image.height, carla_image.width, 4),
-            dtype=numpy.uint8, buffer=carla_image.raw_data)
-
         # Apply (R + G * 256 + B * 256 * 256) / (256**3 - 1) * 1000
         # according to the documentation:
         # https://carla.readthedocs.io/en/latest/cameras_and_sensors/#camera-depth-map
-        scales = numpy.array([65536.0, 256.0, 1.0, 0]) / (256**3 - 1) * 1000
-        depth_image = numpy.dot(bgra_image, scales).astype(numpy.float32)
+        #
+        # Read as big endian uint32, a bgra pixel is B << 24 | G << 16 | R << 8 | A, so shifting
+        # out the alpha channel leaves the 24 bit depth value, which is scaled in float32.
+        bgra_image = numpy.ndarray(
+            shape=(carla_image.height, carla_image.width),
+            dtype='>u4', buffer=carla_image.raw_data)
+
+        if self._depth_image is None or self._depth_image.shape != bgra_image.shape:
+            self._depth_values = numpy.empty(bgra_image.shape, dtype=numpy.uint32)
+            self._depth_image = numpy.empty(bgra_image.shape, dtype=numpy.float32)
+        numpy.right_shift(bgra_image, 8, out=self._depth_values)
+        numpy.multiply(self._depth_values, DEPTH_SCALE, out=self._depth_image,
+                       dtype=numpy.float32)
+        depth_image = self._depth_image
 
-        # actually we want encoding '32FC1'
-        # which is automatically selected by cv bridge with passthrough
-        return depth_image, 'passthrough'
+        return depth_image, '32FC1'
 
 
 class SemanticSegmentationCamera(Camera):
@@ -357,7 +636,7 @@ class SemanticSegmentationCamera(Camera):
     Camera implementation details for segmentation camera
     """
 
-    def __init__(self, uid, name, parent, relative_spawn_pose, node, carla_actor, synchronous_mode):
+    def __init__(self, uid, name, parent, relative_spawn_pose, node, carla_actor, synchronous_mode, ros_attributes=None):
         """
         Constructor
 
@@ -375,6 +654,10 @@ class SemanticSegmentationCamera(Camera):
         :type carla_actor: carla.Actor
         :param synchronous_mode: use in synchronous mode?
         :type synchronous_mode: bool
+        :param ros_attributes: spawn attributes handled by the bridge (see Camera), in addition:
+            ros_semantic_output: 'palette' to publish the CityScapes colors as bgra8 (default),
+            'labels' to publish the semantic tags as mono8
+        :type ros_attributes: dict
         """
         super(
             SemanticSegmentationCamera, self).__init__(uid=uid,
@@ -383,29 +666,53 @@ class SemanticSegmentationCamera(Camera):
                                                        relative_spawn_pose=relative_spawn_pose,
                                                        node=node,
                                                        synchronous_mode=synchronous_mode,
-                                                       carla_actor=carla_actor)
+                                                       carla_actor=carla_actor,
+                                                       ros_attributes=ros_attributes)
+
+        if ros_attributes is None:
+            ros_attributes = {}
+        semantic_output = ros_attributes.get("ros_semantic_output", "palette").lower()
+        if semantic_output not in ("palette", "labels"):
+            self.node.logerr("Camera{}: invalid ros_semantic_output '{}', expected 'palette' "
+                             "or 'labels'".format(self.get_prefix(), semantic_output))
+            semantic_output = "palette"
+        self._colorize = semantic_output == "palette"
 
         self.listen()
 
     def get_carla_image_data_array(self, carla_image):
         """
         Function (override) to convert the carla image to a numpy data array
-        as input for the cv_bridge.cv2_to_imgmsg() function
+        as content of the image message
 
-        The segmentation camera raw image is converted to the city scapes palette image
-        having 4-channel uint8.
+        The segmentation camera raw image contains the semantic tag in the red channel, which is
+        returned as 1-channel uint8 label image (a view on the raw data).
 
         :param carla_image: carla image object
         :type carla_image: carla.Image
         :return tuple (numpy data array containing the image information, encoding)
         :rtype tuple(numpy.ndarray, string)
         """
-
-        carla_image.convert(carla.ColorConverter.CityScapesPalette)
-        carla_image_data_array = numpy.ndarray(
+        bgra_image = numpy.ndarray(
             shape=(carla_image.height, carla_image.width, 4),
             dtype=numpy.uint8, buffer=carla_image.raw_data)
-        return carla_image_data_array, 'bgra8'
+        return bgra_image[:, :, 2], 'mono8'
+
+    def get_output_image_data_array(self, carla_image):
+        """
+        Function (override) to colorize the label image with the CityScapes palette
+
+        The lookup table replaces carla.ColorConverter.CityScapesPalette and is applied after
+        the region of interest and the decimation.
+
+        :return tuple (numpy data array containing the image information, encoding)
+        :rtype tuple(numpy.ndarray, string)
+        """
+        labels, encoding = super(SemanticSegmentationCamera, self).get_output_image_data_array(
+            carla_image)
+        if not self._colorize:
+            return labels, encoding
+        return CITYSCAPES_PALETTE_LUT[labels], 'bgra8'
 
 
 class DVSCamera(Camera):
@@ -414,7 +721,7 @@ class DVSCamera(Camera):
     Sensor implementation details for dvs cameras
     """
 
-    def __init__(self, uid, name, parent, relative_spawn_pose, node, carla_actor, synchronous_mode):  # pylint: disable=too-many-arguments
+    def __init__(self, uid, name, parent, relative_spawn_pose, node, carla_actor, synchronous_mode, ros_attributes=None):  # pylint: disable=too-many-arguments
         """
         Constructor
 
@@ -432,6 +739,11 @@ class DVSCamera(Camera):
         :type carla_actor: carla.Actor
         :param synchronous_mode: use in synchronous mode?
         :type synchronous_mode: bool
+        :param ros_attributes: spawn attributes handled by the bridge (see Camera), in addition:
+            ros_dvs_accumulation_time: collect the events of this time window [s] and publish
+            them together (default: 0, publish the events of every sensor tick)
+            ros_dvs_event_decimation: keep every n-th event
+        :type ros_attributes: dict
         """
         super(DVSCamera, self).__init__(uid=uid,
                                         name=name,
@@ -440,9 +752,16 @@ class DVSCamera(Camera):
                                         node=node,
                                         carla_actor=carla_actor,
                                         synchronous_mode=synchronous_mode,
-                                        is_event_sensor=True)
+                                        is_event_sensor=True,
+                                        ros_attributes=ros_attributes)
 
+        if ros_attributes is None:
+            ros_attributes = {}
         self._dvs_events = None
+        self._accumulation_time = float(ros_attributes.get("ros_dvs_accumulation_time", 0.))
+        self._event_decimation = max(1, int(ros_attributes.get("ros_dvs_event_decimation", 1)))
+        self._accumulated_events = []
+        self._accumulation_start = None
         self.dvs_camera_publisher = node.new_publisher(PointCloud2,
                                                        self.get_topic_prefix() +
                                                        '/events', qos_profile=10)
@@ -458,47 +777,61 @@ class DVSCamera(Camera):
         """
         Function to transform the received DVS event array into a ROS message
 
+        With an accumulation time window, the events are collected and published (image and
+        events) once the window is over.
+
         :param carla_dvs_event_array: dvs event array object
         :type carla_image: carla.DVSEventArray
         """
-        super(DVSCamera, self).sensor_data_updated(carla_dvs_event_array)
-
-        header = self.get_msg_header(timestamp=carla_dvs_event_array.timestamp)
-        fields = [
-            PointField(name='x', offset=0, datatype=PointField.UINT16, count=1),
-            PointField(name='y', offset=2, datatype=PointField.UINT16, count=1),
-            PointField(name='t', offset=4, datatype=PointField.FLOAT64, count=1),
-            PointField(name='pol', offset=12, datatype=PointField.INT8, count=1)
-        ]
-
-        dvs_events_msg = create_cloud(header, fields, self._dvs_events.tolist())
-        self.dvs_camera_publisher.publish(dvs_events_msg)
+        events = self.get_raw_data_view(carla_dvs_event_array, DVS_EVENT_DTYPE)
+        if self._event_decimation > 1:
+            events = events[::self._event_decimation]
+
+        if self._accumulation_time > 0.:
+            if self._accumulation_start is None:
+                self._accumulation_start = carla_dvs_event_array.timestamp
+            # the raw data of the event array is only valid during this callback
+            self._accumulated_events.append(numpy.array(events))
+            if carla_dvs_event_array.timestamp - self._accumulation_start < \
+                    self._accumulation_time:
+                return
+            events = numpy.concatenate(self._accumulated_events)
+            self._accumulated_events = []
+            self._accumulation_start = None
+
+        self._dvs_events = events
+        try:
+            super(DVSCamera, self).sensor_data_updated(carla_dvs_event_array)
+
+            header = self.get_msg_header(timestamp=carla_dvs_event_array.timestamp)
+            # written in one pass into the point cloud data (t is converted to float64)
+            dvs_events_msg = create_cloud_from_array(header, DVS_EVENT_FIELDS, events)
+        finally:
+            # do not keep a view on the raw data after the callback
+            self._dvs_events = None
+        self.publish_message(self.dvs_camera_publisher, dvs_events_msg)
 
     # pylint: disable=arguments-differ
     def get_carla_image_data_array(self, carla_dvs_event_array):
         """
         Function (override) to convert the carla dvs event array to a numpy data array
-        as input for the cv_bridge.cv2_to_imgmsg() function
+        as content of the image message
 
-        The carla.DVSEventArray is converted into a 3-channel int8 color image format (bgr).
+        The events to publish (see sensor_data_updated()) are rendered into a 3-channel
+        int8 color image format (bgr).
 
         :param carla_dvs_event_array: dvs event array object
         :type carla_dvs_event_array: carla.DVSEventArray
         :return tuple (numpy data array containing the image information, encoding)
         :rtype tuple(numpy.ndarray, string)
         """
-        self._dvs_events = numpy.frombuffer(carla_dvs_event_array.raw_data,
-                                            dtype=numpy.dtype([
-                                                ('x', numpy.uint16),
-                                                ('y', numpy.uint16),
-                                                ('t', numpy.int64),
-                                                ('pol', numpy.bool)
-                                            ]))
+        events = self._dvs_events
+        if events is None:
+            events = self.get_raw_data_view(carla_dvs_event_array, DVS_EVENT_DTYPE)
         carla_image_data_array = numpy.zeros(
             (carla_dvs_event_array.height, carla_dvs_event_array.width, 3),
             dtype=numpy.uint8)
         # Blue is positive, red is negative
-        carla_image_data_array[self._dvs_events[:]['y'], self._dvs_events[:]['x'],
-                               self._dvs_events[:]['pol'] * 2] = 255
+        carla_image_data_array[events['y'], events['x'], events['pol'] * 2] = 255
 
         return carla_image_data_array, 'bgr8'
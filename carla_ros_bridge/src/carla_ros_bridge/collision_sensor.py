@@ -52,6 +52,8 @@ class CollisionSensor(Sensor):
         self.collision_publisher = node.new_publisher(CarlaCollisionEvent,
                                                       self.get_topic_prefix(),
                                                       qos_profile=10)
+        # functions called with every collision event (e.g. by a fault campaign)
+        self.event_callbacks = []
         self.listen()
 
     def destroy(self):
@@ -73,4 +75,7 @@ class CollisionSensor(Sensor):
         collision_msg.normal_impulse.y = collision_event.normal_impulse.y
         collision_msg.normal_impulse.z = collision_event.normal_impulse.z
 
-        self.collision_publisher.publish(collision_msg)
+        self.publish_message(self.collision_publisher, collision_msg)
+
+        for callback in self.event_callbacks:
+            callback(collision_event)
@@ -122,16 +122,18 @@ class EgoVehicle(Vehicle):
         """
         vehicle_status = CarlaEgoVehicleStatus(
             header=self.get_msg_header("map", timestamp=timestamp))
-        vehicle_status.velocity = self.get_vehicle_speed_abs(self.carla_actor)
+        state = self.get_current_carla_state()
+        vehicle_status.velocity = math.sqrt(self.get_vector_length_squared(state.velocity))
         vehicle_status.acceleration.linear = self.get_current_ros_accel().linear
         vehicle_status.orientation = self.get_current_ros_pose().orientation
-        vehicle_status.control.throttle = self.carla_actor.get_control().throttle
-        vehicle_status.control.steer = self.carla_actor.get_control().steer
-        vehicle_status.control.brake = self.carla_actor.get_control().brake
-        vehicle_status.control.hand_brake = self.carla_actor.get_control().hand_brake
-        vehicle_status.control.reverse = self.carla_actor.get_control().reverse
-        vehicle_status.control.gear = self.carla_actor.get_control().gear
-        vehicle_status.control.manual_gear_shift = self.carla_actor.get_control().manual_gear_shift
+        control = self.carla_actor.get_control()
+        vehicle_status.control.throttle = control.throttle
+        vehicle_status.control.steer = control.steer
+        vehicle_status.control.brake = control.brake
+        vehicle_status.control.hand_brake = control.hand_brake
+        vehicle_status.control.reverse = control.reverse
+        vehicle_status.control.gear = control.gear
+        vehicle_status.control.manual_gear_shift = control.manual_gear_shift
         self.vehicle_status_publisher.publish(vehicle_status)
         
         vehicle_steering = CarlaEgoVehicleSteering(
@@ -153,6 +155,7 @@ class EgoVehicle(Vehicle):
             vehicle_info.type = self.carla_actor.type_id
             vehicle_info.rolename = self.carla_actor.attributes.get('role_name')
             vehicle_physics = self.carla_actor.get_physics_control()
+            inv_T = numpy.array(state.transform.get_inverse_matrix(), dtype=float)
 
             for wheel in vehicle_physics.wheels:
                 wheel_info = CarlaEgoVehicleInfoWheel()
@@ -163,7 +166,6 @@ class EgoVehicle(Vehicle):
                 wheel_info.max_brake_torque = wheel.max_brake_torque
                 wheel_info.max_handbrake_torque = wheel.max_handbrake_torque
 
-                inv_T = numpy.array(self.carla_actor.get_transform().get_inverse_matrix(), dtype=float)
                 wheel_pos_in_map = numpy.array([wheel.position.x/100.0,
                                         wheel.position.y/100.0,
                                         wheel.position.z/100.0,
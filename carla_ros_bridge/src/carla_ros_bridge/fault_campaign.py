@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+
+#
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+#
+"""
+Class to run a campaign of fault injection runs in synchronous mode
+"""
+
+import itertools
+import json
+import os
+import time
+from threading import Lock
+
+import carla
+
+from carla_msgs.msg import CarlaControl
+
+from carla_ros_bridge.collision_sensor import CollisionSensor
+from carla_ros_bridge.lane_invasion_sensor import LaneInvasionSensor
+
+
+class FaultCampaign(object):
+
+    """
+    Runs every combination of scenario, fault file and seed of a manifest, one after another
+
+    The campaign is driven by the synchronous mode loop of the bridge (see update()), so the
+    runs proceed as fast as the simulation ticks. Before each run, the faults of all sensors
+    are reloaded with the seed of the run and the ego vehicle is moved to the spawn point of
+    the scenario, the bridge is not restarted. After each run, one JSON line with the metrics
+    of the run (collisions, lane invasions and fault activations) is appended to the results
+    file. Runs that are already part of the results file are skipped, so an interrupted
+    campaign can be continued.
+
+    Manifest (JSON)::
+
+        {
+            "results_file": "/tmp/fault_campaign_results.jsonl",
+            "role_name": "ego_vehicle",
+            "fault_files": ["A_Lidar_Noise.json", "B_IMU_Gyroscope_Severe.json"],
+            "scenarios": [{"name": "A", "duration": 60.0, "stop_on_collision": true,
+                           "spawn_point": {"x": 70.0, "y": 60.0, "z": 0.5, "yaw": 90.0}}],
+            "seeds": [0, 1, 2]
+        }
+
+    The spawn point is given in CARLA coordinates (like the fault triggers), the time triggers
+    of the faults are relative to the start of the run.
+    """
+
+    def __init__(self, node, manifest_file):
+        """
+        Constructor
+
+        :param node: node-handle
+        :type node: carla_ros_bridge.CarlaRosBridge
+        :param manifest_file: path to the manifest of the campaign
+        :type manifest_file: string
+        """
+        self.node = node
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+
+        # fault files are searched next to the manifest, then in the search path of the bridge
+        directories = [os.path.dirname(os.path.abspath(manifest_file))] + \
+            manifest.get("fault_file_directories", [])
+        fault_files = [self._find_fault_file(fault_file, directories)
+                       for fault_file in manifest["fault_files"]]
+        role_name = manifest.get("role_name", "ego_vehicle")
+        for scenario in manifest["scenarios"]:
+            scenario.setdefault("role_name", role_name)
+        self.results_file = manifest.get("results_file", "/tmp/fault_campaign_results.jsonl")
+
+        completed_runs = set()
+        if os.path.exists(self.results_file):
+            with open(self.results_file, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        result = json.loads(line)
+                        if result.get("end_reason") == "error":
+                            # failed runs are repeated, e.g. after fixing the fault file
+                            continue
+                        completed_runs.add(
+                            (result["scenario"], result["fault_file"], result["seed"]))
+        self._runs = [run for run in itertools.product(manifest["scenarios"], fault_files,
+                                                       manifest.get("seeds", [-1]))
+                      if (run[0]["name"], run[1], run[2]) not in completed_runs]
+        self.node.loginfo("Fault campaign: {} runs ({} already in '{}')".format(
+            len(self._runs), len(completed_runs), self.results_file))
+
+        self._lock = Lock()
+        self._run = None
+        self._run_index = -1
+        self._sensors = []
+        self._collisions = []
+        self._lane_invasions = []
+        self.finished = False
+
+    def _find_fault_file(self, fault_file, directories):
+        try:
+            return self.node.fault_registry.find_fault_file(fault_file, directories)
+        except IOError as e:
+            # the runs with this fault file fail and are recorded as failed (see _start_run())
+            self.node.logwarn("Fault campaign: {}".format(e))
+            return fault_file
+
+    def update(self, frame, timestamp):
+        """
+        Function called after each tick of the synchronous mode loop to start and finish runs
+
+        :param frame: the current frame
+        :type frame: int
+        :param timestamp: the current simulation time
+        :type timestamp: float
+        """
+        if self.finished:
+            return
+        if self._run is not None:
+            scenario = self._run["scenario"]
+            reason = None
+            if timestamp - self._run["start_time"] >= scenario.get("duration", 60.0):
+                reason = "duration"
+            elif scenario.get("stop_on_collision", False) and self._collisions:
+                reason = "collision"
+            if reason is None:
+                return
+            self._finish_run(frame, timestamp, reason)
+
+        while self._run is None:
+            self._run_index += 1
+            if self._run_index >= len(self._runs):
+                self.finished = True
+                self.node.loginfo("Fault campaign finished, results written to '{}'".format(
+                    self.results_file))
+                # stop ticking, the bridge can be resumed with /carla/control
+                self.node.carla_control_queue.put(CarlaControl.PAUSE)
+                return
+            self._start_run(frame, timestamp)
+
+    def _get_actors(self, actor_type, parent_id=None):
+        return [actor for actor in self.node.actor_factory.actors.values()
+                if isinstance(actor, actor_type) and
+                (parent_id is None or
+                 (actor.parent is not None and actor.parent.carla_actor.id == parent_id))]
+
+    def _start_run(self, frame, timestamp):
+        """
+        Start the current run, if its faults can not be loaded the run is recorded as failed
+        and self._run stays None
+        """
+        scenario, fault_file, seed = self._runs[self._run_index]
+        self.node.loginfo("Fault campaign: run {}/{}, scenario '{}', faults '{}', seed {}".format(
+            self._run_index + 1, len(self._runs), scenario["name"], fault_file, seed))
+
+        # the sensors take the new faults over with their next sample
+        try:
+            self.node.fault_registry.load(fault_file, seed, time_offset=timestamp)
+        except (IOError, ValueError) as e:
+            self.node.logerr("Fault campaign: run {} failed to load the faults: {}".format(
+                self._run_index + 1, e))
+            self._write_result({
+                "run": self._run_index,
+                "scenario": scenario["name"],
+                "fault_file": fault_file,
+                "seed": seed,
+                "end_reason": "error",
+                "error": str(e),
+                "start_frame": frame,
+                "end_frame": frame
+            })
+            return
+
+        self._run = {
+            "scenario": scenario,
+            "fault_file": fault_file,
+            "seed": seed,
+            "start_frame": frame,
+            "start_time": timestamp,
+            "start_wall_time": time.time()
+        }
+
+        ego_vehicle = None
+        for carla_actor in self.node.carla_world.get_actors().filter("vehicle.*"):
+            if carla_actor.attributes.get("role_name") == scenario["role_name"]:
+                ego_vehicle = carla_actor
+                break
+        if ego_vehicle is None:
+            self.node.logwarn("Fault campaign: no vehicle with role name '{}'".format(
+                scenario["role_name"]))
+        elif "spawn_point" in scenario:
+            spawn_point = scenario["spawn_point"]
+            ego_vehicle.set_transform(carla.Transform(
+                carla.Location(x=spawn_point.get("x", 0.0), y=spawn_point.get("y", 0.0),
+                               z=spawn_point.get("z", 0.0)),
+                carla.Rotation(roll=spawn_point.get("roll", 0.0),
+                               pitch=spawn_point.get("pitch", 0.0),
+                               yaw=spawn_point.get("yaw", 0.0))))
+            ego_vehicle.set_target_velocity(carla.Vector3D())
+            ego_vehicle.set_target_angular_velocity(carla.Vector3D())
+            ego_vehicle.apply_control(carla.VehicleControl())
+
+        with self.node.actor_factory.lock:
+            self._collisions = []
+            self._lane_invasions = []
+            self._sensors = []
+            if ego_vehicle is not None:
+                for sensor in self._get_actors(CollisionSensor, ego_vehicle.id):
+                    sensor.event_callbacks.append(self._on_collision)
+                    self._sensors.append((sensor, self._on_collision))
+                for sensor in self._get_actors(LaneInvasionSensor, ego_vehicle.id):
+                    sensor.event_callbacks.append(self._on_lane_invasion)
+                    self._sensors.append((sensor, self._on_lane_invasion))
+        if ego_vehicle is not None and not self._sensors:
+            self.node.logwarn("Fault campaign: the vehicle '{}' has no collision and lane invasion "
+                              "sensors, they are not recorded".format(scenario["role_name"]))
+
+    def _finish_run(self, frame, timestamp, reason):
+        with self.node.actor_factory.lock:
+            for sensor, callback in self._sensors:
+                if callback in sensor.event_callbacks:
+                    sensor.event_callbacks.remove(callback)
+        fault_activations = []
+        for fault_injector in self.node.fault_registry.injectors:
+            if fault_injector.fault_set is not fault_injector.active_fault_set:
+                # no sample of this sensor since the faults of the run were loaded
+                continue
+            for name, index, activation_time in fault_injector.fault_activations:
+                fault_activations.append({
+                    "sensor": fault_injector.sensor_name,
+                    "sensor_uid": fault_injector.sensor_uid,
+                    "fault": name,
+                    "fault_id": index,
+                    "time": round(activation_time - self._run["start_time"], 6)
+                })
+        fault_activations.sort(key=lambda activation: activation["time"])
+
+        with self._lock:
+            collisions = self._collisions
+            lane_invasions = self._lane_invasions
+        result = {
+            "run": self._run_index,
+            "scenario": self._run["scenario"]["name"],
+            "fault_file": self._run["fault_file"],
+            "seed": self._run["seed"],
+            "end_reason": reason,
+            "start_frame": self._run["start_frame"],
+            "end_frame": frame,
+            "duration": round(timestamp - self._run["start_time"], 6),
+            "wall_time": round(time.time() - self._run["start_wall_time"], 3),
+            "collisions": len(collisions),
+            "lane_invasions": len(lane_invasions),
+            "collision_events": collisions,
+            "lane_invasion_events": lane_invasions,
+            "fault_activations": fault_activations
+        }
+        self._write_result(result)
+        self._run = None
+
+    def _write_result(self, result):
+        with open(self.results_file, 'a') as f:
+            f.write(json.dumps(result, separators=(",", ":")) + "\n")
+
+    def _on_collision(self, collision_event):
+        with self._lock:
+            self._collisions.append({
+                "time": round(collision_event.timestamp - self._run["start_time"], 6),
+                "other_actor_id": collision_event.other_actor.id,
+                "other_actor_type": collision_event.other_actor.type_id
+            })
+
+    def _on_lane_invasion(self, lane_invasion_event):
+        with self._lock:
+            self._lane_invasions.append({
+                "time": round(lane_invasion_event.timestamp - self._run["start_time"], 6),
+                "crossed_lane_markings": [str(marking.type)
+                                          for marking in lane_invasion_event.crossed_lane_markings]
+            })
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+#
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+#
+"""
+report the processing time of the bridge per frame
+"""
+
+import collections
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+import numpy
+
+import ros_compatibility as roscomp
+
+from diagnostic_msgs.msg import DiagnosticArray, DiagnosticStatus, KeyValue
+
+
+class FrameStats(object):
+    """
+    Collects timing spans of the bridge processing stages and publishes them once per frame.
+
+    A span is the duration of one stage (e.g. 'world.tick', 'update', 'wait_for_data',
+    'conversion', 'publish') of the bridge itself or of a single actor. Besides the spans
+    of the last frame, a rolling history of the span durations is kept per stage and actor
+    type to report the p50/p95/p99 latencies.
+    """
+
+    # number of durations kept per stage and actor type
+    HISTORY_LENGTH = 1000
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, node, enabled=True):
+        """
+        Constructor
+
+        :param node: node-handle
+        :type node: carla_ros_bridge.CarlaRosBridge
+        :param enabled: if False, no spans are recorded and nothing is published
+        :type enabled: bool
+        """
+        self.node = node
+        self.enabled = enabled
+
+        self._lock = Lock()
+        self._spans = []
+        self._history = collections.defaultdict(
+            lambda: collections.deque(maxlen=FrameStats.HISTORY_LENGTH))
+
+        self.stats_publisher = None
+        if self.enabled:
+            self.stats_publisher = self.node.new_publisher(DiagnosticArray, "/carla/bridge_stats",
+                                                           qos_profile=10)
+
+    def destroy(self):
+        if self.stats_publisher is not None:
+            self.node.destroy_publisher(self.stats_publisher)
+
+    @staticmethod
+    def _get_actor_type(actor):
+        return actor.__class__.__name__ if actor is not None else "CarlaRosBridge"
+
+    def add_span(self, stage, duration, actor=None):
+        """
+        add the duration of a processing stage to the current frame
+
+        :param stage: name of the processing stage
+        :type stage: string
+        :param duration: duration in seconds
+        :type duration: float
+        :param actor: the actor the stage belongs to (None for the bridge itself)
+        :type actor: carla_ros_bridge.PseudoActor
+        """
+        if not self.enabled:
+            return
+        actor_type = self._get_actor_type(actor)
+        with self._lock:
+            self._spans.append((stage, actor_type, actor.uid if actor is not None else None,
+                                duration))
+            self._history[(stage, actor_type)].append(duration)
+
+    @contextmanager
+    def span(self, stage, actor=None):
+        """
+        context manager measuring the duration of a processing stage
+
+        :param stage: name of the processing stage
+        :type stage: string
+        :param actor: the actor the stage belongs to (None for the bridge itself)
+        :type actor: carla_ros_bridge.PseudoActor
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(stage, time.perf_counter() - start, actor)
+
+    def get_percentiles(self):
+        """
+        get the latency percentiles of the rolling history
+
+        :return: dict (stage, actor type) -> (p50, p95, p99) in seconds
+        :rtype: dict
+        """
+        with self._lock:
+            history = {key: numpy.array(durations) for key, durations in self._history.items()}
+        return {key: tuple(numpy.percentile(durations, FrameStats.PERCENTILES))
+                for key, durations in history.items()}
+
+    def publish(self, frame, timestamp):
+        """
+        publish the spans collected since the last call and start a new frame
+
+        :param frame: the frame the spans belong to
+        :type frame: int
+        :param timestamp: the timestamp of the frame
+        :type timestamp: float
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            spans = self._spans
+            self._spans = []
+
+        frame_status = DiagnosticStatus(level=DiagnosticStatus.OK,
+                                        name="carla_ros_bridge: frame",
+                                        message="frame {}".format(frame))
+        for stage, actor_type, uid, duration in spans:
+            key = stage if uid is None else "{}/{}({})".format(stage, actor_type, uid)
+            frame_status.values.append(KeyValue(key=key, value="{:.3f}".format(duration * 1000.)))
+
+        percentile_status = DiagnosticStatus(level=DiagnosticStatus.OK,
+                                             name="carla_ros_bridge: latency",
+                                             message="p50/p95/p99 [ms] of the last {} spans".format(
+                                                 FrameStats.HISTORY_LENGTH))
+        for (stage, actor_type), percentiles in sorted(self.get_percentiles().items()):
+            percentile_status.values.append(KeyValue(
+                key="{}/{}".format(stage, actor_type),
+                value="/".join("{:.3f}".format(p * 1000.) for p in percentiles)))
+
+        stats_msg = DiagnosticArray(status=[frame_status, percentile_status])
+        stats_msg.header.stamp = roscomp.ros_timestamp(sec=timestamp, from_sec=True)
+        self.stats_publisher.publish(stats_msg)
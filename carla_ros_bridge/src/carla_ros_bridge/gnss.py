@@ -57,7 +57,8 @@ class Gnss(Sensor):
         #     self.fault_injector = GNSSFaultInjector(fault_config_file)
         # else:
         #     self.fault_injector = None
-        self.fault_injector = GNSSFaultInjector()
+        self.fault_injector = GNSSFaultInjector(sensor_uid=uid)
+        node.fault_registry.register(self.fault_injector)
 
         self.gnss_publisher = node.new_publisher(NavSatFix,
                                                  self.get_topic_prefix(),
@@ -93,7 +94,7 @@ class Gnss(Sensor):
         if self.fault_injector:
             navsatfix_msg = self.fault_injector.apply_faults(navsatfix_msg)
 
-        self.gnss_publisher.publish(navsatfix_msg)
+        self.publish_message(self.gnss_publisher, navsatfix_msg)
 
         # Extract GNSS data (latitude, longitude, altitude) from the sensor data
         current_location = {
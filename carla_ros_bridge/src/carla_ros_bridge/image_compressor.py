@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+#
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+#
+"""
+Class to publish compressed camera images
+"""
+
+from threading import Lock
+
+import cv2
+
+from sensor_msgs.msg import CompressedImage
+
+from carla_ros_bridge.sensor import get_msg_data
+
+# supported formats with the default quality
+# (jpeg: quality 0..100, png: compression level 0..9)
+COMPRESSION_FORMATS = {
+    "jpeg": 90,
+    "png": 3
+}
+
+# encodings of the raw image that can be compressed and the encoding of the compressed image
+COMPRESSIBLE_ENCODINGS = {
+    "jpeg": {"bgra8": "bgr8", "bgr8": "bgr8", "mono8": "mono8"},
+    "png": {"bgra8": "bgra8", "bgr8": "bgr8", "mono8": "mono8"}
+}
+
+
+class ImageCompressor(object):
+
+    """
+    Encodes camera images and publishes them as sensor_msgs/CompressedImage
+
+    The encoding runs on a thread pool, so it does not block the update of the frame. Each
+    camera has at most one image in flight. While it is encoded, further images of the camera
+    are dropped (the raw images are published independently of this).
+    """
+
+    def __init__(self, node, topic, image_format, quality, executor):
+        """
+        Constructor
+
+        :param node: node-handle
+        :type node: carla_ros_bridge.CarlaRosBridge
+        :param topic: the topic of the compressed images
+        :type topic: string
+        :param image_format: the compression format ('jpeg' or 'png')
+        :type image_format: string
+        :param quality: jpeg quality (0..100) or png compression level (0..9),
+            None for the default of the format
+        :type quality: int
+        :param executor: the thread pool to encode the images
+        :type executor: concurrent.futures.Executor
+        """
+        if image_format not in COMPRESSION_FORMATS:
+            raise ValueError("Unsupported image compression format '{}' (supported: {})".format(
+                image_format, ", ".join(sorted(COMPRESSION_FORMATS))))
+        self.node = node
+        self.image_format = image_format
+        if quality is None:
+            quality = COMPRESSION_FORMATS[image_format]
+        if image_format == "jpeg":
+            self._encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)]
+        else:
+            self._encode_params = [int(cv2.IMWRITE_PNG_COMPRESSION), int(quality)]
+        self._executor = executor
+
+        self._lock = Lock()
+        self._in_flight = False
+        self.dropped_images = 0
+        self._unsupported_encodings = set()
+
+        self.publisher = node.new_publisher(CompressedImage, topic, qos_profile=10)
+
+    def destroy(self):
+        self.node.destroy_publisher(self.publisher)
+
+    def compress(self, header, image, encoding):
+        """
+        queue an image for compression and publishing
+
+        The image may be a view on the carla raw data or a reused buffer, which are only valid
+        during the sensor callback. A queued image is copied for the worker thread.
+
+        :param header: the header of the image
+        :type header: std_msgs.msg.Header
+        :param image: the image
+        :type image: numpy.ndarray
+        :param encoding: the encoding of the image
+        :type encoding: string
+        :return: True if the image was queued, False if it was dropped
+        :rtype: bool
+        """
+        if encoding not in COMPRESSIBLE_ENCODINGS[self.image_format]:
+            if encoding in self._unsupported_encodings:
+                return False
+            self._unsupported_encodings.add(encoding)
+            self.node.logwarn("Images with encoding '{}' can not be compressed as {}".format(
+                encoding, self.image_format))
+            return False
+        with self._lock:
+            if self._in_flight:
+                self.dropped_images += 1
+                return False
+            self._in_flight = True
+        if encoding == "bgra8" and COMPRESSIBLE_ENCODINGS[self.image_format][encoding] == "bgr8":
+            image = image[:, :, :3]
+        try:
+            self._executor.submit(self._compress, header, image.copy(), encoding)
+        except RuntimeError:
+            # executor already shut down
+            with self._lock:
+                self._in_flight = False
+            return False
+        return True
+
+    def _compress(self, header, image, encoding):
+        try:
+            compressed_encoding = COMPRESSIBLE_ENCODINGS[self.image_format][encoding]
+            success, data = cv2.imencode("." + self.image_format, image, self._encode_params)
+            if not success:
+                self.node.logwarn("Failed to compress image as {}".format(self.image_format))
+                return
+            # same as the format set by the compressed image_transport plugin
+            msg = CompressedImage(header=header,
+                                  format="{}; {} compressed {}".format(
+                                      encoding, self.image_format, compressed_encoding),
+                                  data=get_msg_data(data))
+            self.publisher.publish(msg)
+        except Exception as e:
+            self.node.logwarn("Failed to publish compressed image: {}".format(e))
+        finally:
+            with self._lock:
+                self._in_flight = False
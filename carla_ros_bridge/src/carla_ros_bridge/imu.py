@@ -54,7 +54,8 @@ class ImuSensor(Sensor):
         # Initialize the IMUFaultInjector only if faults exist for this sensor
         #if fault_config_file and has_fault_for_sensor(fault_config_file, "IMUSensor"):
         # We now load the injection file dynamically
-        self.fault_injector = IMUFaultInjector()
+        self.fault_injector = IMUFaultInjector(sensor_uid=uid)
+        node.fault_registry.register(self.fault_injector)
         #else:
         #self.fault_injector = None
             
@@ -105,4 +106,4 @@ class ImuSensor(Sensor):
         if self.fault_injector:
             imu_msg = self.fault_injector.apply_faults(imu_msg)
 
-        self.imu_publisher.publish(imu_msg)
\ No newline at end of file
+        self.publish_message(self.imu_publisher, imu_msg)
\ No newline at end of file
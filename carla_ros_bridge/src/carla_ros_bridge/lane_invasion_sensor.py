@@ -52,6 +52,8 @@ class LaneInvasionSensor(Sensor):
         self.lane_invasion_publisher = node.new_publisher(CarlaLaneInvasionEvent,
                                                           self.get_topic_prefix(),
                                                           qos_profile=10)
+        # functions called with every lane invasion event (e.g. by a fault campaign)
+        self.event_callbacks = []
         self.listen()
 
     def destroy(self):
@@ -70,4 +72,7 @@ class LaneInvasionSensor(Sensor):
         lane_invasion_msg.header = self.get_msg_header(timestamp=lane_invasion_event.timestamp)
         for marking in lane_invasion_event.crossed_lane_markings:
             lane_invasion_msg.crossed_lane_markings.append(marking.type)
-        self.lane_invasion_publisher.publish(lane_invasion_msg)
+        self.publish_message(self.lane_invasion_publisher, lane_invasion_msg)
+
+        for callback in self.event_callbacks:
+            callback(lane_invasion_event)
@@ -16,7 +16,7 @@ import json
 from datetime import datetime
 import logging
 
-from carla_ros_bridge.sensor import Sensor, create_cloud
+from carla_ros_bridge.sensor import Sensor, create_cloud_from_array, get_cloud_dtype
 
 from carla_ros_bridge.FaultInjector.LidarFaultInjector import LidarFaultInjector
 from carla_ros_bridge.FaultInjector.Tools import has_fault_for_sensor
@@ -25,6 +25,24 @@ from rclpy import qos
 
 logger = logging.getLogger(__name__)
 
+LIDAR_FIELDS = [
+    PointField(name='x', offset=0, datatype=PointField.FLOAT32, count=1),
+    PointField(name='y', offset=4, datatype=PointField.FLOAT32, count=1),
+    PointField(name='z', offset=8, datatype=PointField.FLOAT32, count=1),
+    PointField(name='intensity', offset=12, datatype=PointField.FLOAT32, count=1),
+    PointField(name='ring', offset=16, datatype=PointField.UINT16, count=1)
+]
+LIDAR_DTYPE = get_cloud_dtype(LIDAR_FIELDS)
+
+SEMANTIC_LIDAR_FIELDS = [
+    PointField(name='x', offset=0, datatype=PointField.FLOAT32, count=1),
+    PointField(name='y', offset=4, datatype=PointField.FLOAT32, count=1),
+    PointField(name='z', offset=8, datatype=PointField.FLOAT32, count=1),
+    PointField(name='CosAngle', offset=12, datatype=PointField.FLOAT32, count=1),
+    PointField(name='ObjIdx', offset=16, datatype=PointField.UINT32, count=1),
+    PointField(name='ObjTag', offset=20, datatype=PointField.UINT32, count=1)
+]
+
 class Lidar(Sensor):
 
     """
@@ -59,7 +77,8 @@ class Lidar(Sensor):
                                     synchronous_mode=synchronous_mode)
         
         # # Initialize the LidarFaultInjector only if faults exist for this sensor
-        self.fault_injector = LidarFaultInjector()
+        self.fault_injector = LidarFaultInjector(sensor_uid=uid)
+        node.fault_registry.register(self.fault_injector)
         # if fault_config_file and has_fault_for_sensor(fault_config_file, "LidarSensor"):
         #     self.fault_injector = LidarFaultInjector(fault_config_file)
         # else:
@@ -85,52 +104,37 @@ class Lidar(Sensor):
         :type carla_lidar_measurement: carla.LidarMeasurement
         """
         header = self.get_msg_header(frame_id=self._frame_id , timestamp=carla_lidar_measurement.timestamp)
-        fields = [
-            PointField(name='x', offset=0, datatype=PointField.FLOAT32, count=1),
-            PointField(name='y', offset=4, datatype=PointField.FLOAT32, count=1),
-            PointField(name='z', offset=8, datatype=PointField.FLOAT32, count=1),
-            PointField(name='intensity', offset=12, datatype=PointField.FLOAT32, count=1),
-            PointField(name='ring', offset=16, datatype=PointField.UINT16, count=1)
-        ]
-
-        lidar_data = numpy.fromstring(
-            bytes(carla_lidar_measurement.raw_data), dtype=numpy.float32)
-        lidar_data = numpy.reshape(
-            lidar_data, (int(lidar_data.shape[0] / 4), 4))
-        
-        ring = numpy.empty((0,1), object)
-        
-        for i in range(self.channels):
-            current_ring_points_count = carla_lidar_measurement.get_point_count(i)
-            ring = numpy.vstack((
-                ring,
-                numpy.full((current_ring_points_count, 1), i)))
-        
-        lidar_data = numpy.hstack((lidar_data, ring))
-        
+
+        lidar_data = self.get_raw_data_view(carla_lidar_measurement, numpy.float32)
+        lidar_data = numpy.reshape(lidar_data, (-1, 4))
+
+        # carla delivers the points ordered by channel, so the ring column is
+        # the channel index repeated by the number of points of each channel
+        ring_points_count = [carla_lidar_measurement.get_point_count(i)
+                             for i in range(self.channels)]
+
+        # the points are copied out of the raw data into the packed point layout
+        points = numpy.empty(lidar_data.shape[0], dtype=LIDAR_DTYPE)
+        for index, name in enumerate(('x', 'y', 'z', 'intensity')):
+            points[name] = lidar_data[:, index]
+        self.bytes_copied += lidar_data.nbytes
+        points['ring'] = numpy.repeat(
+            numpy.arange(self.channels, dtype=numpy.uint16), ring_points_count)
+
+        # we take the opposite of y axis
+        # (as lidar point are express in left handed coordinate system, and ros need right handed)
+        points['y'] *= -1
+
         # Apply fault injection if enabled
         if self.fault_injector and self.fault_injector.skip_message == True:
             logger.warning("Skipping LiDAR message due to fault injection.")
             return
-        
-        if self.fault_injector:
-            lidar_data = self.fault_injector.apply_faults({"points": lidar_data})["points"]
-
-        # we take the opposite of y axis
-        # (as lidar point are express in left handed coordinate system, and ros need right handed)
-        lidar_data[:, 1] *= -1
 
-        # Now convert to list of tuples for create_cloud
-        if lidar_data.shape[1] == 5:
-            points_for_ros = [
-                (float(x), float(y), float(z), float(intensity), int(ring))
-                for x, y, z, intensity, ring in lidar_data
-            ]
-        else:
-            points_for_ros = lidar_data.tolist()
+        if self.fault_injector and self.fault_injector.active_faults:
+            points = self.fault_injector.apply_faults({"points": points})["points"]
 
-        point_cloud_msg = create_cloud(header, fields, points_for_ros)
-        self.lidar_publisher.publish(point_cloud_msg)
+        point_cloud_msg = create_cloud_from_array(header, LIDAR_FIELDS, points)
+        self.publish_message(self.lidar_publisher, point_cloud_msg)
 
         # Log the LiDAR data
         self.log_sensor_data(carla_lidar_measurement)
@@ -204,30 +208,22 @@ class SemanticLidar(Sensor):
         :type carla_lidar_measurement: carla.SemanticLidarMeasurement
         """
         header = self.get_msg_header(timestamp=carla_lidar_measurement.timestamp)
-        fields = [
-            PointField(name='x', offset=0, datatype=PointField.FLOAT32, count=1),
-            PointField(name='y', offset=4, datatype=PointField.FLOAT32, count=1),
-            PointField(name='z', offset=8, datatype=PointField.FLOAT32, count=1),
-            PointField(name='CosAngle', offset=12, datatype=PointField.FLOAT32, count=1),
-            PointField(name='ObjIdx', offset=16, datatype=PointField.UINT32, count=1),
-            PointField(name='ObjTag', offset=20, datatype=PointField.UINT32, count=1)
-        ]
-
-        lidar_data = numpy.fromstring(bytes(carla_lidar_measurement.raw_data),
-                                      dtype=numpy.dtype([
-                                          ('x', numpy.float32),
-                                          ('y', numpy.float32),
-                                          ('z', numpy.float32),
-                                          ('CosAngle', numpy.float32),
-                                          ('ObjIdx', numpy.uint32),
-                                          ('ObjTag', numpy.uint32)
-                                      ]))
+        lidar_data = self.get_raw_data_view(carla_lidar_measurement,
+                                            dtype=numpy.dtype([
+                                                ('x', numpy.float32),
+                                                ('y', numpy.float32),
+                                                ('z', numpy.float32),
+                                                ('CosAngle', numpy.float32),
+                                                ('ObjIdx', numpy.uint32),
+                                                ('ObjTag', numpy.uint32)
+                                            ]))
 
         # we take the oposite of y axis
         # (as lidar point are express in left handed coordinate system, and ros need right handed)
+        lidar_data = self.get_writable_array(lidar_data)
         lidar_data['y'] *= -1
-        point_cloud_msg = create_cloud(header, fields, lidar_data.tolist())
-        self.semantic_lidar_publisher.publish(point_cloud_msg)
+        point_cloud_msg = create_cloud_from_array(header, SEMANTIC_LIDAR_FIELDS, lidar_data)
+        self.publish_message(self.semantic_lidar_publisher, point_cloud_msg)
 
         # Log the Semantic LiDAR data
         self.log_sensor_data(carla_lidar_measurement)
@@ -11,14 +11,18 @@ handle a marker sensor
 
 import itertools
 
+import numpy
+
 import carla
 
 from ros_compatibility.qos import QoSProfile, DurabilityPolicy
 
 from carla_ros_bridge.pseudo_actor import PseudoActor
 from carla_ros_bridge.traffic_participant import TrafficParticipant
+from carla_ros_bridge.vehicle import Vehicle
 from carla_common.transforms import carla_location_to_ros_point, carla_rotation_to_ros_quaternion
 
+from geometry_msgs.msg import Point, Pose, Quaternion
 from std_msgs.msg import ColorRGBA
 from visualization_msgs.msg import MarkerArray, Marker
 
@@ -149,7 +153,55 @@ class MarkerSensor(PseudoActor):
         :return:
         """
         marker_array_msg = MarkerArray()
-        for actor in self.actor_list.values():
-            if isinstance(actor, TrafficParticipant):
-                marker_array_msg.markers.append(actor.get_marker(timestamp))
+        actors = [actor for actor in list(self.actor_list.values())
+                  if isinstance(actor, TrafficParticipant)]
+        if actors:
+            marker_array_msg.markers = self.get_markers(actors, timestamp)
         self.marker_publisher.publish(marker_array_msg)
+
+    def get_markers(self, actors, timestamp=None):
+        """
+        Function to create the markers of several traffic participants at once.
+
+        The result is equal to calling get_marker() of each traffic participant, but the
+        states are converted for all of them with single numpy operations.
+
+        :param actors: the traffic participants
+        :type actors: list(carla_ros_bridge.TrafficParticipant)
+        :return: list of visualization_msgs.msg.Marker
+        """
+        states = TrafficParticipant.get_state_arrays(actors)
+        positions = states['position']
+        orientations = states['orientation']
+        extents = states['extent']
+
+        # Moving pivot point of the vehicles from the bottom (CARLA) to the center (ROS)
+        # of the bounding box, along the z-axis of the vehicle (see Vehicle.get_marker_pose())
+        w, x, y, z = orientations.T
+        up_vectors = numpy.stack([2. * (x * z + w * y),
+                                  2. * (y * z - w * x),
+                                  1. - 2. * (x * x + y * y)], axis=-1)
+        is_vehicle = numpy.array([isinstance(actor, Vehicle) for actor in actors])
+        positions = positions + up_vectors * (extents[:, 2] * is_vehicle)[:, numpy.newaxis]
+
+        # all markers share the same header
+        header = self.get_msg_header(frame_id="map", timestamp=timestamp)
+        markers = []
+        for actor, position, orientation, scale in zip(actors,
+                                                       positions.tolist(),
+                                                       orientations.tolist(),
+                                                       (extents * 2.0).tolist()):
+            marker = Marker(header=header)
+            marker.color = actor.get_marker_color()
+            marker.color.a = 0.3
+            marker.id = actor.get_id()
+            marker.type = Marker.CUBE
+            marker.pose = Pose(
+                position=Point(x=position[0], y=position[1], z=position[2]),
+                orientation=Quaternion(w=orientation[0], x=orientation[1],
+                                       y=orientation[2], z=orientation[3]))
+            marker.scale.x = scale[0]
+            marker.scale.y = scale[1]
+            marker.scale.z = scale[2]
+            markers.append(marker)
+        return markers
@@ -10,10 +10,13 @@ handle a object sensor
 """
 
 from carla_ros_bridge.pseudo_actor import PseudoActor
+from carla_ros_bridge.traffic_participant import TrafficParticipant
 from carla_ros_bridge.vehicle import Vehicle
 from carla_ros_bridge.walker import Walker
 
-from derived_object_msgs.msg import ObjectArray
+from derived_object_msgs.msg import Object, ObjectArray
+from geometry_msgs.msg import Accel, Point, Pose, Quaternion, Twist, Vector3
+from shape_msgs.msg import SolidPrimitive
 
 
 class ObjectSensor(PseudoActor):
@@ -73,12 +76,58 @@ class ObjectSensor(PseudoActor):
         """
         ros_objects = ObjectArray()
         ros_objects.header = self.get_msg_header(frame_id="map", timestamp=timestamp)
-        for actor_id in self.actor_list.keys():
-            # currently only Vehicles and Walkers are added to the object array
-            if self.parent is None or self.parent.uid != actor_id:
-                actor = self.actor_list[actor_id]
-                if isinstance(actor, Vehicle):
-                    ros_objects.objects.append(actor.get_object_info())
-                elif isinstance(actor, Walker):
-                    ros_objects.objects.append(actor.get_object_info())
+        # currently only Vehicles and Walkers are added to the object array
+        actors = [actor for actor_id, actor in list(self.actor_list.items())
+                  if isinstance(actor, (Vehicle, Walker)) and
+                  (self.parent is None or self.parent.uid != actor_id)]
+        if actors:
+            ros_objects.objects = self.get_objects(actors)
         self.object_publisher.publish(ros_objects)
+
+    def get_objects(self, actors):
+        """
+        Function to create the object messages of several traffic participants at once.
+
+        The result is equal to calling get_object_info() of each traffic participant, but the
+        states are converted for all of them with single numpy operations.
+
+        :param actors: the traffic participants
+        :type actors: list(carla_ros_bridge.TrafficParticipant)
+        :return: list of derived_object_msgs.msg.Object
+        """
+        states = TrafficParticipant.get_state_arrays(actors)
+        # all objects share the same header
+        header = self.get_msg_header("map")
+        objects = []
+        for actor, position, orientation, linear_velocity, angular_velocity, acceleration, \
+                dimensions in zip(actors,
+                                  states['position'].tolist(),
+                                  states['orientation'].tolist(),
+                                  states['linear_velocity'].tolist(),
+                                  states['angular_velocity'].tolist(),
+                                  states['acceleration'].tolist(),
+                                  (states['extent'] * 2.0).tolist()):
+            obj = Object(header=header)
+            obj.id = actor.get_id()
+            obj.pose = Pose(
+                position=Point(x=position[0], y=position[1], z=position[2]),
+                orientation=Quaternion(w=orientation[0], x=orientation[1],
+                                       y=orientation[2], z=orientation[3]))
+            obj.twist = Twist(
+                linear=Vector3(x=linear_velocity[0], y=linear_velocity[1], z=linear_velocity[2]),
+                angular=Vector3(x=angular_velocity[0], y=angular_velocity[1],
+                                z=angular_velocity[2]))
+            obj.accel = Accel(
+                linear=Vector3(x=acceleration[0], y=acceleration[1], z=acceleration[2]))
+            obj.shape.type = SolidPrimitive.BOX
+            obj.shape.dimensions.extend(dimensions)
+
+            # Classification if available in attributes
+            classification = actor.get_classification()
+            if classification != Object.CLASSIFICATION_UNKNOWN:
+                obj.object_classified = True
+                obj.classification = classification
+                obj.classification_certainty = 255
+                obj.classification_age = actor.classification_age
+            objects.append(obj)
+        return objects
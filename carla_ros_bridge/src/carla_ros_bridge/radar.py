@@ -10,12 +10,31 @@
 Classes to handle Carla Radar
 """
 
-import numpy as np
+import numpy
 
-from carla_ros_bridge.sensor import Sensor, create_cloud
+from carla_ros_bridge.sensor import Sensor, create_cloud_from_array, get_cloud_dtype
 
 from sensor_msgs.msg import PointCloud2, PointField
 
+# memory layout of a carla.RadarDetection within carla.RadarMeasurement.raw_data
+RADAR_DETECTION_DTYPE = numpy.dtype([
+    ('velocity', numpy.float32),
+    ('azimuth', numpy.float32),
+    ('altitude', numpy.float32),
+    ('depth', numpy.float32)
+])
+
+RADAR_FIELDS = [
+    PointField(name='x', offset=0, datatype=PointField.FLOAT32, count=1),
+    PointField(name='y', offset=4, datatype=PointField.FLOAT32, count=1),
+    PointField(name='z', offset=8, datatype=PointField.FLOAT32, count=1),
+    PointField(name='Range', offset=12, datatype=PointField.FLOAT32, count=1),
+    PointField(name='Velocity', offset=16, datatype=PointField.FLOAT32, count=1),
+    PointField(name='AzimuthAngle', offset=20, datatype=PointField.FLOAT32, count=1),
+    PointField(name='ElevationAngle', offset=24, datatype=PointField.FLOAT32, count=1)
+]
+RADAR_DTYPE = get_cloud_dtype(RADAR_FIELDS)
+
 
 class Radar(Sensor):
 
@@ -64,21 +83,20 @@ class Radar(Sensor):
         :param carla_radar_measurement: carla Radar measurement object
         :type carla_radar_measurement: carla.RadarMeasurement
         """
-        fields = [
-            PointField(name='x', offset=0, datatype=PointField.FLOAT32, count=1),
-            PointField(name='y', offset=4, datatype=PointField.FLOAT32, count=1),
-            PointField(name='z', offset=8, datatype=PointField.FLOAT32, count=1),
-            PointField(name='Range', offset=12, datatype=PointField.FLOAT32, count=1),
-            PointField(name='Velocity', offset=16, datatype=PointField.FLOAT32, count=1),
-            PointField(name='AzimuthAngle', offset=20, datatype=PointField.FLOAT32, count=1),
-            PointField(name='ElevationAngle', offset=28, datatype=PointField.FLOAT32, count=1)]
-        points = []
-        for detection in carla_radar_measurement:
-            points.append([detection.depth * np.cos(detection.azimuth) * np.cos(-detection.altitude),
-                           detection.depth * np.sin(-detection.azimuth) *
-                           np.cos(detection.altitude),
-                           detection.depth * np.sin(detection.altitude),
-                           detection.depth, detection.velocity, detection.azimuth, detection.altitude])
-        radar_msg = create_cloud(self.get_msg_header(
-            timestamp=carla_radar_measurement.timestamp), fields, points)
-        self.radar_publisher.publish(radar_msg)
+        detections = self.get_raw_data_view(carla_radar_measurement, RADAR_DETECTION_DTYPE)
+
+        # polar detections to cartesian coordinates, taking the opposite of the y axis
+        # (as carla uses a left handed coordinate system, and ros a right handed one)
+        points = numpy.empty(len(detections), dtype=RADAR_DTYPE)
+        cos_altitude = numpy.cos(detections['altitude'])
+        points['x'] = detections['depth'] * numpy.cos(detections['azimuth']) * cos_altitude
+        points['y'] = -detections['depth'] * numpy.sin(detections['azimuth']) * cos_altitude
+        points['z'] = detections['depth'] * numpy.sin(detections['altitude'])
+        points['Range'] = detections['depth']
+        points['Velocity'] = detections['velocity']
+        points['AzimuthAngle'] = detections['azimuth']
+        points['ElevationAngle'] = detections['altitude']
+
+        radar_msg = create_cloud_from_array(self.get_msg_header(
+            timestamp=carla_radar_measurement.timestamp), RADAR_FIELDS, points)
+        self.publish_message(self.radar_publisher, radar_msg)
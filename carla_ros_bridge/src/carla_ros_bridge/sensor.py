@@ -11,6 +11,7 @@ Classes to handle Carla sensors
 
 from __future__ import print_function
 
+import array
 import ctypes
 import os
 try:
@@ -19,9 +20,12 @@ except ImportError:
     import Queue as queue
 import struct
 import sys
+import time
 from abc import abstractmethod
 from threading import Lock
 
+import numpy
+
 import carla_common.transforms as trans
 import ros_compatibility as roscomp
 import tf2_ros
@@ -30,7 +34,6 @@ from carla_ros_bridge.actor import Actor
 
 from sensor_msgs.msg import PointCloud2, PointField
 from std_msgs.msg import Bool
-from std_msgs.msg import String 
 
 ROS_VERSION = roscomp.get_ros_version()
 
@@ -44,6 +47,16 @@ _DATATYPES[PointField.UINT32] = ('I', 4)
 _DATATYPES[PointField.FLOAT32] = ('f', 4)
 _DATATYPES[PointField.FLOAT64] = ('d', 8)
 
+_NUMPY_DATATYPES = {}
+_NUMPY_DATATYPES[PointField.INT8] = numpy.dtype(numpy.int8)
+_NUMPY_DATATYPES[PointField.UINT8] = numpy.dtype(numpy.uint8)
+_NUMPY_DATATYPES[PointField.INT16] = numpy.dtype(numpy.int16)
+_NUMPY_DATATYPES[PointField.UINT16] = numpy.dtype(numpy.uint16)
+_NUMPY_DATATYPES[PointField.INT32] = numpy.dtype(numpy.int32)
+_NUMPY_DATATYPES[PointField.UINT32] = numpy.dtype(numpy.uint32)
+_NUMPY_DATATYPES[PointField.FLOAT32] = numpy.dtype(numpy.float32)
+_NUMPY_DATATYPES[PointField.FLOAT64] = numpy.dtype(numpy.float64)
+
 import logging
 import json
 from datetime import datetime
@@ -117,44 +130,31 @@ class Sensor(Actor):
         self.logging_enabled = False  # Flag to control logging
         self.fault_injector = None
 
+        # bytes of carla raw data copied while processing the last sensor message
+        # (see get_raw_data_view() and get_writable_array())
+        self.bytes_copied = 0
+        self.bytes_copied_total = 0
+
+        # time spent in publish_message() while processing the current sensor message
+        self._publish_duration = 0.
+
+        # tf message of the relative spawn pose, reused in synchronous mode
+        self._relative_ros_transform = None
+
         try:
             self.sensor_tick_time = float(carla_actor.attributes["sensor_tick"])
             node.logdebug("Sensor tick time is {}".format(self.sensor_tick_time))
         except (KeyError, ValueError):
             self.sensor_tick_time = None
 
-        if ROS_VERSION == 1:
-            self._tf_broadcaster = tf2_ros.TransformBroadcaster()
-        elif ROS_VERSION == 2:
-            self._tf_broadcaster = tf2_ros.TransformBroadcaster(node)
-
-        # Subscribe to the fault injection file topic
-        self.node.create_subscription(
-            String,
-            '/fault_injection_file',
-            self._fault_injection_file_callback,
-            qos_profile=10
-        )
-    
-    def _fault_injection_file_callback(self, msg):
-        """
-        Callback to handle updates to the fault injection file.
-
-        :param msg: ROS message containing the new fault injection file name.
-        :type msg: std_msgs.msg.String
-        """
-        new_file = msg.data
-        self.node.loginfo(f"Received new fault injection file: {new_file}")
-        print(f"Received new fault injection file: {new_file}")
-        # Reload the fault injector with the new file
-        try:
-            if self.fault_injector:
-                self.fault_injector.reload_faults(new_file)
-                self.node.loginfo(f"Successfully reloaded fault injector with file: {new_file}")
-            else:
-                self.node.logwarn("Fault injector is not initialized.")
-        except Exception as e:
-            self.node.logerr(f"Failed to reload fault injector: {e}")
+        # in synchronous mode, the transform relative to the parent does not change. If enabled,
+        # it is published once on /tf_static instead of once per frame on /tf
+        self._static_tf_child_frame_id = None
+        if self.synchronous_mode and self.relative_spawn_pose and \
+                self.node.static_tf_publisher is not None:
+            transform = self.get_ros_transform(None, self.node.get_time())
+            self.node.static_tf_publisher.add_transform(transform)
+            self._static_tf_child_frame_id = transform.child_frame_id
 
     #     # Subscribe to the logging control topic
     #     self.node.create_subscription(
@@ -188,23 +188,43 @@ class Sensor(Actor):
 
 
     def get_ros_transform(self, pose, timestamp):
+        """
+        Function to get the tf message of this sensor.
+
+        In synchronous mode, the transform relative to the parent is sent. As the relative
+        spawn pose does not change, the message is only created once and its stamp is updated.
+
+        :param pose: the pose of the sensor (ignored in synchronous mode)
+        :type pose: geometry_msgs.msg.Pose
+        :return: the filled tf message
+        :rtype: geometry_msgs.msg.TransformStamped
+        """
         if self.synchronous_mode:
             if not self.relative_spawn_pose:
                 self.node.logwarn("{}: No relative spawn pose defined".format(self.get_prefix()))
                 return
-            pose = self.relative_spawn_pose
-            child_frame_id = self.get_prefix()
-            if self.parent is not None:
-                frame_id = self.parent.get_prefix()
-            else:
-                frame_id = "map"
-
+            if self._relative_ros_transform is None:
+                if self.parent is not None:
+                    frame_id = self.parent.get_prefix()
+                else:
+                    frame_id = "map"
+                self._relative_ros_transform = self.create_ros_transform(
+                    self.relative_spawn_pose, frame_id, self.get_prefix())
+            transform = self._relative_ros_transform
         else:
-            child_frame_id = self.get_prefix()
-            frame_id = "map"
+            transform = self.create_ros_transform(pose, "map", self.get_prefix())
 
-        transform = tf2_ros.TransformStamped()
         transform.header.stamp = roscomp.ros_timestamp(sec=timestamp, from_sec=True)
+        return transform
+
+    def create_ros_transform(self, pose, frame_id, child_frame_id):  # pylint: disable=no-self-use
+        """
+        Function to create a tf message (without stamp) from a pose.
+
+        :return: the filled tf message
+        :rtype: geometry_msgs.msg.TransformStamped
+        """
+        transform = tf2_ros.TransformStamped()
         transform.header.frame_id = frame_id
         transform.child_frame_id = child_frame_id
 
@@ -220,12 +240,18 @@ class Sensor(Actor):
         return transform
 
     def publish_tf(self, pose, timestamp):
+        if self._static_tf_child_frame_id is not None:
+            # already published on /tf_static
+            return
         transform = self.get_ros_transform(pose, timestamp)
-        try:
-            self._tf_broadcaster.sendTransform(transform)
-        except roscomp.exceptions.ROSException:
-            if roscomp.ok():
-                self.node.logwarn("Sensor {} failed to send transform.".format(self.uid))
+        if transform is None:
+            return
+        if self.synchronous_mode:
+            # sent with the transforms of all other actors at the end of the frame
+            self.node.tf_publisher.add_transform(transform)
+        else:
+            # the sensor data is published right away, so is its transform
+            self.node.tf_publisher.send_transforms([transform])
 
     def listen(self):
         self.carla_actor.listen(self._callback_sensor_data)
@@ -242,6 +268,10 @@ class Sensor(Actor):
         self._callback_active.acquire()
         if self.carla_actor.is_listening:
             self.carla_actor.stop()
+        if self._static_tf_child_frame_id is not None:
+            self.node.static_tf_publisher.remove_transform(self._static_tf_child_frame_id)
+        if self.fault_injector is not None:
+            self.node.fault_registry.unregister(self.fault_injector)
         super(Sensor, self).destroy()
 
     def _callback_sensor_data(self, carla_sensor_data):
@@ -256,7 +286,9 @@ class Sensor(Actor):
             return
         
         if self.fault_injector:
-            self.fault_injector.check_and_trigger_faults(carla_sensor_data.timestamp, carla_sensor_data.transform.location)
+            self.fault_injector.check_and_trigger_faults(carla_sensor_data.timestamp,
+                                                         carla_sensor_data.transform.location,
+                                                         carla_sensor_data.frame)
         
         if carla_sensor_data is None:
             self._callback_active.release()
@@ -271,7 +303,7 @@ class Sensor(Actor):
             self.publish_tf(trans.carla_transform_to_ros_pose(
                 carla_sensor_data.transform), carla_sensor_data.timestamp)
             try:
-                self.sensor_data_updated(carla_sensor_data)
+                self._process_sensor_data(carla_sensor_data)
             except roscomp.exceptions.ROSException:
                 if roscomp.ok():
                     self.node.logwarn(
@@ -312,6 +344,72 @@ class Sensor(Actor):
         """
         return {"raw_data": str(carla_sensor_data)}
 
+    def _process_sensor_data(self, carla_sensor_data):
+        """
+        Forward the carla sensor data to sensor_data_updated() and account the
+        raw data copies made while processing it.
+
+        :param carla_sensor_data: carla sensor data object
+        :type carla_sensor_data: carla.SensorData
+        """
+        self.bytes_copied = 0
+        self._publish_duration = 0.
+        start = time.perf_counter()
+        self.sensor_data_updated(carla_sensor_data)
+        self.node.frame_stats.add_span(
+            "conversion", time.perf_counter() - start - self._publish_duration, self)
+        self.bytes_copied_total += self.bytes_copied
+
+    def publish_message(self, publisher, msg):
+        """
+        Publish a message created from the sensor data and account the time spent
+        for publishing in the frame statistics.
+
+        :param publisher: the publisher to use
+        :param msg: the ROS message to publish
+        """
+        start = time.perf_counter()
+        publisher.publish(msg)
+        duration = time.perf_counter() - start
+        self._publish_duration += duration
+        self.node.frame_stats.add_span("publish", duration, self)
+
+    @staticmethod
+    def get_raw_data_view(carla_sensor_data, dtype):
+        """
+        Wrap the raw data buffer of a carla sensor data object as read-only numpy array.
+
+        No data is copied. The view must not outlive the carla sensor data object,
+        use get_writable_array() before modifying it.
+
+        :param carla_sensor_data: carla sensor data object
+        :type carla_sensor_data: carla.SensorData
+        :param dtype: data type of the elements of the raw data
+        :type dtype: numpy.dtype
+        :return: read-only view on the raw data
+        :rtype: numpy.ndarray
+        """
+        view = numpy.frombuffer(carla_sensor_data.raw_data, dtype=dtype)
+        view.flags.writeable = False
+        return view
+
+    def get_writable_array(self, data):
+        """
+        Copy-on-write access to an array returned by get_raw_data_view().
+
+        Writable arrays are returned as they are. Read-only arrays are copied and
+        the copied bytes are accounted in bytes_copied.
+
+        :param data: numpy array
+        :type data: numpy.ndarray
+        :return: writable array with the same content
+        :rtype: numpy.ndarray
+        """
+        if data.flags.writeable:
+            return data
+        self.bytes_copied += data.nbytes
+        return data.copy()
+
     @abstractmethod
     def sensor_data_updated(self, carla_sensor_data):
         """
@@ -335,9 +433,9 @@ class Sensor(Actor):
                                           carla_sensor_data.frame, frame))
                 self.node.logdebug("{}({}): process {}".format(
                     self.__class__.__name__, self.get_id(), frame))
-                self.publish_tf(trans.carla_transform_to_ros_pose(
-                    carla_sensor_data.transform), timestamp)
-                self.sensor_data_updated(carla_sensor_data)
+                # in synchronous mode, the relative spawn pose is sent instead
+                self.publish_tf(None, timestamp)
+                self._process_sensor_data(carla_sensor_data)
             except queue.Empty:
                 return
 
@@ -348,13 +446,14 @@ class Sensor(Actor):
              self.next_data_expected_time < timestamp):
             while True:
                 try:
-                    carla_sensor_data = self.queue.get(timeout=1.0)
+                    with self.node.frame_stats.span("wait_for_data", self):
+                        carla_sensor_data = self.queue.get(timeout=1.0)
                     if carla_sensor_data.frame == frame:
                         self.node.logdebug("{}({}): process {}".format(self.__class__.__name__,
                                                                        self.get_id(), frame))
-                        self.publish_tf(trans.carla_transform_to_ros_pose(
-                            carla_sensor_data.transform), timestamp)
-                        self.sensor_data_updated(carla_sensor_data)
+                        # in synchronous mode, the relative spawn pose is sent instead
+                        self.publish_tf(None, timestamp)
+                        self._process_sensor_data(carla_sensor_data)
                         return
                     elif carla_sensor_data.frame < frame:
                         self.node.logwarn("{}({}): skipping old frame {}, expected {}".format(
@@ -433,3 +532,113 @@ def create_cloud(header, fields, points):
                        point_step=cloud_struct.size,
                        row_step=cloud_struct.size * len(points),
                        data=buff.raw)
+
+
+def get_cloud_dtype(fields, is_bigendian=False):
+    """
+    Create the numpy structured dtype matching the memory layout of a point cloud.
+
+    @param fields: The point cloud fields.
+    @type  fields: iterable of L{sensor_msgs.msg.PointField}
+    @param is_bigendian: whether the point data is stored big endian.
+    @type  is_bigendian: bool
+    @return: The structured dtype, or None if the layout can not be expressed as
+             a numpy record (unknown datatypes or fields with count != 1).
+    @rtype:  numpy.dtype
+    """
+    byteorder = '>' if is_bigendian else '<'
+    names, formats, offsets = [], [], []
+    itemsize = 0
+    for field in sorted(fields, key=lambda f: f.offset):
+        if field.datatype not in _NUMPY_DATATYPES or field.count != 1:
+            return None
+        datatype = _NUMPY_DATATYPES[field.datatype].newbyteorder(byteorder)
+        names.append(field.name)
+        formats.append(datatype)
+        offsets.append(field.offset)
+        itemsize = max(itemsize, field.offset + datatype.itemsize)
+    return numpy.dtype({'names': names, 'formats': formats,
+                        'offsets': offsets, 'itemsize': itemsize})
+
+
+def create_cloud_from_array(header, fields, points):
+    """
+    Create a L{sensor_msgs.msg.PointCloud2} message from a numpy array.
+
+    The point data is written in one pass from a contiguous record array, no
+    python objects are created per point. Layouts that can not be expressed as
+    numpy record (see get_cloud_dtype()) fall back to create_cloud(). In ROS2,
+    points that have to be converted to the layout of the fields are written
+    directly into the message buffer.
+
+    @param header: The point cloud header.
+    @type  header: L{std_msgs.msg.Header}
+    @param fields: The point cloud fields.
+    @type  fields: iterable of L{sensor_msgs.msg.PointField}
+    @param points: The point cloud points. Either a structured array providing
+                   (at least) all field names, or a 2d array with one column per
+                   field (in the same order as the fields parameter)
+    @type  points: numpy.ndarray
+    @return: The point cloud.
+    @rtype:  L{sensor_msgs.msg.PointCloud2}
+    """
+    cloud_dtype = get_cloud_dtype(fields)
+    if cloud_dtype is None:
+        return create_cloud(header, fields, points.tolist())
+
+    data = None
+    if points.dtype != cloud_dtype:
+        if ROS_VERSION == 2:
+            # write the converted points directly into the message buffer
+            data = array.array('B', bytes(len(points) * cloud_dtype.itemsize))
+            cloud = numpy.frombuffer(data, dtype=cloud_dtype)
+        else:
+            cloud = numpy.zeros(len(points), dtype=cloud_dtype)
+        for index, field in enumerate(fields):
+            if points.dtype.names is not None:
+                cloud[field.name] = points[field.name]
+            else:
+                cloud[field.name] = points[:, index]
+        points = cloud
+    if data is None:
+        data = get_msg_data(points)
+
+    return PointCloud2(header=header,
+                       height=1,
+                       width=len(points),
+                       is_dense=False,
+                       is_bigendian=False,
+                       fields=fields,
+                       point_step=cloud_dtype.itemsize,
+                       row_step=cloud_dtype.itemsize * len(points),
+                       data=data)
+
+
+def get_msg_data(data, msg_data=None):
+    """
+    Get the content of a numpy array as value for a uint8[] message field.
+
+    The array content is copied once. In ROS2 an array.array is returned, as the
+    message setters take it as it is while other sequences are checked element by
+    element. If msg_data is an array.array of the same size (e.g. returned by the
+    previous call for the same sensor), it is overwritten instead of allocating a
+    new one, strided arrays are copied into it without an intermediate copy.
+
+    @param data: The array.
+    @type  data: numpy.ndarray
+    @param msg_data: The value of a previous call to reuse (ROS2 only).
+    @type  msg_data: array.array
+    @return: The raw array content.
+    @rtype:  array.array or bytes
+    """
+    if ROS_VERSION == 2 and isinstance(msg_data, array.array) and \
+            msg_data.typecode == 'B' and len(msg_data) == data.nbytes:
+        # copy directly from a (possibly strided) view into the buffer
+        numpy.frombuffer(msg_data, dtype=data.dtype).reshape(data.shape)[...] = data
+        return msg_data
+    byte_view = numpy.ascontiguousarray(data).reshape(-1).view(numpy.uint8)
+    if ROS_VERSION == 2:
+        msg_data = array.array('B')
+        msg_data.frombytes(byte_view)
+        return msg_data
+    return byte_view.tobytes()
@@ -62,8 +62,9 @@ class SpeedometerSensor(PseudoActor):
         Function (override) to update this object.
         """
         try:
-            velocity = self.parent.carla_actor.get_velocity()
-            transform = self.parent.carla_actor.get_transform()
+            state = self.parent.get_current_carla_state()
+            velocity = state.velocity
+            transform = state.transform
         except AttributeError:
             # parent actor disappeared, do not send tf
             self.node.logwarn(
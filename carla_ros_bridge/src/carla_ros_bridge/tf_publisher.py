@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+#
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+#
+"""
+Classes to publish the transforms of the actors
+"""
+
+from threading import Lock
+
+import ros_compatibility as roscomp
+import tf2_ros
+
+ROS_VERSION = roscomp.get_ros_version()
+
+
+class TFPublisher(object):
+
+    """
+    Publishes the transforms of all actors of a frame in one /tf message
+
+    During the update of the actors, the transforms are collected with add_transform(). At the
+    end of the frame, publish() sends them together, so that there is a single write per frame
+    and the consumers receive a consistent set of transforms.
+    """
+
+    def __init__(self, node):
+        """
+        Constructor
+
+        :param node: node-handle
+        :type node: carla_ros_bridge.CarlaRosBridge
+        """
+        self.node = node
+        self._lock = Lock()
+        self._transforms = []
+
+        if ROS_VERSION == 1:
+            self._tf_broadcaster = tf2_ros.TransformBroadcaster()
+        elif ROS_VERSION == 2:
+            self._tf_broadcaster = tf2_ros.TransformBroadcaster(node)
+
+    def add_transform(self, transform):
+        """
+        add a transform to the /tf message of the current frame
+
+        :param transform: the transform
+        :type transform: geometry_msgs.msg.TransformStamped
+        """
+        with self._lock:
+            self._transforms.append(transform)
+
+    def publish(self):
+        """
+        publish the transforms collected since the last call
+        """
+        with self._lock:
+            transforms = self._transforms
+            self._transforms = []
+        if transforms:
+            self.send_transforms(transforms)
+
+    def send_transforms(self, transforms):
+        """
+        publish transforms immediately (e.g. for sensor data received outside of the frame update)
+
+        :param transforms: the transforms
+        :type transforms: list of geometry_msgs.msg.TransformStamped
+        """
+        try:
+            self._tf_broadcaster.sendTransform(transforms)
+        except roscomp.exceptions.ROSException:
+            if roscomp.ok():
+                self.node.logwarn("Failed to send transforms.")
+
+
+class StaticTFPublisher(object):
+
+    """
+    Publishes constant transforms (e.g. sensor mountings) on /tf_static
+
+    /tf_static is latched, so a late subscriber only receives the last message of a publisher.
+    Therefore all static transforms are kept and sent together whenever one is added or
+    removed.
+    """
+
+    def __init__(self, node):
+        """
+        Constructor
+
+        :param node: node-handle
+        :type node: carla_ros_bridge.CarlaRosBridge
+        """
+        self.node = node
+        self._lock = Lock()
+        self._transforms = {}
+
+        if ROS_VERSION == 1:
+            self._static_tf_broadcaster = tf2_ros.StaticTransformBroadcaster()
+        elif ROS_VERSION == 2:
+            self._static_tf_broadcaster = tf2_ros.StaticTransformBroadcaster(node)
+
+    def add_transform(self, transform):
+        """
+        add (or replace) a static transform and publish all static transforms
+
+        :param transform: the transform, identified by its child frame id
+        :type transform: geometry_msgs.msg.TransformStamped
+        """
+        with self._lock:
+            self._transforms[transform.child_frame_id] = transform
+            self._send()
+
+    def remove_transform(self, child_frame_id):
+        """
+        remove a static transform and publish the remaining static transforms
+
+        :param child_frame_id: the child frame id of the transform
+        :type child_frame_id: string
+        """
+        with self._lock:
+            if self._transforms.pop(child_frame_id, None) is not None:
+                self._send()
+
+    def _send(self):
+        try:
+            self._static_tf_broadcaster.sendTransform(list(self._transforms.values()))
+        except roscomp.exceptions.ROSException:
+            if roscomp.ok():
+                self.node.logwarn("Failed to send static transforms.")
@@ -11,16 +11,10 @@ handle a tf sensor
 
 import os
 
-import tf2_ros
-
-import ros_compatibility as roscomp
-
 from carla_ros_bridge.pseudo_actor import PseudoActor
 
 from geometry_msgs.msg import TransformStamped
 
-ROS_VERSION = roscomp.get_ros_version()
-
 
 class TFSensor(PseudoActor):
 
@@ -47,11 +41,6 @@ class TFSensor(PseudoActor):
                                        parent=parent,
                                        node=node)
 
-        if ROS_VERSION == 1:
-            self._tf_broadcaster = tf2_ros.TransformBroadcaster()
-        elif ROS_VERSION == 2:
-            self._tf_broadcaster = tf2_ros.TransformBroadcaster(node)
-
     @staticmethod
     def get_blueprint_name():
         """
@@ -75,7 +64,8 @@ class TFSensor(PseudoActor):
                 "TFSensor could not publish transform. Actor {} not found".format(self.parent.uid))
             return
 
-        self._tf_broadcaster.sendTransform(TransformStamped(
+        # published together with the transforms of all other actors at the end of the frame
+        self.node.tf_publisher.add_transform(TransformStamped(
             header=self.get_msg_header("map", timestamp=timestamp),
             child_frame_id=self.parent.get_prefix(),
             transform=transform))
@@ -10,6 +10,8 @@
 Classes to handle Carla traffic participants
 """
 
+import numpy
+
 import carla_common.transforms as trans
 
 from carla_ros_bridge.actor import Actor
@@ -42,6 +44,9 @@ class TrafficParticipant(Actor):
         :type carla_actor: carla.Actor
         """
         self.classification_age = 0
+        # the bounding box of an actor does not change, it is read only once
+        extent = carla_actor.bounding_box.extent
+        self.bounding_box_extent = (extent.x, extent.y, extent.z)
         super(TrafficParticipant, self).__init__(uid=uid,
                                                  name=name,
                                                  parent=parent,
@@ -81,10 +86,7 @@ class TrafficParticipant(Actor):
         obj.accel = self.get_current_ros_accel()
         # Shape
         obj.shape.type = SolidPrimitive.BOX
-        obj.shape.dimensions.extend([
-            self.carla_actor.bounding_box.extent.x * 2.0,
-            self.carla_actor.bounding_box.extent.y * 2.0,
-            self.carla_actor.bounding_box.extent.z * 2.0])
+        obj.shape.dimensions.extend([extent * 2.0 for extent in self.bounding_box_extent])
 
         # Classification if available in attributes
         if self.get_classification() != Object.CLASSIFICATION_UNKNOWN:
@@ -121,7 +123,7 @@ class TrafficParticipant(Actor):
         :return: the pose of the traffic participant.
         :rtype: geometry_msgs.msg.Pose
         """
-        return trans.carla_transform_to_ros_pose(self.carla_actor.get_transform())
+        return trans.carla_transform_to_ros_pose(self.get_current_carla_state().transform)
 
     def get_marker(self, timestamp=None):
         """
@@ -137,7 +139,44 @@ class TrafficParticipant(Actor):
         marker.type = Marker.CUBE
 
         marker.pose = self.get_marker_pose()
-        marker.scale.x = self.carla_actor.bounding_box.extent.x * 2.0
-        marker.scale.y = self.carla_actor.bounding_box.extent.y * 2.0
-        marker.scale.z = self.carla_actor.bounding_box.extent.z * 2.0
+        marker.scale.x = self.bounding_box_extent[0] * 2.0
+        marker.scale.y = self.bounding_box_extent[1] * 2.0
+        marker.scale.z = self.bounding_box_extent[2] * 2.0
         return marker
+
+    @staticmethod
+    def get_state_arrays(traffic_participants):
+        """
+        Helper function to collect the current states of several traffic participants
+        in numpy arrays
+
+        The values are converted to the ROS coordinate system like in get_object_info().
+
+        :param traffic_participants: the traffic participants
+        :type traffic_participants: list(TrafficParticipant)
+        :return: dict with the arrays 'position' (Nx3), 'orientation' (Nx4, w/x/y/z),
+            'linear_velocity' (Nx3), 'angular_velocity' (Nx3), 'acceleration' (Nx3)
+            and 'extent' (Nx3)
+        :rtype: dict
+        """
+        states = numpy.empty((len(traffic_participants), 18))
+        for row, actor in zip(states, traffic_participants):
+            state = actor.get_current_carla_state()
+            location = state.transform.location
+            rotation = state.transform.rotation
+            row[:] = (location.x, location.y, location.z,
+                      rotation.roll, rotation.pitch, rotation.yaw,
+                      state.velocity.x, state.velocity.y, state.velocity.z,
+                      state.angular_velocity.x, state.angular_velocity.y, state.angular_velocity.z,
+                      state.acceleration.x, state.acceleration.y, state.acceleration.z) + \
+                actor.bounding_box_extent
+
+        twists = trans.carla_velocities_to_numpy_twists(states[:, 6:9], states[:, 9:12])
+        return {
+            'position': trans.carla_locations_to_numpy_vectors(states[:, 0:3]),
+            'orientation': trans.carla_rotations_to_numpy_quaternions(states[:, 3:6]),
+            'linear_velocity': twists[:, 0:3],
+            'angular_velocity': twists[:, 3:6],
+            'acceleration': trans.carla_locations_to_numpy_vectors(states[:, 12:15]),
+            'extent': states[:, 15:18]
+        }
@@ -10,6 +10,8 @@
 Classes to handle Carla vehicles
 """
 
+import carla
+
 import carla_common.transforms as trans
 
 from carla_ros_bridge.traffic_participant import TrafficParticipant
@@ -79,9 +81,10 @@ class Vehicle(TrafficParticipant):
         :rtype: geometry_msgs.msg.Pose
         """
         # Moving pivot point from the bottom (CARLA) to the center (ROS) of the bounding box.
-        extent = self.carla_actor.bounding_box.extent
-        marker_transform = self.carla_actor.get_transform()
-        marker_transform.location += marker_transform.get_up_vector() * extent.z
+        transform = self.get_current_carla_state().transform
+        marker_transform = carla.Transform(
+            transform.location + transform.get_up_vector() * self.bounding_box_extent[2],
+            transform.rotation)
         return trans.carla_transform_to_ros_pose(marker_transform)
 
     def get_classification(self):
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+#
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+#
+"""
+Microbenchmark of the depth camera conversion.
+
+Compares the float64 numpy.dot of the bgra channels (previous implementation of
+DepthCamera.get_carla_image_data_array) with the uint32 shift and float32 scaling into
+preallocated buffers.
+Runs standalone, neither CARLA nor ROS are required.
+"""
+
+import timeit
+
+import numpy
+
+RESOLUTIONS = ((800, 600), (1280, 720), (1920, 1080), (3840, 2160))
+
+DEPTH_SCALE = numpy.float32(1000.0 / (256**3 - 1))
+
+
+def dot_depth(raw_data, height, width):
+    bgra_image = numpy.ndarray(shape=(height, width, 4), dtype=numpy.uint8, buffer=raw_data)
+    scales = numpy.array([65536.0, 256.0, 1.0, 0]) / (256**3 - 1) * 1000
+    return numpy.dot(bgra_image, scales).astype(numpy.float32)
+
+
+def shift_depth(raw_data, height, width, depth_values, depth_image):
+    bgra_image = numpy.ndarray(shape=(height, width), dtype='>u4', buffer=raw_data)
+    numpy.right_shift(bgra_image, 8, out=depth_values)
+    numpy.multiply(depth_values, DEPTH_SCALE, out=depth_image, dtype=numpy.float32)
+    return depth_image
+
+
+def main():
+    for width, height in RESOLUTIONS:
+        raw_data = numpy.random.randint(0, 256, size=height * width * 4,
+                                        dtype=numpy.uint8).tobytes()
+        depth_values = numpy.empty((height, width), dtype=numpy.uint32)
+        depth_image = numpy.empty((height, width), dtype=numpy.float32)
+
+        max_error = numpy.max(numpy.abs(
+            dot_depth(raw_data, height, width) -
+            shift_depth(raw_data, height, width, depth_values, depth_image)))
+
+        number = 10
+        dot_seconds = min(timeit.repeat(lambda: dot_depth(raw_data, height, width),
+                                        number=number, repeat=3)) / number
+        shift_seconds = min(timeit.repeat(
+            lambda: shift_depth(raw_data, height, width, depth_values, depth_image),
+            number=number, repeat=3)) / number
+        print("{:4d}x{:4d}: dot {:7.2f} ms/image, shift {:7.2f} ms/image, "
+              "max error {:.2e} m".format(width, height, dot_seconds * 1000.0,
+                                          shift_seconds * 1000.0, max_error))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+#
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+#
+"""
+Microbenchmark of the lidar ring column computation.
+
+Compares the per-channel numpy.vstack of object arrays (previous implementation of
+Lidar.sensor_data_updated) with the single numpy.repeat into a structured record.
+Runs standalone, neither CARLA nor ROS are required.
+"""
+
+import timeit
+
+import numpy
+
+POINTS_PER_SCAN = 100000
+
+LIDAR_DTYPE = numpy.dtype({'names': ['x', 'y', 'z', 'intensity', 'ring'],
+                           'formats': ['<f4', '<f4', '<f4', '<f4', '<u2'],
+                           'offsets': [0, 4, 8, 12, 16],
+                           'itemsize': 18})
+
+
+def vstack_ring(lidar_data, ring_points_count):
+    ring = numpy.empty((0, 1), object)
+    for i, count in enumerate(ring_points_count):
+        ring = numpy.vstack((ring, numpy.full((count, 1), i)))
+    return numpy.hstack((lidar_data, ring))
+
+
+def repeat_ring(lidar_data, ring_points_count):
+    points = numpy.empty(lidar_data.shape[0], dtype=LIDAR_DTYPE)
+    for index, name in enumerate(('x', 'y', 'z', 'intensity')):
+        points[name] = lidar_data[:, index]
+    points['ring'] = numpy.repeat(
+        numpy.arange(len(ring_points_count), dtype=numpy.uint16), ring_points_count)
+    return points
+
+
+def main():
+    for channels in (32, 64, 128):
+        ring_points_count = [POINTS_PER_SCAN // channels] * channels
+        lidar_data = numpy.random.rand(sum(ring_points_count), 4).astype(numpy.float32)
+        for func in (vstack_ring, repeat_ring):
+            number = 5 if func is vstack_ring else 50
+            seconds = min(timeit.repeat(lambda: func(lidar_data, ring_points_count),
+                                        number=number, repeat=3)) / number
+            print("{:3d} channels, {:12s}: {:8.2f} ms/scan".format(
+                channels, func.__name__, seconds * 1000.0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+#
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+#
+"""
+Tests of the sensor fault injection
+
+The fault injectors only depend on numpy, neither CARLA nor ROS are required.
+"""
+
+import json
+import logging
+from collections import namedtuple
+
+import numpy
+import pytest
+
+import carla_ros_bridge.FaultInjector.LidarFaultInjector as lidar_fault_injector
+from carla_ros_bridge.FaultInjector.FaultRegistry import FaultRegistry, compile_fault_set
+from carla_ros_bridge.FaultInjector.IMUFaultInjector import IMUFaultInjector
+from carla_ros_bridge.FaultInjector.LidarFaultInjector import LidarFaultInjector
+
+# the fault injectors only access the attributes of the carla location
+Location = namedtuple("Location", ["x", "y", "z"])
+
+# packed point layout of the lidar (see lidar.LIDAR_DTYPE)
+LIDAR_DTYPE = numpy.dtype({'names': ['x', 'y', 'z', 'intensity', 'ring'],
+                           'formats': ['<f4', '<f4', '<f4', '<f4', '<u2'],
+                           'offsets': [0, 4, 8, 12, 16],
+                           'itemsize': 18})
+
+
+def create_points(number_of_points=1000):
+    rng = numpy.random.default_rng(0)
+    points = numpy.empty(number_of_points, dtype=LIDAR_DTYPE)
+    for name in ('x', 'y', 'z'):
+        points[name] = rng.uniform(10., 50., number_of_points)
+    points['intensity'] = 1.0
+    points['ring'] = numpy.arange(number_of_points) % 32
+    return points
+
+
+def create_lidar_fault_injector(faults, seed=0):
+    fault_injector = LidarFaultInjector(sensor_uid=1)
+    fault_injector.set_fault_set(compile_fault_set("LidarSensor", faults, seed))
+    fault_injector.check_and_trigger_faults(0.0, Location(0., 0., 0.))
+    return fault_injector
+
+
+def test_lidar_noise_and_bias_move_the_points():
+    points = create_points()
+    fault_injector = create_lidar_fault_injector([
+        {"name": "noise", "trigger": {"time": 0.0}, "parameters": {"noise_level": 0.1}},
+        {"name": "percentage_bias", "trigger": {"time": 0.0}, "parameters": {"bias_percent": 1.0}}])
+    faulty_points = fault_injector.apply_faults({"points": points.copy()})["points"]
+
+    assert len(faulty_points) == len(points)
+    distances = numpy.linalg.norm(
+        [points['x'], points['y'], points['z']], axis=0)
+    faulty_distances = numpy.linalg.norm(
+        [faulty_points['x'], faulty_points['y'], faulty_points['z']], axis=0)
+    numpy.testing.assert_allclose(numpy.mean(faulty_distances - distances), 1.0, atol=0.02)
+    assert numpy.std(faulty_points['x'] - points['x']) > 0.05
+    numpy.testing.assert_array_equal(faulty_points['ring'], points['ring'])
+    numpy.testing.assert_array_equal(faulty_points['intensity'], points['intensity'])
+
+
+def test_lidar_faults_are_written_back_if_the_positions_are_copied(monkeypatch):
+    # numpy < 1.25 copies the position fields of the lidar records
+    structured_to_unstructured = lidar_fault_injector.structured_to_unstructured
+    monkeypatch.setattr(lidar_fault_injector, "structured_to_unstructured",
+                        lambda array, copy=False: structured_to_unstructured(array, copy=True))
+    points = create_points()
+    fault_injector = create_lidar_fault_injector([
+        {"name": "percentage_bias", "trigger": {"time": 0.0}, "parameters": {"bias_percent": 1.0}}])
+    faulty_points = fault_injector.apply_faults({"points": points.copy()})["points"]
+
+    distances = numpy.linalg.norm([points['x'], points['y'], points['z']], axis=0)
+    faulty_distances = numpy.linalg.norm(
+        [faulty_points['x'], faulty_points['y'], faulty_points['z']], axis=0)
+    numpy.testing.assert_allclose(faulty_distances - distances, 1.0, atol=1e-3)
+
+
+def test_lidar_faults_are_reproducible_with_a_seed():
+    faults = [{"name": "noise", "trigger": {"time": 0.0}, "parameters": {"noise_level": 0.1}},
+              {"name": "point_dropout", "trigger": {"time": 0.0},
+               "parameters": {"dropout_rate": 0.5}}]
+    first = create_lidar_fault_injector(faults).apply_faults(
+        {"points": create_points()})["points"]
+    second = create_lidar_fault_injector(faults).apply_faults(
+        {"points": create_points()})["points"]
+    numpy.testing.assert_array_equal(first, second)
+    assert 350 < len(first) < 650
+
+
+def test_fault_injectors_share_one_logger_per_sensor_type():
+    # the sensors of a campaign are respawned with new uids, their loggers must not accumulate
+    first = LidarFaultInjector(sensor_uid=101)
+    second = LidarFaultInjector(sensor_uid=102)
+    assert first.logger.logger is second.logger.logger
+    assert [name for name in logging.Logger.manager.loggerDict
+            if name.startswith("FaultInjector-LidarSensor")] == ["FaultInjector-LidarSensor"]
+    assert first.event_logger.sensor_uid == 101
+
+
+def active_fault_names(fault_injector):
+    return [active_fault["fault"]["name"] for active_fault in fault_injector.active_faults]
+
+
+def test_time_triggers_fire_once_in_order_and_expire():
+    fault_injector = LidarFaultInjector(sensor_uid=1)
+    fault_injector.set_fault_set(compile_fault_set("LidarSensor", [
+        {"name": "noise", "trigger": {"time": 2.0}, "duration": 1.0},
+        {"name": "zero_value", "trigger": {"time": 1.0}, "duration": 0},
+        {"name": "dropout", "trigger": {"time": 1.5}, "duration": 1.0}]))
+    origin = Location(0., 0., 0.)
+
+    fault_injector.check_and_trigger_faults(0.5, origin)
+    assert not fault_injector.active_faults
+    fault_injector.check_and_trigger_faults(1.2, origin)
+    assert active_fault_names(fault_injector) == ["zero_value"]
+    fault_injector.check_and_trigger_faults(1.6, origin)
+    assert active_fault_names(fault_injector) == ["zero_value", "dropout"]
+    assert fault_injector.skip_message
+    fault_injector.check_and_trigger_faults(2.1, origin)
+    assert active_fault_names(fault_injector) == ["zero_value", "dropout", "noise"]
+    fault_injector.check_and_trigger_faults(2.7, origin)
+    # the dropout expired after its duration, a duration of 0 never expires
+    assert active_fault_names(fault_injector) == ["zero_value", "noise"]
+    assert not fault_injector.skip_message
+    fault_injector.check_and_trigger_faults(10.0, origin)
+    assert active_fault_names(fault_injector) == ["zero_value"]
+    assert [(name, time) for name, _, time in fault_injector.fault_activations] == \
+        [("zero_value", 1.2), ("dropout", 1.6), ("noise", 2.1)]
+
+
+def test_location_triggers_across_grid_cells():
+    fault_injector = LidarFaultInjector(sensor_uid=1)
+    fault_injector.set_fault_set(compile_fault_set("LidarSensor", [
+        {"name": "noise", "trigger": {"location": {"x": 1.05, "y": 2.0, "z": 0.0}},
+         "duration": 1.0}]))
+
+    # 1.55 m away
+    fault_injector.check_and_trigger_faults(0.0, Location(-0.5, 2.0, 0.0))
+    assert not fault_injector.active_faults
+    # within 1 m, but in the neighbouring grid cell
+    fault_injector.check_and_trigger_faults(0.1, Location(0.2, 2.0, 0.0))
+    assert active_fault_names(fault_injector) == ["noise"]
+    # an active fault is not triggered again
+    fault_injector.check_and_trigger_faults(0.2, Location(1.0, 2.0, 0.0))
+    assert len(fault_injector.fault_activations) == 1
+    fault_injector.check_and_trigger_faults(1.2, Location(10.0, 2.0, 0.0))
+    assert not fault_injector.active_faults
+
+
+def write_fault_file(directory, name, configuration):
+    with open(str(directory / name), 'w') as f:
+        json.dump(configuration, f)
+
+
+def test_compile_fault_set():
+    fault_set = compile_fault_set("LidarSensor", [
+        {"name": "noise", "trigger": {"time": 2.0}},
+        {"name": "dropout", "trigger": {"location": {"x": -0.5, "y": 1.5, "z": 0.0}}},
+        {"name": "zero_value", "trigger": {"time": 1.0}}], seed=-1, time_offset=10.0)
+    assert fault_set.time_triggers == ((11.0, 2), (12.0, 0))
+    assert fault_set.location_grid == {(-1, 1, 0): (1,)}
+    assert fault_set.trigger_locations == {1: (-0.5, 1.5, 0.0)}
+    assert fault_set.seed is None
+
+
+def test_registry_hands_the_faults_of_each_sensor_type_to_the_injectors(tmp_path):
+    write_fault_file(tmp_path, "faults.json", [
+        {"sensor": "LidarSensor", "faults": [{"name": "noise", "trigger": {"time": 1.0}}]},
+        {"sensor": "IMUSensor", "faults": [{"name": "zero_value", "trigger": {"time": 1.0}},
+                                           {"name": "noise", "trigger": {"time": 2.0}}]}])
+    registry = FaultRegistry([str(tmp_path)], seed=3)
+    lidars = [LidarFaultInjector(sensor_uid=1), LidarFaultInjector(sensor_uid=2)]
+    imu = IMUFaultInjector(sensor_uid=3)
+    for fault_injector in lidars + [imu]:
+        registry.register(fault_injector)
+
+    assert registry.load("faults.json") == str(tmp_path / "faults.json")
+    # parsed once, shared by the injectors of a sensor type
+    assert lidars[0].fault_set is lidars[1].fault_set
+    assert [fault["name"] for fault in lidars[0].fault_set.faults] == ["noise"]
+    assert [fault["name"] for fault in imu.fault_set.faults] == ["zero_value", "noise"]
+    assert imu.fault_set.seed == 3
+
+    registry.unregister(lidars[1])
+    assert registry.injectors == [lidars[0], imu]
+    with pytest.raises(IOError):
+        registry.load("missing.json")
+
+
+def test_invalid_fault_file_keeps_the_previous_faults(tmp_path):
+    write_fault_file(tmp_path, "faults.json", [
+        {"sensor": "LidarSensor", "faults": [{"name": "noise", "trigger": {"time": 1.0}}]}])
+    write_fault_file(tmp_path, "invalid.json", [
+        {"sensor": "LidarSensor", "faults": [{"name": "noise", "trigger": {"time": "soon"}}]}])
+    (tmp_path / "broken.json").write_text("[{")
+    registry = FaultRegistry([str(tmp_path)])
+    fault_injector = LidarFaultInjector(sensor_uid=1)
+    registry.register(fault_injector)
+    registry.load("faults.json")
+    fault_set = fault_injector.fault_set
+
+    for fault_file in ("invalid.json", "broken.json"):
+        with pytest.raises(ValueError):
+            registry.load(fault_file)
+        assert fault_injector.fault_set is fault_set
+        assert registry.source == str(tmp_path / "faults.json")
+
+
+def test_swapped_fault_set_is_taken_over_with_the_next_sample(tmp_path):
+    write_fault_file(tmp_path, "first.json", [
+        {"sensor": "LidarSensor", "faults": [{"name": "dropout", "trigger": {"time": 1.0}}]}])
+    write_fault_file(tmp_path, "second.json", [
+        {"sensor": "LidarSensor", "faults": [{"name": "noise", "trigger": {"time": 1.0}}]}])
+    registry = FaultRegistry([str(tmp_path)])
+    fault_injector = LidarFaultInjector(sensor_uid=1)
+    registry.register(fault_injector)
+    registry.load("first.json")
+    fault_injector.check_and_trigger_faults(1.5, Location(0., 0., 0.))
+    assert active_fault_names(fault_injector) == ["dropout"]
+    assert fault_injector.skip_message
+
+    registry.load("second.json", time_offset=2.0)
+    # the state of the sensor is only changed by the sensor callback
+    assert active_fault_names(fault_injector) == ["dropout"]
+    fault_injector.check_and_trigger_faults(2.5, Location(0., 0., 0.))
+    assert fault_injector.active_fault_set is fault_injector.fault_set
+    assert not fault_injector.active_faults
+    assert not fault_injector.skip_message
+    assert fault_injector.fault_activations == []
+    fault_injector.check_and_trigger_faults(3.5, Location(0., 0., 0.))
+    assert active_fault_names(fault_injector) == ["noise"]
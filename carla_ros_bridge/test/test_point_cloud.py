@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+#
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+#
+"""
+Tests of the PointCloud2 encoding
+
+create_cloud_from_array() has to write the same bytes as create_cloud() (the per point
+struct encoder of sensor_msgs.point_cloud2) for the point layouts of the sensors.
+"""
+
+import numpy
+import pytest
+
+from sensor_msgs.msg import PointField
+from std_msgs.msg import Header
+
+from carla_ros_bridge.lidar import LIDAR_FIELDS, SEMANTIC_LIDAR_FIELDS
+from carla_ros_bridge.radar import RADAR_FIELDS
+from carla_ros_bridge.sensor import create_cloud, create_cloud_from_array, get_cloud_dtype
+
+NUMBER_OF_POINTS = 500
+
+# layout with padding between the fields (the radar layout before the padding was removed)
+PADDED_FIELDS = [
+    PointField(name='x', offset=0, datatype=PointField.FLOAT32, count=1),
+    PointField(name='Velocity', offset=4, datatype=PointField.FLOAT32, count=1),
+    PointField(name='ElevationAngle', offset=12, datatype=PointField.FLOAT32, count=1)
+]
+
+
+def random_points(fields, dtype=None):
+    rng = numpy.random.default_rng(0)
+    points = numpy.zeros(NUMBER_OF_POINTS, dtype=dtype or get_cloud_dtype(fields))
+    for name in points.dtype.names:
+        if points.dtype[name].kind == 'f':
+            points[name] = rng.uniform(-100., 100., NUMBER_OF_POINTS)
+        else:
+            points[name] = rng.integers(0, 1000, NUMBER_OF_POINTS)
+    return points
+
+
+def assert_same_cloud(cloud, expected_cloud):
+    assert cloud.point_step == expected_cloud.point_step
+    assert cloud.row_step == expected_cloud.row_step
+    assert cloud.width == expected_cloud.width
+    assert cloud.height == expected_cloud.height
+    assert bytes(cloud.data) == bytes(expected_cloud.data)
+
+
+@pytest.mark.parametrize("fields", [LIDAR_FIELDS, SEMANTIC_LIDAR_FIELDS, RADAR_FIELDS,
+                                    PADDED_FIELDS])
+def test_array_encoding_matches_create_cloud(fields):
+    points = random_points(fields)
+    expected_cloud = create_cloud(Header(), fields,
+                                  [[point[field.name] for field in fields] for point in points])
+    assert_same_cloud(create_cloud_from_array(Header(), fields, points), expected_cloud)
+
+
+@pytest.mark.parametrize("fields", [LIDAR_FIELDS, SEMANTIC_LIDAR_FIELDS, RADAR_FIELDS])
+def test_converted_array_encoding_matches_create_cloud(fields):
+    # the points are converted to the layout of the fields, e.g. from float64 values
+    points = random_points(fields, numpy.dtype([(field.name, numpy.float64) for field in fields]))
+    for field in fields:
+        # non-negative integral values, so that the unsigned integer fields are converted exactly
+        points[field.name] = numpy.round(numpy.abs(points[field.name]))
+    expected_cloud = create_cloud(
+        Header(), fields,
+        [[point[field.name] if field.datatype == PointField.FLOAT32 else int(point[field.name])
+          for field in fields] for point in points])
+    assert_same_cloud(create_cloud_from_array(Header(), fields, points), expected_cloud)
+
+
+def test_radar_point_step():
+    # x, y, z, Range, Velocity, AzimuthAngle, ElevationAngle without padding
+    assert get_cloud_dtype(RADAR_FIELDS).itemsize == 28
+    assert create_cloud_from_array(Header(), RADAR_FIELDS,
+                                   random_points(RADAR_FIELDS)).point_step == 28
@@ -21,6 +21,10 @@ def generate_launch_description():
             name='spawn_sensors_only',
             default_value='False'
         ),
+        launch.actions.DeclareLaunchArgument(
+            name='spawn_in_batch',
+            default_value='True'
+        ),
 
         launch_ros.actions.Node(
             package='carla_spawn_objects',
@@ -37,6 +41,9 @@ def generate_launch_description():
                 },
                 {
                     'spawn_sensors_only': launch.substitutions.LaunchConfiguration('spawn_sensors_only')
+                },
+                {
+                    'spawn_in_batch': launch.substitutions.LaunchConfiguration('spawn_in_batch')
                 }
             ]
         )
@@ -8,13 +8,15 @@
 base class for spawning objects (carla actors and pseudo_actors) in ROS
 
 Gets config file from ros parameter ~objects_definition_file and spawns corresponding objects
-through ROS service /carla/spawn_object.
+through ROS service /carla/spawn_objects (or one by one through /carla/spawn_object if
+~spawn_in_batch is disabled).
 
 Looks for an initial spawn point first in the launchfile, then in the config file, and
 finally ask for a random one to the spawn service.
 
 """
 
+import copy
 import json
 import math
 import os
@@ -27,6 +29,8 @@ from ros_compatibility.node import CompatibleNode
 
 from carla_msgs.msg import CarlaActorList
 from carla_msgs.srv import SpawnObject, DestroyObject
+from carla_ros_bridge_types.msg import CarlaSpawnObject
+from carla_ros_bridge_types.srv import SpawnObjects
 from diagnostic_msgs.msg import KeyValue
 from geometry_msgs.msg import Pose
 
@@ -48,12 +52,14 @@ class CarlaSpawnObjects(CompatibleNode):
 
         self.objects_definition_file = self.get_param('objects_definition_file', '')
         self.spawn_sensors_only = self.get_param('spawn_sensors_only', False)
+        self.spawn_in_batch = self.get_param('spawn_in_batch', True)
 
         self.players = []
         self.vehicles_sensors = []
         self.global_sensors = []
 
         self.spawn_object_service = self.new_client(SpawnObject, "/carla/spawn_object")
+        self.spawn_objects_service = self.new_client(SpawnObjects, "/carla/spawn_objects")
         self.destroy_object_service = self.new_client(DestroyObject, "/carla/destroy_object")
 
     def spawn_object(self, spawn_object_request):
@@ -104,9 +110,10 @@ class CarlaSpawnObjects(CompatibleNode):
             raise RuntimeError("Parameter 'spawn_sensors_only' enabled, " +
                                "but 'sensor.pseudo.actor_list' is not instantiated, add it to your config file.")
 
-        self.setup_sensors(global_sensors)
-
         if self.spawn_sensors_only is True:
+            # the actor list sensor has to be spawned first to find the vehicles
+            self.setup_objects(global_sensors, [])
+
             # get vehicle id from topic /carla/actor_list for all vehicles listed in config file
             actor_info_list = self.wait_for_message("/carla/actor_list", CarlaActorList)
             for vehicle in vehicles:
@@ -114,9 +121,121 @@ class CarlaSpawnObjects(CompatibleNode):
                     if actor_info.type == vehicle["type"] and actor_info.rolename == vehicle["id"]:
                         vehicle["carla_id"] = actor_info.id
 
-        self.setup_vehicles(vehicles)
+            self.setup_objects([], vehicles)
+        else:
+            self.setup_objects(global_sensors, vehicles)
         self.loginfo("All objects spawned.")
 
+    def setup_objects(self, global_sensors, vehicles):
+        if self.spawn_in_batch:
+            self.spawn_objects_in_batch(global_sensors, vehicles)
+        else:
+            self.setup_sensors(global_sensors)
+            self.setup_vehicles(vehicles)
+
+    def spawn_objects_in_batch(self, global_sensors, vehicles):
+        """
+        Spawns the objects with a single call of the service /carla/spawn_objects
+
+        Vehicles that could not be spawned (e.g. at an occupied random spawn point) are
+        spawned again one by one, together with their sensors.
+
+        :param global_sensors: list of sensors not attached to a vehicle
+        :param vehicles: list of vehicles (and their sensors)
+        """
+        # list of (spawn object, list to store the id in, vehicle definition or None)
+        objects = []
+        self.add_sensors_to_batch(objects, global_sensors)
+
+        for vehicle in vehicles:
+            if self.spawn_sensors_only is True:
+                try:
+                    carla_id = vehicle["carla_id"]
+                except KeyError as e:
+                    self.logerr(
+                        "Could not spawn sensors of vehicle {}, its carla ID is not known.".format(vehicle["id"]))
+                    break
+                self.add_sensors_to_batch(objects, vehicle["sensors"], attach_to=carla_id)
+            else:
+                spawn_object = CarlaSpawnObject()
+                self.create_vehicle_spawn_request(spawn_object, vehicle)
+                spawn_object.attach_to_index = -1
+                objects.append((spawn_object, self.players, vehicle))
+                if "sensors" in vehicle:
+                    self.add_sensors_to_batch(objects, vehicle["sensors"],
+                                              parent_index=len(objects) - 1)
+                else:
+                    self.logwarn(
+                        "Object (type='{}', id='{}') has no 'sensors' field in his config file, none will be spawned.".format(vehicle["type"], vehicle["id"]))
+
+        if not objects:
+            return
+
+        spawn_objects_request = roscomp.get_service_request(SpawnObjects)
+        spawn_objects_request.objects = [spawn_object for spawn_object, _, _ in objects]
+        response = self.call_service(self.spawn_objects_service, spawn_objects_request,
+                                     spin_until_response_received=True)
+
+        failed_vehicles = []
+        # indices of the failed vehicles and of the objects attached to them
+        respawned = set()
+        for index, (spawn_object, ids, vehicle) in enumerate(objects):
+            response_id = response.ids[index]
+            if response_id != -1:
+                self.loginfo("Object (type='{}', id='{}') spawned successfully as {}.".format(
+                    spawn_object.type, spawn_object.id, response_id))
+                ids.append(response_id)
+            elif vehicle is not None:
+                failed_vehicles.append(vehicle)
+                respawned.add(index)
+            elif spawn_object.attach_to_index in respawned:
+                respawned.add(index)
+            else:
+                self.logerr("Sensor {} will not be spawned: {}".format(
+                    spawn_object.type + "/" + spawn_object.id, response.error_strings[index]))
+
+        if failed_vehicles:
+            self.logwarn("{} vehicle(s) could not be spawned in batch, spawning them one by one.".format(
+                len(failed_vehicles)))
+            self.setup_vehicles(failed_vehicles)
+
+    def add_sensors_to_batch(self, objects, sensors, attach_to=0, parent_index=-1):
+        """
+        Append the sensors (and their attached objects) to the objects of a batch
+        :param objects: list of (spawn object, list to store the id in, None)
+        :param sensors: list of sensors
+        :param attach_to: id of the already spawned vehicle to attach the sensors to
+        :param parent_index: index of the object within the batch to attach the sensors to
+        """
+        attached = attach_to != 0 or parent_index >= 0
+        sensor_names = []
+        for sensor_spec in sensors:
+            # the definitions are kept unchanged for spawning failed vehicles one by one
+            sensor_spec = copy.deepcopy(sensor_spec)
+            sensor_name = "{}/{}".format(sensor_spec.get("type"), sensor_spec.get("id"))
+            try:
+                if sensor_name in sensor_names:
+                    raise NameError
+                spawn_object = CarlaSpawnObject()
+                attached_objects = self.create_sensor_spawn_request(
+                    spawn_object, sensor_spec, attached)
+                sensor_names.append(sensor_name)
+            except KeyError as e:
+                self.logerr(
+                    "Sensor {} will not be spawned, the mandatory attribute {} is missing".format(sensor_name, e))
+                continue
+            except NameError:
+                self.logerr("Sensor rolename '{}' is only allowed to be used once. The second one will be ignored.".format(
+                    sensor_spec.get("id")))
+                continue
+
+            spawn_object.attach_to = attach_to
+            spawn_object.attach_to_index = parent_index
+            objects.append((spawn_object, self.vehicles_sensors if attached else self.global_sensors,
+                            None))
+            if attached_objects:
+                self.add_sensors_to_batch(objects, attached_objects, parent_index=len(objects) - 1)
+
     def setup_vehicles(self, vehicles):
         for vehicle in vehicles:
             if self.spawn_sensors_only is True:
@@ -131,55 +250,10 @@ class CarlaSpawnObjects(CompatibleNode):
                 self.setup_sensors(vehicle["sensors"], carla_id)
             else:
                 spawn_object_request = roscomp.get_service_request(SpawnObject)
-                spawn_object_request.type = vehicle["type"]
-                spawn_object_request.id = vehicle["id"]
-                spawn_object_request.attach_to = 0
-                spawn_object_request.random_pose = False
-                for attribute, value in vehicle["attributes"].items():
-                    spawn_object_request.attributes.append(
-                        KeyValue(key=str(attribute), value=str(value)))
-
-                spawn_point = None
-
-                # check if there's a spawn_point corresponding to this vehicle
-                spawn_point_param = self.get_param("spawn_point_" + vehicle["id"], None)
-                spawn_param_used = False
-                if (spawn_point_param is not None):
-                    # try to use spawn_point from parameters
-                    spawn_point = self.check_spawn_point_param(spawn_point_param)
-                    if spawn_point is None:
-                        self.logwarn("{}: Could not use spawn point from parameters, ".format(vehicle["id"]) +
-                                     "the spawn point from config file will be used.")
-                    else:
-                        self.loginfo("Spawn point from ros parameters")
-                        spawn_param_used = True
-
-                if "spawn_point" in vehicle and spawn_param_used is False:
-                    # get spawn point from config file
-                    try:
-                        spawn_point = self.create_spawn_point(
-                            vehicle["spawn_point"]["x"],
-                            vehicle["spawn_point"]["y"],
-                            vehicle["spawn_point"]["z"],
-                            vehicle["spawn_point"]["roll"],
-                            vehicle["spawn_point"]["pitch"],
-                            vehicle["spawn_point"]["yaw"]
-                        )
-                        self.loginfo("Spawn point from configuration file")
-                    except KeyError as e:
-                        self.logerr("{}: Could not use the spawn point from config file, ".format(vehicle["id"]) +
-                                    "the mandatory attribute {} is missing, a random spawn point will be used".format(e))
-
-                if spawn_point is None:
-                    # pose not specified, ask for a random one in the service call
-                    self.loginfo("Spawn point selected at random")
-                    spawn_point = Pose()  # empty pose
-                    spawn_object_request.random_pose = True
+                self.create_vehicle_spawn_request(spawn_object_request, vehicle)
 
                 player_spawned = False
                 while not player_spawned and roscomp.ok():
-                    spawn_object_request.transform = spawn_point
-
                     response_id = self.spawn_object(spawn_object_request)
                     if response_id != -1:
                         player_spawned = True
@@ -191,6 +265,60 @@ class CarlaSpawnObjects(CompatibleNode):
                             self.logwarn(
                                 "Object (type='{}', id='{}') has no 'sensors' field in his config file, none will be spawned.".format(spawn_object_request.type, spawn_object_request.id))
 
+    def create_vehicle_spawn_request(self, spawn_object_request, vehicle):
+        """
+        Fill the spawn request of a vehicle
+        (either at a given spawn point or at a random Carla spawn point)
+        :param spawn_object_request: SpawnObject request or CarlaSpawnObject to fill
+        :param vehicle: vehicle definition
+        """
+        spawn_object_request.type = vehicle["type"]
+        spawn_object_request.id = vehicle["id"]
+        spawn_object_request.attach_to = 0
+        spawn_object_request.random_pose = False
+        for attribute, value in vehicle["attributes"].items():
+            spawn_object_request.attributes.append(
+                KeyValue(key=str(attribute), value=str(value)))
+
+        spawn_point = None
+
+        # check if there's a spawn_point corresponding to this vehicle
+        spawn_point_param = self.get_param("spawn_point_" + vehicle["id"], None)
+        spawn_param_used = False
+        if (spawn_point_param is not None):
+            # try to use spawn_point from parameters
+            spawn_point = self.check_spawn_point_param(spawn_point_param)
+            if spawn_point is None:
+                self.logwarn("{}: Could not use spawn point from parameters, ".format(vehicle["id"]) +
+                             "the spawn point from config file will be used.")
+            else:
+                self.loginfo("Spawn point from ros parameters")
+                spawn_param_used = True
+
+        if "spawn_point" in vehicle and spawn_param_used is False:
+            # get spawn point from config file
+            try:
+                spawn_point = self.create_spawn_point(
+                    vehicle["spawn_point"]["x"],
+                    vehicle["spawn_point"]["y"],
+                    vehicle["spawn_point"]["z"],
+                    vehicle["spawn_point"]["roll"],
+                    vehicle["spawn_point"]["pitch"],
+                    vehicle["spawn_point"]["yaw"]
+                )
+                self.loginfo("Spawn point from configuration file")
+            except KeyError as e:
+                self.logerr("{}: Could not use the spawn point from config file, ".format(vehicle["id"]) +
+                            "the mandatory attribute {} is missing, a random spawn point will be used".format(e))
+
+        if spawn_point is None:
+            # pose not specified, ask for a random one in the service call
+            self.loginfo("Spawn point selected at random")
+            spawn_point = Pose()  # empty pose
+            spawn_object_request.random_pose = True
+
+        spawn_object_request.transform = spawn_point
+
     def setup_sensors(self, sensors, attached_vehicle_id=None):
         """
         Create the sensors defined by the user and attach them to the vehicle
@@ -203,61 +331,19 @@ class CarlaSpawnObjects(CompatibleNode):
         for sensor_spec in sensors:
             if not roscomp.ok():
                 break
+            sensor_name = "{}/{}".format(sensor_spec.get("type"), sensor_spec.get("id"))
             try:
-                sensor_type = str(sensor_spec.pop("type"))
-                sensor_id = str(sensor_spec.pop("id"))
-                sensor_frame_id = str(sensor_spec.pop("frame_id", None))
-
-                sensor_name = sensor_type + "/" + sensor_id
                 if sensor_name in sensor_names:
                     raise NameError
                 sensor_names.append(sensor_name)
 
-                if attached_vehicle_id is None and "pseudo" not in sensor_type:
-                    spawn_point = sensor_spec.pop("spawn_point")
-                    sensor_transform = self.create_spawn_point(
-                        spawn_point.pop("x"),
-                        spawn_point.pop("y"),
-                        spawn_point.pop("z"),
-                        spawn_point.pop("roll", 0.0),
-                        spawn_point.pop("pitch", 0.0),
-                        spawn_point.pop("yaw", 0.0))
-                else:
-                    # if sensor attached to a vehicle, or is a 'pseudo_actor', allow default pose
-                    spawn_point = sensor_spec.pop("spawn_point", 0)
-                    if spawn_point == 0:
-                        sensor_transform = self.create_spawn_point(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
-                    else:
-                        sensor_transform = self.create_spawn_point(
-                            spawn_point.pop("x", 0.0),
-                            spawn_point.pop("y", 0.0),
-                            spawn_point.pop("z", 0.0),
-                            spawn_point.pop("roll", 0.0),
-                            spawn_point.pop("pitch", 0.0),
-                            spawn_point.pop("yaw", 0.0))
-
                 spawn_object_request = roscomp.get_service_request(SpawnObject)
-                spawn_object_request.type = sensor_type
-                spawn_object_request.id = sensor_id
-                spawn_object_request.frame_id = sensor_frame_id
+                attached_objects = self.create_sensor_spawn_request(
+                    spawn_object_request, sensor_spec, attached_vehicle_id is not None)
                 spawn_object_request.attach_to = attached_vehicle_id if attached_vehicle_id is not None else 0
-                spawn_object_request.transform = sensor_transform
-                spawn_object_request.random_pose = False  # never set a random pose for a sensor
-
-                attached_objects = []
-                for attribute, value in sensor_spec.items():
-                    if attribute == "attached_objects":
-                        for attached_object in sensor_spec["attached_objects"]:
-                            attached_objects.append(attached_object)
-                        continue
-                    spawn_object_request.attributes.append(
-                        KeyValue(key=str(attribute), value=str(value)))
 
                 response_id = self.spawn_object(spawn_object_request)
 
-                if response_id == -1:
-                    raise RuntimeError(response.error_string)
-
                 if attached_objects:
                     # spawn the attached objects
                     self.setup_sensors(attached_objects, response_id)
@@ -279,8 +365,59 @@ class CarlaSpawnObjects(CompatibleNode):
 
             except NameError:
                 self.logerr("Sensor rolename '{}' is only allowed to be used once. The second one will be ignored.".format(
-                    sensor_id))
+                    sensor_spec.get("id")))
+                continue
+
+    def create_sensor_spawn_request(self, spawn_object_request, sensor_spec, attached):
+        """
+        Fill the spawn request of a sensor (the sensor definition is consumed)
+        :param spawn_object_request: SpawnObject request or CarlaSpawnObject to fill
+        :param sensor_spec: sensor definition
+        :param attached: whether the sensor is attached to another object
+        :return attached_objects: list of objects to attach to the sensor
+        """
+        sensor_type = str(sensor_spec.pop("type"))
+        sensor_id = str(sensor_spec.pop("id"))
+        sensor_frame_id = str(sensor_spec.pop("frame_id", None))
+
+        if not attached and "pseudo" not in sensor_type:
+            spawn_point = sensor_spec.pop("spawn_point")
+            sensor_transform = self.create_spawn_point(
+                spawn_point.pop("x"),
+                spawn_point.pop("y"),
+                spawn_point.pop("z"),
+                spawn_point.pop("roll", 0.0),
+                spawn_point.pop("pitch", 0.0),
+                spawn_point.pop("yaw", 0.0))
+        else:
+            # if sensor attached to a vehicle, or is a 'pseudo_actor', allow default pose
+            spawn_point = sensor_spec.pop("spawn_point", 0)
+            if spawn_point == 0:
+                sensor_transform = self.create_spawn_point(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+            else:
+                sensor_transform = self.create_spawn_point(
+                    spawn_point.pop("x", 0.0),
+                    spawn_point.pop("y", 0.0),
+                    spawn_point.pop("z", 0.0),
+                    spawn_point.pop("roll", 0.0),
+                    spawn_point.pop("pitch", 0.0),
+                    spawn_point.pop("yaw", 0.0))
+
+        spawn_object_request.type = sensor_type
+        spawn_object_request.id = sensor_id
+        spawn_object_request.frame_id = sensor_frame_id
+        spawn_object_request.transform = sensor_transform
+        spawn_object_request.random_pose = False  # never set a random pose for a sensor
+
+        attached_objects = []
+        for attribute, value in sensor_spec.items():
+            if attribute == "attached_objects":
+                for attached_object in sensor_spec["attached_objects"]:
+                    attached_objects.append(attached_object)
                 continue
+            spawn_object_request.attributes.append(
+                KeyValue(key=str(attribute), value=str(value)))
+        return attached_objects
 
     def create_spawn_point(self, x, y, z, roll, pitch, yaw):
         spawn_point = Pose()